@@ -0,0 +1,490 @@
+"""
+本地替身服务：eleduck API、v2ex Atom feed、OpenAI 兼容 /chat/completions 和 Batch API
+（/files、/batches）、Telegram sendMessage
+
+所有端点由同一个 HTTP 服务提供，按路径区分；延迟和错误率按端点配置。
+可单独运行，便于手动调试:
+
+  uv run benchmarks/fake_servers.py --posts 200 --port 8765
+"""
+
+import argparse
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from email.parser import BytesParser
+from email.policy import default as default_policy
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+from xml.sax.saxutils import escape
+
+ELEDUCK_PAGE_SIZE = 20
+
+_WORDS = (
+    "远程 团队 招聘 后端 前端 全栈 工程师 负责 数据 平台 开发 维护 熟悉 异步 "
+    "数据库 容器 编排 薪资 全职 兼职 欢迎 投递 简历 产品 迭代 代码 评审 测试 "
+    "部署 监控 告警 日志 性能 优化 Python Go Rust TypeScript React Kubernetes"
+).split()
+
+_TAG_CHOICES = {
+    "招聘类型": ["全职", "兼职", "外包零活"],
+    "工作方式": ["远程工作", "驻场办公"],
+    "职业": ["开发", "产品", "设计"],
+}
+
+
+@dataclass
+class EndpointProfile:
+    """单个端点的模拟延迟（秒）和错误率"""
+
+    latency: float = 0.0
+    jitter: float = 0.0
+    error_rate: float = 0.0
+    rate_limit_rate: float = 0.0
+
+    def delay(self) -> None:
+        wait = self.latency + random.uniform(0, self.jitter)
+        if wait > 0:
+            time.sleep(wait)
+
+    def failure(self) -> int | None:
+        roll = random.random()
+        if roll < self.rate_limit_rate:
+            return 429
+        if roll < self.rate_limit_rate + self.error_rate:
+            return 503
+        return None
+
+
+@dataclass
+class FakeConfig:
+    eleduck_posts: int = 100
+    v2ex_posts: int = 20
+    qualified_rate: float = 0.2
+    eleduck: EndpointProfile = field(default_factory=EndpointProfile)
+    v2ex: EndpointProfile = field(default_factory=EndpointProfile)
+    llm: EndpointProfile = field(default_factory=EndpointProfile)
+    telegram: EndpointProfile = field(default_factory=EndpointProfile)
+    # 批处理任务创建后多少秒变为 completed；逐行按 llm 的错误率写入错误文件
+    batch_delay: float = 0.0
+
+
+def _post_id(index: int) -> str:
+    return hashlib.sha1(f"post-{index}".encode()).hexdigest()[:12]
+
+
+def _post_text(index: int, words: int = 120) -> str:
+    rng = random.Random(index)
+    return " ".join(rng.choice(_WORDS) + str(rng.randint(0, 999)) for _ in range(words))
+
+
+def _published_at(index: int) -> str:
+    base = datetime(2025, 1, 1, tzinfo=timezone(timedelta(hours=8)))
+    return (base - timedelta(minutes=index * 7)).isoformat()
+
+
+class FakeState:
+    def __init__(self, config: FakeConfig):
+        self.config = config
+        self.lock = threading.Lock()
+        self.counts: dict[str, int] = {}
+        self.index_by_id = {_post_id(i): i for i in range(config.eleduck_posts)}
+        self.files: dict[str, bytes] = {}
+        self.batches: dict[str, dict] = {}
+
+    def hit(self, endpoint: str) -> None:
+        with self.lock:
+            self.counts[endpoint] = self.counts.get(endpoint, 0) + 1
+
+    def eleduck_list(self, page: int) -> dict:
+        start = (page - 1) * ELEDUCK_PAGE_SIZE
+        end = min(start + ELEDUCK_PAGE_SIZE, self.config.eleduck_posts)
+        posts = [
+            {
+                "id": _post_id(i),
+                "title": f"招聘 {i} 号岗位",
+                "full_title": f"招聘 {i} 号岗位",
+                "summary": _post_text(i, 10),
+                "published_at": _published_at(i),
+                "category": {"id": 5, "name": "招聘"},
+                "user": {"nickname": f"user{i}"},
+            }
+            for i in range(start, end)
+        ]
+        return {"posts": posts}
+
+    def eleduck_detail(self, post_id: str) -> dict | None:
+        i = self.index_by_id.get(post_id)
+        if i is None:
+            return None
+        rng = random.Random(i)
+        # 大部分帖子使用能通过预筛选的标签（列表第一项），其余随机，两条路径都有覆盖
+        tags = [
+            {
+                "name": values[0] if rng.random() < 0.9 else rng.choice(values),
+                "tag_group": {"name": group},
+            }
+            for group, values in _TAG_CHOICES.items()
+        ]
+        return {
+            "post": {
+                "id": post_id,
+                "title": f"招聘 {i} 号岗位",
+                "raw_content": _post_text(i),
+                "tags": tags,
+                "published_at": _published_at(i),
+                "category": {"id": 5, "name": "招聘"},
+                "user": {"nickname": f"user{i}"},
+            }
+        }
+
+    def v2ex_feed(self, host: str) -> str:
+        entries = []
+        for i in range(self.config.v2ex_posts):
+            topic = 1_000_000 + i
+            url = f"http://{host}/t/{topic}"
+            entries.append(f"""<entry>
+<title>[远程] 招聘 v2ex {i}</title>
+<link rel="alternate" type="text/html" href="{url}"/>
+<id>tag:www.v2ex.com,2025:/t/{topic}</id>
+<published>{_published_at(i)}</published>
+<updated>{_published_at(i)}</updated>
+<author><name>v2user{i}</name></author>
+<content type="html">{escape("<p>" + _post_text(10_000_000 + i) + "</p>")}</content>
+</entry>""")
+        return (
+            '<?xml version="1.0" encoding="utf-8"?>\n'
+            '<feed xmlns="http://www.w3.org/2005/Atom">\n'
+            "<title>V2EX - 酷工作</title>\n" + "\n".join(entries) + "\n</feed>\n"
+        )
+
+    def chat_completion(self, prompt: str) -> dict:
+        digest = int(hashlib.sha1(prompt.encode()).hexdigest()[:8], 16)
+        qualified = (digest % 1000) / 1000 < self.config.qualified_rate
+        names = re.findall(r"### 档案「(.+?)」", prompt)
+        analysis = {
+            "is_qualified": qualified,
+            "analysis": {
+                "is_recruitment": True,
+                "is_long_term": True,
+                "is_development": True,
+                "salary_meets_requirement": None,
+                "reasoning": "符合" if qualified else "不符合",
+            },
+            "extracted_info": {
+                "company_introduction": "某远程团队",
+                "company_website": "未提及",
+                "job_responsibilities": "开发",
+                "skill_requirements": "Python",
+                "salary_benefits": "面议",
+            },
+        }
+        if names:
+            analysis["profiles"] = {
+                name: {"is_qualified": qualified, "reasoning": "benchmark"}
+                for name in names
+            }
+        content = "```json\n" + json.dumps(analysis, ensure_ascii=False) + "\n```"
+        return {
+            "choices": [{"message": {"role": "assistant", "content": content}}],
+            "usage": {
+                "prompt_tokens": len(prompt) // 2,
+                "completion_tokens": len(content) // 2,
+                "total_tokens": (len(prompt) + len(content)) // 2,
+            },
+        }
+
+    def add_file(self, content: bytes) -> str:
+        file_id = f"file-{uuid.uuid4().hex[:12]}"
+        with self.lock:
+            self.files[file_id] = content
+        return file_id
+
+    def create_batch(self, request: dict) -> dict:
+        batch = {
+            "id": f"batch_{uuid.uuid4().hex[:12]}",
+            "object": "batch",
+            "endpoint": request.get("endpoint"),
+            "input_file_id": request["input_file_id"],
+            "completion_window": request.get("completion_window", "24h"),
+            "status": "in_progress",
+            "created_at": int(time.time()),
+            "output_file_id": None,
+            "error_file_id": None,
+            "request_counts": {"total": 0, "completed": 0, "failed": 0},
+        }
+        with self.lock:
+            self.batches[batch["id"]] = batch
+        return batch
+
+    def retrieve_batch(self, batch_id: str) -> dict | None:
+        with self.lock:
+            batch = self.batches.get(batch_id)
+        if batch is None or batch["status"] != "in_progress":
+            return batch
+        if time.time() - batch["created_at"] < self.config.batch_delay:
+            return batch
+
+        outputs, errors = [], []
+        for line in self.files[batch["input_file_id"]].decode().splitlines():
+            if not line.strip():
+                continue
+            request = json.loads(line)
+            status = self.config.llm.failure()
+            if status is None:
+                prompt = request["body"]["messages"][0]["content"]
+                body = self.chat_completion(prompt)
+                outputs.append(
+                    {
+                        "custom_id": request["custom_id"],
+                        "response": {"status_code": 200, "body": body},
+                        "error": None,
+                    }
+                )
+            else:
+                errors.append(
+                    {
+                        "custom_id": request["custom_id"],
+                        "response": {"status_code": status, "body": {}},
+                        "error": None,
+                    }
+                )
+
+        def jsonl(entries: list[dict]) -> str:
+            return "".join(json.dumps(e, ensure_ascii=False) + "\n" for e in entries)
+
+        batch["request_counts"] = {
+            "total": len(outputs) + len(errors),
+            "completed": len(outputs),
+            "failed": len(errors),
+        }
+        batch["output_file_id"] = self.add_file(jsonl(outputs).encode())
+        if errors:
+            batch["error_file_id"] = self.add_file(jsonl(errors).encode())
+        batch["status"] = "completed"
+        self.hit("llm_batch")
+        return batch
+
+
+def _multipart_file(content_type: str, body: bytes) -> bytes | None:
+    message = BytesParser(policy=default_policy).parsebytes(
+        f"Content-Type: {content_type}\r\n\r\n".encode() + body
+    )
+    for part in message.iter_parts():
+        if part.get_param("name", header="content-disposition") == "file":
+            return part.get_payload(decode=True)
+    return None
+
+
+def make_handler(state: FakeState):
+    config = state.config
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):
+            pass
+
+        def _send(self, status: int, body: bytes, content_type: str) -> None:
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            if status == 429:
+                self.send_header("Retry-After", "0")
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _json(self, status: int, data: dict) -> None:
+            self._send(status, json.dumps(data).encode(), "application/json")
+
+        def _maybe_fail(self, profile: EndpointProfile) -> bool:
+            profile.delay()
+            status = profile.failure()
+            if status is None:
+                return False
+            self._json(status, {"error": "injected"})
+            return True
+
+        def do_GET(self):
+            parsed = urlparse(self.path)
+            if parsed.path == "/api/v1/posts":
+                state.hit("eleduck_list")
+                if self._maybe_fail(config.eleduck):
+                    return
+                page = int(parse_qs(parsed.query).get("page", ["1"])[0])
+                self._json(200, state.eleduck_list(page))
+            elif parsed.path.startswith("/api/v1/posts/"):
+                state.hit("eleduck_detail")
+                if self._maybe_fail(config.eleduck):
+                    return
+                data = state.eleduck_detail(parsed.path.rsplit("/", 1)[-1])
+                if data is None:
+                    self._json(404, {"error": "not found"})
+                else:
+                    self._json(200, data)
+            elif re.fullmatch(r"/batches/[\w-]+", parsed.path):
+                batch = state.retrieve_batch(parsed.path.rsplit("/", 1)[-1])
+                if batch is None:
+                    self._json(404, {"error": "not found"})
+                else:
+                    self._json(200, batch)
+            elif re.fullmatch(r"/files/[\w-]+/content", parsed.path):
+                content = state.files.get(parsed.path.split("/")[2])
+                if content is None:
+                    self._json(404, {"error": "not found"})
+                else:
+                    self._send(200, content, "application/jsonl")
+            elif parsed.path == "/feed/tab/jobs.xml":
+                state.hit("v2ex_feed")
+                if self._maybe_fail(config.v2ex):
+                    return
+                body = state.v2ex_feed(self.headers.get("Host", "localhost"))
+                self._send(200, body.encode(), "application/atom+xml; charset=utf-8")
+            else:
+                self._json(404, {"error": "not found"})
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length", "0"))
+            raw = self.rfile.read(length)
+            if self.path == "/files":
+                content = _multipart_file(self.headers.get("Content-Type", ""), raw)
+                if content is None:
+                    self._json(400, {"error": "missing file"})
+                else:
+                    self._json(200, {"id": state.add_file(content), "object": "file"})
+                return
+
+            payload = json.loads(raw or b"{}")
+            if self.path == "/batches":
+                if payload.get("input_file_id") not in state.files:
+                    self._json(400, {"error": "unknown input_file_id"})
+                else:
+                    self._json(200, state.create_batch(payload))
+            elif self.path.endswith("/chat/completions"):
+                state.hit("llm")
+                if self._maybe_fail(config.llm):
+                    return
+                prompt = payload["messages"][0]["content"]
+                self._json(200, state.chat_completion(prompt))
+            elif re.search(r"/bot[^/]+/sendMessage$", self.path):
+                state.hit("telegram")
+                if self._maybe_fail(config.telegram):
+                    return
+                self._json(200, {"ok": True, "result": {"message_id": 1}})
+            else:
+                self._json(404, {"error": "not found"})
+
+    return Handler
+
+
+class FakeServers:
+    """在后台线程运行替身服务，base_url 形如 http://127.0.0.1:PORT"""
+
+    def __init__(self, config: FakeConfig, port: int = 0):
+        self.state = FakeState(config)
+        self.server = ThreadingHTTPServer(("127.0.0.1", port), make_handler(self.state))
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def env(self) -> dict[str, str]:
+        """让 python -m jobs_agent 指向替身服务的环境变量"""
+        eleduck_pages = -(-self.state.config.eleduck_posts // ELEDUCK_PAGE_SIZE)
+        return {
+            "ELEDUCK_ENABLED": "true" if self.state.config.eleduck_posts else "false",
+            "ELEDUCK_API_BASE": self.base_url,
+            "ELEDUCK_PAGES": str(max(eleduck_pages, 1)),
+            "V2EX_ENABLED": "true" if self.state.config.v2ex_posts else "false",
+            "V2EX_FEED_URL": f"{self.base_url}/feed/tab/jobs.xml",
+            "OPENAI_API_ENDPOINT": self.base_url,
+            "OPENAI_API_KEY": "benchmark",
+            "OPENAI_MODEL_ID": "benchmark-model",
+            "TELEGRAM_API_BASE": self.base_url,
+            "TELEGRAM_ENABLED": "true",
+            "TELEGRAM_BOT_TOKEN": "benchmark",
+            "TELEGRAM_CHAT_ID": "1",
+            "NO_PROXY": "127.0.0.1,localhost",
+        }
+
+    def __enter__(self) -> "FakeServers":
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def add_endpoint_args(parser: argparse.ArgumentParser) -> None:
+    for name in ("eleduck", "v2ex", "llm", "telegram"):
+        parser.add_argument(
+            f"--{name}-latency", type=float, default=0.0, help=f"{name} 基础延迟秒数"
+        )
+        parser.add_argument(
+            f"--{name}-jitter", type=float, default=0.0, help=f"{name} 随机附加延迟上限"
+        )
+        parser.add_argument(
+            f"--{name}-error-rate",
+            type=float,
+            default=0.0,
+            help=f"{name} 返回 503 的比例",
+        )
+        parser.add_argument(
+            f"--{name}-429-rate",
+            type=float,
+            default=0.0,
+            help=f"{name} 返回 429 的比例",
+        )
+
+
+def endpoint_profiles(args: argparse.Namespace) -> dict[str, EndpointProfile]:
+    return {
+        name: EndpointProfile(
+            latency=getattr(args, f"{name}_latency"),
+            jitter=getattr(args, f"{name}_jitter"),
+            error_rate=getattr(args, f"{name}_error_rate"),
+            rate_limit_rate=getattr(args, f"{name}_429_rate"),
+        )
+        for name in ("eleduck", "v2ex", "llm", "telegram")
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--posts", type=int, default=100, help="eleduck 帖子数")
+    parser.add_argument("--v2ex-posts", type=int, default=20, help="v2ex 帖子数")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument(
+        "--batch-delay", type=float, default=0.0, help="批处理任务完成前的秒数"
+    )
+    add_endpoint_args(parser)
+    args = parser.parse_args()
+
+    config = FakeConfig(
+        eleduck_posts=args.posts,
+        v2ex_posts=args.v2ex_posts,
+        batch_delay=args.batch_delay,
+        **endpoint_profiles(args),
+    )
+    with FakeServers(config, port=args.port) as servers:
+        print(f"替身服务已启动: {servers.base_url}")
+        for key, value in servers.env().items():
+            print(f"{key}={value}")
+        try:
+            servers.thread.join()
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,239 @@
+"""
+端到端性能基准
+
+对每个规模启动本地替身服务（eleduck、v2ex、OpenAI、Telegram），在空的临时存储目录中
+以子进程运行一次 `python -m jobs_agent`，记录:
+
+  - 吞吐量（处理的帖子数 / 墙钟秒数）
+  - 各阶段 p50/p95 延迟（取自运行结束输出的 metrics/run_summary.json）
+  - 子进程峰值 RSS
+
+用法:
+
+  uv run benchmarks/run_benchmark.py --scales 10 100 1000 --output results.json
+  uv run benchmarks/run_benchmark.py --baseline results.json --tolerance 0.2
+
+指定 --baseline 时，吞吐量下降或峰值 RSS 上升超过容差的规模会被标记为回归，退出码为 1。
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from fake_servers import (  # noqa: E402
+    FakeConfig,
+    FakeServers,
+    add_endpoint_args,
+    endpoint_profiles,
+)
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+DEFAULT_SCALES = [10, 100, 1000, 10000]
+
+# 运行摘要中的计时序列名 -> 报表中的阶段名
+STAGES = {
+    "fetch_list_seconds": "列表",
+    "fetch_detail_seconds": "详情",
+    "llm_analysis_seconds": "分析",
+    "llm_request_seconds": "LLM",
+    "storage_op_seconds": "存储",
+}
+
+
+def _run_env(servers: FakeServers, storage_root: str, extra: dict) -> dict:
+    env = dict(os.environ)
+    env.update(servers.env())
+    env.update(
+        {
+            "STORAGE_TYPE": "local",
+            "STORAGE_ROOT_PATH": storage_root,
+            "NET_MODE": "live",
+            "HTTP2_ENABLED": "false",
+            "LOG_LEVEL": "WARNING",
+            # 替身服务不需要限速，避免基准测的是令牌桶而不是代码
+            "RATE_LIMIT_INITIAL": "10000",
+            "RATE_LIMIT_MAX": "10000",
+            "RATE_LIMIT_BURST": "10000",
+            "PYTHONPATH": os.pathsep.join(
+                filter(None, [str(REPO_ROOT / "src"), env.get("PYTHONPATH", "")])
+            ),
+        }
+    )
+    env.update(extra)
+    return env
+
+
+def _merge_stage(timings: dict, metric: str) -> dict | None:
+    """同一指标的多个标签序列合并：计数与总和相加，分位数取最大值（保守估计）"""
+    series = [
+        value
+        for name, value in timings.items()
+        if name == metric or name.startswith(metric + "{")
+    ]
+    if not series:
+        return None
+    count = sum(s["count"] for s in series)
+    return {
+        "count": count,
+        "avg": round(sum(s["sum"] for s in series) / count, 4) if count else 0.0,
+        "p50": max(s["p50"] for s in series),
+        "p95": max(s["p95"] for s in series),
+    }
+
+
+def run_scale(posts: int, config_args: argparse.Namespace, extra_env: dict) -> dict:
+    v2ex_posts = min(config_args.v2ex_posts, posts)
+    config = FakeConfig(
+        eleduck_posts=posts - v2ex_posts,
+        v2ex_posts=v2ex_posts,
+        qualified_rate=config_args.qualified_rate,
+        **endpoint_profiles(config_args),
+    )
+    with tempfile.TemporaryDirectory(prefix="jobs_agent_bench_") as tmp:
+        storage_root = os.path.join(tmp, "data")
+        with FakeServers(config) as servers:
+            env = _run_env(servers, storage_root, extra_env)
+            started = time.monotonic()
+            proc = subprocess.Popen(
+                [sys.executable, "-m", "jobs_agent"],
+                cwd=tmp,
+                env=env,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL if config_args.quiet else None,
+            )
+            _, status, rusage = os.wait4(proc.pid, 0)
+            elapsed = time.monotonic() - started
+            proc.returncode = os.waitstatus_to_exitcode(status)
+            counts = dict(servers.state.counts)
+
+        summary_path = Path(storage_root) / "metrics" / "run_summary.json"
+        summary = (
+            json.loads(summary_path.read_text(encoding="utf-8"))
+            if summary_path.exists()
+            else {"counters": {}, "timings": {}}
+        )
+        history_path = Path(storage_root) / "analyzed_jobs.json"
+        analyzed = (
+            len(json.loads(history_path.read_text(encoding="utf-8")))
+            if history_path.exists()
+            else 0
+        )
+
+    # Linux 上 ru_maxrss 单位为 KB，macOS 上为字节
+    peak_rss_mb = rusage.ru_maxrss / (1024 * 1024 if sys.platform == "darwin" else 1024)
+    return {
+        "posts": posts,
+        "exit_code": proc.returncode,
+        "analyzed": analyzed,
+        "wall_seconds": round(elapsed, 3),
+        "jobs_per_second": round(analyzed / elapsed, 2) if elapsed else 0.0,
+        "peak_rss_mb": round(peak_rss_mb, 1),
+        "stages": {
+            stage: _merge_stage(summary["timings"], metric)
+            for metric, stage in STAGES.items()
+        },
+        "server_requests": counts,
+    }
+
+
+def print_table(results: list[dict]) -> None:
+    header = f"{'帖子数':>8} {'已分析':>8} {'耗时(s)':>9} {'jobs/s':>8} {'RSS(MB)':>8}"
+    for stage in STAGES.values():
+        header += f" {stage + ' p50/p95(ms)':>18}"
+    print(header)
+    for r in results:
+        line = (
+            f"{r['posts']:>8} {r['analyzed']:>8} {r['wall_seconds']:>9.2f} "
+            f"{r['jobs_per_second']:>8.1f} {r['peak_rss_mb']:>8.1f}"
+        )
+        for stage in STAGES.values():
+            s = r["stages"].get(stage)
+            cell = f"{s['p50'] * 1000:.0f}/{s['p95'] * 1000:.0f}" if s else "-"
+            line += f" {cell:>18}"
+        if r["exit_code"] != 0:
+            line += f"  (退出码 {r['exit_code']})"
+        print(line)
+
+
+def compare(results: list[dict], baseline: list[dict], tolerance: float) -> list[str]:
+    """返回超出容差的回归描述"""
+    previous = {r["posts"]: r for r in baseline}
+    regressions = []
+    for r in results:
+        base = previous.get(r["posts"])
+        if base is None:
+            continue
+        if r["jobs_per_second"] < base["jobs_per_second"] * (1 - tolerance):
+            regressions.append(
+                f"{r['posts']} 帖: 吞吐量 {base['jobs_per_second']} -> {r['jobs_per_second']} jobs/s"
+            )
+        if r["peak_rss_mb"] > base["peak_rss_mb"] * (1 + tolerance):
+            regressions.append(
+                f"{r['posts']} 帖: 峰值 RSS {base['peak_rss_mb']} -> {r['peak_rss_mb']} MB"
+            )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="jobs_agent 端到端性能基准")
+    parser.add_argument(
+        "--scales", type=int, nargs="+", default=DEFAULT_SCALES, help="帖子总数"
+    )
+    parser.add_argument(
+        "--v2ex-posts", type=int, default=20, help="每个规模中来自 v2ex 的帖子数"
+    )
+    parser.add_argument(
+        "--qualified-rate", type=float, default=0.2, help="LLM 判定符合条件的比例"
+    )
+    parser.add_argument("--output", help="结果写入 JSON 文件")
+    parser.add_argument("--baseline", help="与之前 --output 的结果比较")
+    parser.add_argument(
+        "--tolerance", type=float, default=0.2, help="回归容差，默认 0.2 (20%%)"
+    )
+    parser.add_argument(
+        "--env",
+        action="append",
+        default=[],
+        metavar="KEY=VALUE",
+        help="传给 jobs_agent 的额外环境变量，可重复",
+    )
+    parser.add_argument("--quiet", action="store_true", help="不显示子进程日志")
+    add_endpoint_args(parser)
+    args = parser.parse_args()
+
+    extra_env = dict(item.split("=", 1) for item in args.env)
+
+    results = []
+    for posts in args.scales:
+        print(f"运行规模 {posts} ...", file=sys.stderr)
+        results.append(run_scale(posts, args, extra_env))
+
+    print_table(results)
+
+    if args.output:
+        Path(args.output).write_text(
+            json.dumps(results, ensure_ascii=False, indent=2), encoding="utf-8"
+        )
+
+    failed = [r for r in results if r["exit_code"] != 0]
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8"))
+        regressions = compare(results, baseline, args.tolerance)
+        for message in regressions:
+            print(f"❌ 回归: {message}")
+        if regressions:
+            sys.exit(1)
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -3,6 +3,9 @@
 用法:
   uv run debug-fetch.py L5fbk3
   uv run debug-fetch.py https://eleduck.com/posts/L5fbk3
+
+离线回放（需先用 NET_MODE=record 录制）:
+  NET_MODE=replay uv run debug-fetch.py L5fbk3
 """
 
 import sys
@@ -4,6 +4,9 @@
   uv run scripts/debug_v2ex.py              # 抓取 RSS feed，打印列表摘要
   uv run scripts/debug_v2ex.py 1204629      # 打印指定帖子的完整内容
   uv run scripts/debug_v2ex.py https://www.v2ex.com/t/1204629
+
+离线回放（需先用 NET_MODE=record 录制）:
+  NET_MODE=replay uv run scripts/debug_v2ex.py
 """
 
 import sys
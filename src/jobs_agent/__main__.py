@@ -1,17 +1,71 @@
 import os
 import json
+import time
+import signal
 import logging
 import asyncio
+import argparse
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from dotenv import load_dotenv
 
 from jobs_agent.sources import create_sources_from_env
-from jobs_agent.sources.base import BaseSource, AnalysisResult, AnalyzedRecord
-from jobs_agent.core.pipeline import fetch_and_parse_all
+from jobs_agent.sources.base import (
+    BaseSource,
+    AnalysisResult,
+    AnalyzedRecord,
+    JobDetail,
+    JobListItem,
+)
+from jobs_agent.core.pipeline import iter_details
+from jobs_agent.core.stream import run_pipeline
+from jobs_agent.core.packing import create_job_packer_from_env
+from jobs_agent.core.batch import BatchStore, collect_batch, run_batch, submit_batch
+from jobs_agent.core.sink import ResultSink, load_history
+from jobs_agent.core.http import close_async_client, close_client
+from jobs_agent.core.ratelimit import get_rate_limiter
+from jobs_agent.core.httpcache import get_http_cache
+from jobs_agent.core.llmcache import get_llm_cache
+from jobs_agent.core.watermark import get_watermark_store
+from jobs_agent.core.prefilter import Prefilter, create_prefilter_from_env
+from jobs_agent.core.metrics import save_metrics
+from jobs_agent.core.poll import create_poll_scheduler_from_env
+from jobs_agent.core.profiles import (
+    Profile,
+    load_profiles_from_env,
+    qualified_profiles,
+)
+from jobs_agent.core.fingerprint import FingerprintIndex
+from jobs_agent.core.neardup import create_neardup_index_from_env
+from jobs_agent.core.replay import ReplaySelection, replay, select_details
+from jobs_agent.core.shard import (
+    LeaseManager,
+    ShardConfig,
+    QUALIFIED_PATH,
+    create_shard_from_env,
+    merge_shards,
+    prune_merged,
+)
+from jobs_agent.core.scheduler import (
+    PendingJobs,
+    RunBudget,
+    create_run_budget_from_env,
+    job_priority,
+    prioritized,
+)
 from jobs_agent.llm.openai import OpenAIChat
-from jobs_agent.core.analyzer import analyze_job_with_llm
+from jobs_agent.llm.batch import OpenAIBatchClient
+from jobs_agent.core.analyzer import analyze_job_with_llm_async
 from jobs_agent.notify.telegram import notify_jobs, is_configured as telegram_configured
-from jobs_agent.storage import create_storage_from_env, StorageClient
+from jobs_agent.storage import (
+    create_storage_from_env,
+    create_detail_archive_from_env,
+    DetailArchive,
+    PrefixedStorageClient,
+    StorageClient,
+    RecordJournal,
+)
 
 load_dotenv()
 
@@ -22,9 +76,14 @@ logging.basicConfig(
     datefmt="%Y-%m-%d %H:%M:%S",
 )
 
+logging.getLogger("httpx").setLevel(logging.WARNING)
+
 logger = logging.getLogger(__name__)
 
 storage: StorageClient = None
+# 分片运行时 storage 指向 shards/<index>/，root_storage 为存储根目录；不分片时两者相同
+root_storage: StorageClient = None
+shard: ShardConfig | None = None
 
 
 def _clean_text(text):
@@ -97,6 +156,29 @@ def create_markdown_table(qualified_jobs: list[AnalysisResult]) -> str:
     return markdown
 
 
+def create_profiles_markdown(qualified_jobs: list[AnalysisResult]) -> str:
+    """配置了筛选档案时按档案分节输出，否则与 create_markdown_table 相同"""
+    names = list(
+        dict.fromkeys(
+            name
+            for job in qualified_jobs
+            for name in qualified_profiles(job["llm_analysis"])
+        )
+    )
+    if not names:
+        return create_markdown_table(qualified_jobs)
+
+    sections = []
+    for name in names:
+        jobs = [
+            job
+            for job in qualified_jobs
+            if name in qualified_profiles(job["llm_analysis"])
+        ]
+        sections.append(f"# 档案「{name}」\n\n" + create_markdown_table(jobs))
+    return "\n".join(sections)
+
+
 async def save_notifications(new_qualified_jobs: list[AnalysisResult]) -> None:
     if not new_qualified_jobs:
         return
@@ -126,107 +208,254 @@ async def save_notifications(new_qualified_jobs: list[AnalysisResult]) -> None:
         logger.error(f"保存通知失败: {e}")
 
 
-async def process_data(
-    sources: list[BaseSource],
-) -> tuple[list[AnalyzedRecord], list[AnalysisResult]]:
-    print("=== 开始数据处理阶段 ===\n")
-
+class RunState:
+    """跨轮次复用的状态：常驻模式下只加载一次，保持去重索引和客户端常驻内存"""
+
+    def __init__(
+        self,
+        history: list[AnalyzedRecord],
+        journal: RecordJournal,
+        archive: DetailArchive | None,
+        fingerprints: FingerprintIndex,
+        llm_client: OpenAIChat,
+        prefilter: Prefilter,
+        profiles: list[Profile],
+        pending: PendingJobs,
+        leases: LeaseManager | None,
+        workers: int,
+    ):
+        self.history = history
+        self.analyzed_ids = {
+            record.get("id", "") for record in history if record.get("id")
+        }
+        self.journal = journal
+        self.archive = archive
+        self.fingerprints = fingerprints
+        self.llm_client = llm_client
+        self.prefilter = prefilter
+        self.profiles = profiles
+        self.pending = pending
+        self.leases = leases
+        self.workers = workers
+
+
+async def load_state(sources: list[BaseSource]) -> RunState:
     await storage.ensure_dir(".")
-
-    analyzed_jobs: list[dict] = []
-    analyzed_json_path = "analyzed_jobs.json"
-    if await storage.exists(analyzed_json_path):
-        try:
-            content = await storage.read_text(analyzed_json_path)
-            analyzed_jobs = json.loads(content)
-        except Exception as e:
-            logger.warning(f"加载已分析记录失败: {e}")
-            analyzed_jobs = []
-
-    analyzed_ids = {
-        record.get("id", "") for record in analyzed_jobs if record.get("id")
-    }
+    await get_rate_limiter().load(storage)
+    await get_http_cache().load(storage)
+    await get_llm_cache().load(storage)
+    await get_watermark_store().load(storage)
+
+    journal = RecordJournal(storage)
+    history = await load_history(storage, journal)
+    fingerprints = FingerprintIndex(near=create_neardup_index_from_env())
+    await fingerprints.load(storage)
+    pending = PendingJobs()
+    await pending.load(storage)
 
     print("🚀 初始化LLM客户端...")
     llm_client = OpenAIChat()
 
-    print(f"\n📥 开始抓取数据...（跳过 {len(analyzed_ids)} 个已分析的）")
-    all_jobs_data = fetch_and_parse_all(sources, analyzed_ids=analyzed_ids)
+    # LLM 调用在事件循环上异步进行；列表和详情抓取在线程中执行，线程池需容纳全部抓取并发
+    workers = int(os.getenv("ANALYSIS_WORKERS", "4"))
+    fetch_concurrency = int(os.getenv("FETCH_HOST_CONCURRENCY", "4"))
+    asyncio.get_running_loop().set_default_executor(
+        ThreadPoolExecutor(max_workers=(fetch_concurrency + 1) * len(sources) + 4)
+    )
 
-    if not all_jobs_data:
-        print("❌ 没有获取到新的数据")
-        return [], []
+    return RunState(
+        history=history,
+        journal=journal,
+        # 各分片的归档写到同一目录，文件名含进程号不会冲突，replay 可一并读取
+        archive=create_detail_archive_from_env(root_storage),
+        fingerprints=fingerprints,
+        llm_client=llm_client,
+        prefilter=create_prefilter_from_env(),
+        profiles=load_profiles_from_env(),
+        pending=pending,
+        leases=(
+            LeaseManager(root_storage, shard.worker_id, shard.lease_ttl)
+            if shard
+            else None
+        ),
+        workers=workers,
+    )
 
-    print(f"\n📊 获取到 {len(all_jobs_data)} 个新招聘信息，开始分析...")
 
-    new_qualified_jobs: list[AnalysisResult] = []
-    new_analyzed_records: list[AnalyzedRecord] = []
+async def process_data(
+    sources: list[BaseSource],
+    state: RunState,
+    budget: RunBudget | None = None,
+    deferred: list[JobDetail] | None = None,
+) -> tuple[list[AnalyzedRecord], list[AnalysisResult]]:
+    """
+    抓取并分析一轮
 
-    for i, detail in enumerate(all_jobs_data, 1):
-        print(f"\n[{i}/{len(all_jobs_data)}] 分析中: {detail['id']}")
+    传入 deferred 时不调用在线 LLM：通过预筛选和去重、需要 LLM 分析的详情加入 deferred，
+    由调用方提交到 Batch API
+    """
+    print("=== 开始数据处理阶段 ===\n")
 
-        try:
-            result = analyze_job_with_llm(llm_client, detail)
-        except Exception as e:
-            logger.error(f"分析失败 {detail['id']}: {e}")
-            continue
-
-        llm_analysis = result["llm_analysis"]
-        is_qualified = llm_analysis.get("is_qualified", False)
-        reason = llm_analysis.get("analysis", {}).get("reasoning", "")
-
-        new_analyzed_records.append(
-            {
-                "id": result["id"],
-                "source": result["source"],
-                "url": result["url"],
-                "is_qualified": is_qualified,
-                "analyzed_at": result["analyzed_at"],
-                "reason": reason,
-            }
-        )
+    if budget is None:
+        budget = create_run_budget_from_env()
+
+    if shard is not None:
+        # 已由 merge 合并进根目录的记录从分片输出中删除，其他分片分析过的职位同样跳过
+        merged_ids = {
+            record["id"]
+            for record in await load_history(root_storage)
+            if record.get("id")
+        }
+        state.history = await prune_merged(storage, state.history, merged_ids)
+        state.analyzed_ids.update(merged_ids)
+        print(f"🧩 分片 {shard.index}/{shard.count}（{shard.worker_id}）")
+
+    watermarks = get_watermark_store()
+    for source in sources:
+        source.watermark = watermarks.get(source.name)
+
+    analyzed_ids = state.analyzed_ids
+    fingerprints = state.fingerprints
+    prefilter = state.prefilter
+    llm_client = state.llm_client
+    workers = state.workers
+    prefilter.rejected.clear()
+    fingerprints.reused = 0
+
+    sink = ResultSink(
+        storage,
+        history=state.history,
+        # 分片运行时不直接通知，符合条件的职位写入 qualified.jsonl 由 merge 统一发送
+        notifier=notify_jobs if telegram_configured() and shard is None else None,
+        journal=state.journal,
+        archive=state.archive,
+        outbox=RecordJournal(storage, QUALIFIED_PATH) if shard else None,
+        profiles=state.profiles,
+        flush_every=int(os.getenv("PIPELINE_FLUSH_EVERY", "50")),
+        notify_batch_size=int(os.getenv("NOTIFY_BATCH_SIZE", "10")),
+    )
 
-        if is_qualified:
-            new_qualified_jobs.append(result)
-            print("✅ 符合条件")
-        else:
-            print("❌ 不符合条件")
+    packer = create_job_packer_from_env(llm_client, state.profiles, workers)
+    if packer is not None:
+        analyze_one = packer.analyze
+        # 每个 worker 同时只等待一条详情，需要足够的 worker 才能凑满批次
+        workers *= packer.max_jobs
+    else:
+
+        async def analyze_one(detail: JobDetail) -> AnalysisResult:
+            return await analyze_job_with_llm_async(llm_client, detail, state.profiles)
+
+    async def analyze_with_llm(detail: JobDetail) -> AnalysisResult | None:
+        if not budget.admit():
+            state.pending.add(detail)
+            return None
+        global_id = f"{detail['source']}:{detail['id']}"
+        if state.leases is not None and not await state.leases.claim(global_id):
+            budget.cancel()
+            return None
+        if deferred is not None:
+            budget.cancel()
+            deferred.append(detail)
+            return None
+        print(f"\n分析中: {detail['id']}")
+        started = time.monotonic()
+        try:
+            return await analyze_one(detail)
+        except Exception:
+            # 分析失败时释放租约，下次运行可以重新认领
+            if state.leases is not None:
+                await state.leases.release(global_id)
+            raise
+        finally:
+            budget.done(time.monotonic() - started)
+
+    async def analyze(detail: JobDetail) -> AnalysisResult | None:
+        rejected = prefilter.check(detail)
+        if rejected:
+            return rejected
+        return await fingerprints.dedup(detail, analyze_with_llm)
 
     print(
-        f"\n📈 数据处理完成！跳过 {len(analyzed_ids)} 个已分析项，新增 {len(new_qualified_jobs)} 个符合条件的招聘信息"
+        f"\n📥 开始抓取并分析...（跳过 {len(analyzed_ids)} 个已分析的，{workers} 个并发分析）"
     )
+    # 上次预算耗尽留下的职位与新抓取的一起按优先级排序，抓取时跳过
+    carried = state.pending.take_all()
+    carried_items = state.pending.take_items()
+    if carried or carried_items:
+        print(f"⏳ 继续处理上次未分析的 {len(carried) + len(carried_items)} 个职位")
+    # 已提交到 Batch API、尚未取回结果的职位不再在线分析
+    batches = BatchStore()
+    await batches.load(storage)
+    skip_ids = (
+        analyzed_ids | {f"{d['source']}:{d['id']}" for d in carried} | batches.job_ids()
+    )
+    # 列表抓取失败或超时的数据源不推进水位线
+    listed: set[str] = set()
+    # 预算耗尽时已列出但还没抓取详情的帖子，留到下次运行
+    unfetched: list[JobListItem] = []
+    try:
+        fetched = await run_pipeline(
+            prioritized(
+                iter_details(
+                    sources,
+                    analyzed_ids=skip_ids,
+                    completed=listed,
+                    accept=shard.owns if shard else None,
+                    carried=carried_items,
+                    unfetched=unfetched,
+                ),
+                priority=lambda detail: job_priority(detail, prefilter),
+                budget=budget,
+                pending=state.pending,
+                carried=carried,
+                window=int(os.getenv("SCHEDULER_WINDOW", "64")),
+            ),
+            analyze,
+            sink.add,
+            workers=workers,
+        )
+    finally:
+        for item in unfetched:
+            state.pending.add_item(item)
+        await sink.close()
+        await fingerprints.save(storage)
+        await state.pending.save(storage)
+
+    if budget.exhausted:
+        # 提前停止时列表中可能还有未抓取的帖子，水位线保持不动，下次从原位置重新翻页
+        print(
+            f"⏳ 预算耗尽（{budget.exhausted_reason}），"
+            f"{len(state.pending)} 个职位留待下次运行"
+        )
+    else:
+        for source in sources:
+            if source.name in listed:
+                watermarks.advance(source.name, source.newest_seen)
 
-    return new_analyzed_records, new_qualified_jobs
-
-
-async def handle_results(
-    new_analyzed_records: list[AnalyzedRecord],
-    new_qualified_jobs: list[AnalysisResult],
-) -> None:
-    print("\n=== 开始后续动作阶段 ===\n")
+    if not fetched:
+        print("❌ 没有获取到新的数据")
+    else:
+        if prefilter.enabled:
+            print(f"🧹 {prefilter.summary()}")
+        if fingerprints.reused:
+            print(f"🔁 内容重复 {fingerprints.reused} 个，复用已有分析结果")
 
-    analyzed_json_path = "analyzed_jobs.json"
+    state.history = sink.records + state.history
+    analyzed_ids.update(record["id"] for record in sink.records)
 
-    existing_analyzed_jobs: list[dict] = []
-    if await storage.exists(analyzed_json_path):
-        try:
-            content = await storage.read_text(analyzed_json_path)
-            existing_analyzed_jobs = json.loads(content)
-        except Exception as e:
-            logger.warning(f"加载现有已分析记录失败: {e}")
-            existing_analyzed_jobs = []
+    print(
+        f"\n📈 数据处理完成！跳过 {len(analyzed_ids)} 个已分析项，抓取 {fetched} 个，"
+        f"新增 {len(sink.qualified)} 个符合条件的招聘信息"
+    )
 
-    all_analyzed_jobs = new_analyzed_records + existing_analyzed_jobs
+    return sink.records, sink.qualified
 
-    print(f"💾 保存已分析记录表...（总共 {len(all_analyzed_jobs)} 个已分析记录）")
-    await storage.write_text(
-        analyzed_json_path, json.dumps(all_analyzed_jobs, ensure_ascii=False, indent=2)
-    )
 
+async def write_reports(new_qualified_jobs: list[AnalysisResult]) -> None:
     save_jobs_md = os.getenv("SAVE_JOBS_MD", "false").lower() in ("true", "1")
     if save_jobs_md and new_qualified_jobs:
         print("📝 生成Markdown报告...")
-        markdown_content = create_markdown_table(new_qualified_jobs)
+        markdown_content = create_profiles_markdown(new_qualified_jobs)
         await storage.write_text("jobs.md", markdown_content)
         print("✅ 报告已保存到 jobs.md")
 
@@ -237,38 +466,447 @@ async def handle_results(
     if save_notifications_flag and new_qualified_jobs:
         await save_notifications(new_qualified_jobs)
 
-    if new_qualified_jobs and telegram_configured():
-        print("📲 发送 Telegram 通知...")
-        success = notify_jobs(new_qualified_jobs)
-        if success:
-            print("✅ Telegram 通知已发送")
-        else:
-            print("⚠️ Telegram 通知发送失败")
 
+async def handle_results(
+    new_analyzed_records: list[AnalyzedRecord],
+    new_qualified_jobs: list[AnalysisResult],
+) -> None:
+    print("\n=== 开始后续动作阶段 ===\n")
 
-async def main():
-    global storage
+    await write_reports(new_qualified_jobs)
+    await get_rate_limiter().save(storage)
+    await get_http_cache().save(storage)
+    await get_llm_cache().save(storage)
+    await get_watermark_store().save(storage)
+
+
+def init_storage() -> None:
+    global storage, root_storage, shard
+
+    root_storage = create_storage_from_env()
+    shard = create_shard_from_env()
+    if shard:
+        storage = PrefixedStorageClient(root_storage, shard.prefix)
+    else:
+        storage = root_storage
+
+
+_shard_leases: LeaseManager | None = None
+
+
+def shard_leases() -> LeaseManager:
+    """分片级租约共用一个 LeaseManager，续期时才能核对自己上次写入的 token"""
+    global _shard_leases
+    if _shard_leases is None:
+        _shard_leases = LeaseManager(root_storage, shard.worker_id, shard.lease_ttl)
+    return _shard_leases
+
+
+async def acquire_shard() -> bool:
+    """分片运行时认领分片级租约，同一分片已有 worker 在运行时返回 False"""
+    if shard is None:
+        return True
+    if await shard_leases().claim(shard.lease_key):
+        return True
+    print(f"❌ 分片 {shard.index} 正在被其他 worker 运行，退出")
+    return False
+
+
+async def release_shard() -> None:
+    if shard is not None:
+        await shard_leases().release(shard.lease_key)
 
+
+async def main():
     print("=== 开始招聘信息分析流程 ===\n")
 
-    storage = create_storage_from_env()
+    init_storage()
+    # 时间预算从进程启动算起，包含加载状态的耗时
+    budget = create_run_budget_from_env()
     storage_type = os.getenv("STORAGE_TYPE", "local")
     print(f"📦 存储类型: {storage_type}\n")
 
+    acquired = False
     try:
         sources = create_sources_from_env()
         if not sources:
             print("❌ 没有可用的数据源")
             return
 
-        new_analyzed_records, new_qualified_jobs = await process_data(sources)
+        acquired = await acquire_shard()
+        if not acquired:
+            return
+
+        state = await load_state(sources)
+        new_analyzed_records, new_qualified_jobs = await process_data(
+            sources, state, budget
+        )
         await handle_results(new_analyzed_records, new_qualified_jobs)
+        await save_metrics(storage)
 
         print(f"\n🎉 流程完成！新增 {len(new_qualified_jobs)} 个符合条件的招聘信息")
 
     except Exception as e:
         logger.error(f"程序执行出错: {e}", exc_info=True)
+    finally:
+        if acquired:
+            await release_shard()
+        await close_async_client()
+        close_client()
+
+
+async def daemon():
+    """常驻模式：各数据源按自适应间隔轮询，收到 SIGTERM/SIGINT 后完成当前轮次再退出"""
+    print("=== 启动常驻模式 ===\n")
+
+    init_storage()
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, stop.set)
+
+    acquired = False
+    try:
+        sources = create_sources_from_env()
+        if not sources:
+            print("❌ 没有可用的数据源")
+            return
+
+        acquired = await acquire_shard()
+        if not acquired:
+            return
+
+        state = await load_state(sources)
+        scheduler = create_poll_scheduler_from_env()
+        await scheduler.load(storage)
+        names = [source.name for source in sources]
+
+        while not stop.is_set():
+            now = time.time()
+            due = [source for source in sources if scheduler.is_due(source.name, now)]
+            if due:
+                if shard is not None and not await shard_leases().renew(
+                    shard.lease_key
+                ):
+                    # 继续运行会与接管的 worker 重复处理同一分片；租约已不归自己，不释放
+                    print(f"❌ 分片 {shard.index} 已被其他 worker 接管，退出")
+                    acquired = False
+                    return
+                try:
+                    records, qualified = await process_data(due, state)
+                    await handle_results(records, qualified)
+                except Exception as e:
+                    logger.error(f"轮询出错: {e}", exc_info=True)
+                    records = []
+
+                new_counts = Counter(record["source"] for record in records)
+                for source in due:
+                    scheduler.record(source.name, new_counts[source.name])
+                await scheduler.save(storage)
+                await save_metrics(storage)
+
+            delay = max(scheduler.next_due(names) - time.time(), 1.0)
+            print(f"\n💤 {delay:.0f}s 后进行下一轮轮询")
+            try:
+                await asyncio.wait_for(stop.wait(), timeout=delay)
+            except TimeoutError:
+                pass
+
+        print("\n👋 收到退出信号，已保存状态")
+    except Exception as e:
+        logger.error(f"程序执行出错: {e}", exc_info=True)
+    finally:
+        if acquired:
+            await release_shard()
+        await close_async_client()
+        close_client()
+
+
+async def replay_main(args: argparse.Namespace):
+    """重新分析归档中的职位详情并与历史结论比较，不抓取、不通知、不修改已分析记录"""
+    global storage, root_storage
+
+    print("=== 开始重新分析归档职位 ===\n")
+
+    storage = root_storage = create_storage_from_env()
+    try:
+        archive = create_detail_archive_from_env(storage) or DetailArchive(storage)
+        history = await load_history(storage)
+        selection = ReplaySelection(
+            since=args.since,
+            until=args.until,
+            source=args.source,
+            verdict=args.verdict,
+            include_prefiltered=args.include_prefiltered,
+            include_duplicates=args.include_duplicates,
+            limit=args.limit,
+        )
+        entries = await select_details(archive, history, selection)
+        if not entries:
+            print("❌ 归档中没有符合条件的职位")
+            return
+
+        workers = args.workers or int(os.getenv("ANALYSIS_WORKERS", "4"))
+        llm_client = OpenAIChat()
+        profiles = load_profiles_from_env()
+        analyze_all = None
+        if args.batch:
+            print(f"🔁 选中 {len(entries)} 个职位，通过 Batch API 分析")
+            batch_client = OpenAIBatchClient()
+            poll_interval = float(os.getenv("BATCH_POLL_INTERVAL", "30"))
+
+            async def analyze_all(details: list[JobDetail]) -> list[AnalysisResult]:
+                return await run_batch(
+                    batch_client, llm_client, storage, details, profiles, poll_interval
+                )
+
+        else:
+            print(f"🔁 选中 {len(entries)} 个职位，{workers} 个并发分析")
+        report = await replay(
+            llm_client,
+            entries,
+            history,
+            profiles=profiles,
+            workers=workers,
+            analyze_all=analyze_all,
+        )
+
+        print(f"\n📊 {report.summary()}")
+        await storage.write_text(
+            args.output, json.dumps(report.to_dict(), ensure_ascii=False, indent=2)
+        )
+        print(f"✅ 差异报告已保存到 {args.output}")
+        await save_metrics(storage)
+    except Exception as e:
+        logger.error(f"程序执行出错: {e}", exc_info=True)
+    finally:
+        await close_async_client()
+        close_client()
+
+
+async def batch_main(args: argparse.Namespace):
+    """
+    把积压的待分析职位提交到 Batch API，并取回已完成批次的结果
+
+    --fetch 时先抓取一轮，把本应在线分析的新职位一并提交
+    """
+    print("=== 开始批处理分析 ===\n")
+
+    init_storage()
+    acquired = False
+    try:
+        acquired = await acquire_shard()
+        if not acquired:
+            return
+
+        batch_client = OpenAIBatchClient()
+        batches = BatchStore()
+        await batches.load(storage)
+        deferred: list[JobDetail] = []
+        if args.fetch:
+            sources = create_sources_from_env()
+            state = await load_state(sources)
+            # 不调用在线接口，不需要 token 预算
+            records, qualified = await process_data(
+                sources, state, RunBudget(), deferred=deferred
+            )
+            await handle_results(records, qualified)
+            journal = state.journal
+            history = state.history
+            profiles = state.profiles
+            llm_client = state.llm_client
+            pending = state.pending
+        else:
+            journal = RecordJournal(storage)
+            history = await load_history(storage, journal)
+            profiles = load_profiles_from_env()
+            llm_client = OpenAIChat()
+            pending = PendingJobs()
+            await pending.load(storage)
+
+        if deferred:
+            # 水位线已经推进，先放进待分析队列，提交失败时下次还能重试
+            for detail in deferred:
+                pending.add(detail)
+            await pending.save(storage)
+            print(f"📥 新抓取 {len(deferred)} 个待分析职位")
+
+        if not args.collect_only:
+            details = pending.take_all()
+            if args.limit > 0:
+                for detail in details[args.limit :]:
+                    pending.add(detail)
+                details = details[: args.limit]
+            if details:
+                submitted = await submit_batch(
+                    batch_client, llm_client, storage, details, profiles
+                )
+                batches.add(submitted)
+                print(f"📦 已提交 {len(details)} 个职位，批处理任务 {submitted['id']}")
+            else:
+                print("没有待分析的职位")
+            # 提交后立即保存，避免中断后同一批职位被重复提交
+            await pending.save(storage)
+            await batches.save(storage)
+
+        sink = ResultSink(
+            storage,
+            history=history,
+            notifier=notify_jobs if telegram_configured() and shard is None else None,
+            journal=journal,
+            archive=create_detail_archive_from_env(root_storage),
+            outbox=RecordJournal(storage, QUALIFIED_PATH) if shard else None,
+            profiles=profiles,
+            notify_batch_size=int(os.getenv("NOTIFY_BATCH_SIZE", "10")),
+        )
+        poll_interval = args.poll_interval or float(
+            os.getenv("BATCH_POLL_INTERVAL", "30")
+        )
+        for submitted in list(batches.batches):
+            batch = None
+            if args.wait:
+                batch = await batch_client.wait(
+                    submitted["id"], poll_interval, args.timeout
+                )
+            outcome = await collect_batch(
+                batch_client, llm_client, storage, submitted, profiles, batch
+            )
+            if outcome is None:
+                print(f"⏳ 批处理 {submitted['id']} 仍在运行: {submitted['status']}")
+                continue
+            for result in outcome.results:
+                await sink.add(result)
+            # 没有拿到结果的职位放回待分析队列，下次在线运行或批处理时重试
+            for detail in outcome.failed:
+                pending.add(detail)
+            batches.remove(submitted["id"])
+            print(
+                f"✅ 批处理 {submitted['id']} {outcome.status}: "
+                f"{len(outcome.results)} 个完成，{len(outcome.failed)} 个失败"
+            )
+
+        await sink.close()
+        await pending.save(storage)
+        await batches.save(storage)
+        await write_reports(sink.qualified)
+        await save_metrics(storage)
+        print(f"\n🎉 批处理完成！新增 {len(sink.qualified)} 个符合条件的招聘信息")
+    except Exception as e:
+        logger.error(f"程序执行出错: {e}", exc_info=True)
+    finally:
+        if acquired:
+            await release_shard()
+        await close_async_client()
+        close_client()
+
+
+async def merge_main():
+    """把各分片的已分析记录合并到存储根目录，并发送合并进来的职位的通知"""
+    global storage, root_storage
+
+    print("=== 开始合并分片结果 ===\n")
+
+    storage = root_storage = create_storage_from_env()
+    try:
+        merged, qualified = await merge_shards(
+            storage,
+            notifier=notify_jobs if telegram_configured() else None,
+            profiles=load_profiles_from_env(),
+            notify_batch_size=int(os.getenv("NOTIFY_BATCH_SIZE", "10")),
+        )
+        await write_reports(qualified)
+        await save_metrics(storage)
+        print(
+            f"\n🎉 合并完成！新增 {len(merged)} 条已分析记录，"
+            f"{len(qualified)} 个符合条件的招聘信息"
+        )
+    except Exception as e:
+        logger.error(f"程序执行出错: {e}", exc_info=True)
+    finally:
+        await close_async_client()
+        close_client()
+
+
+def cli():
+    parser = argparse.ArgumentParser(prog="python -m jobs_agent")
+    subparsers = parser.add_subparsers(dest="command")
+    subparsers.add_parser("run", help="抓取并分析一轮后退出（默认）")
+    subparsers.add_parser("daemon", help="常驻运行，按数据源自适应间隔轮询")
+    subparsers.add_parser("merge", help="合并分片运行的结果并发送通知")
+    batch_parser = subparsers.add_parser(
+        "batch", help="把待分析职位提交到 Batch API，并取回已完成的结果"
+    )
+    batch_parser.add_argument(
+        "--wait", action="store_true", help="等待已提交的批处理完成后再退出"
+    )
+    batch_mode = batch_parser.add_mutually_exclusive_group()
+    batch_mode.add_argument(
+        "--collect-only", action="store_true", help="只取回结果，不提交新的批处理"
+    )
+    batch_mode.add_argument(
+        "--fetch",
+        action="store_true",
+        help="先抓取新职位，需要 LLM 分析的与积压职位一起提交，不调用在线接口",
+    )
+    batch_parser.add_argument(
+        "--limit", type=int, default=0, help="最多提交的职位数，默认不限制"
+    )
+    batch_parser.add_argument(
+        "--poll-interval",
+        type=float,
+        default=0,
+        help="轮询间隔秒数，默认 BATCH_POLL_INTERVAL",
+    )
+    batch_parser.add_argument(
+        "--timeout", type=float, default=0, help="--wait 的最长等待秒数，默认不限制"
+    )
+    replay_parser = subparsers.add_parser(
+        "replay", help="用当前提示词和模型重新分析归档的职位，输出结论差异"
+    )
+    replay_parser.add_argument(
+        "--since", type=datetime.fromisoformat, help="抓取时间下限，如 2025-01-01"
+    )
+    replay_parser.add_argument(
+        "--until", type=datetime.fromisoformat, help="抓取时间上限（不含）"
+    )
+    replay_parser.add_argument("--source", help="只重新分析该数据源，如 eleduck")
+    replay_parser.add_argument(
+        "--verdict",
+        choices=["all", "qualified", "rejected"],
+        default="all",
+        help="按历史结论筛选，默认 all",
+    )
+    replay_parser.add_argument(
+        "--include-prefiltered", action="store_true", help="包含被预筛选拒绝的职位"
+    )
+    replay_parser.add_argument(
+        "--include-duplicates", action="store_true", help="包含内容重复的副本"
+    )
+    replay_parser.add_argument(
+        "--limit", type=int, default=0, help="最多重新分析条数，默认不限制"
+    )
+    replay_parser.add_argument(
+        "--workers", type=int, default=0, help="并发数，默认 ANALYSIS_WORKERS"
+    )
+    replay_parser.add_argument(
+        "--output", default="replay_report.json", help="差异报告保存路径（存储内）"
+    )
+    replay_parser.add_argument(
+        "--batch", action="store_true", help="通过 Batch API 分析，等待批处理完成"
+    )
+    args = parser.parse_args()
+
+    if args.command == "daemon":
+        asyncio.run(daemon())
+    elif args.command == "batch":
+        asyncio.run(batch_main(args))
+    elif args.command == "merge":
+        asyncio.run(merge_main())
+    elif args.command == "replay":
+        asyncio.run(replay_main(args))
+    else:
+        asyncio.run(main())
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    cli()
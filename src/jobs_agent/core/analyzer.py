@@ -3,7 +3,10 @@ import logging
 import re
 from datetime import datetime
 from jobs_agent.llm.base import BaseLLM
-from jobs_agent.core.prompt import process_job_data
+from jobs_agent.core.metrics import get_metrics
+from jobs_agent.core.prompt import process_job_data, process_jobs_batch
+from jobs_agent.core.profiles import Profile, qualified_profiles
+from jobs_agent.core.schema import analysis_response_format
 from jobs_agent.sources.base import JobDetail, AnalysisResult, LLMAnalysis
 
 logger = logging.getLogger(__name__)
@@ -37,40 +40,120 @@ def parse_llm_json(text: str) -> LLMAnalysis:
     try:
         return json.loads(text)
     except json.JSONDecodeError:
-        repaired = repair_llm_json(text)
+        metrics = get_metrics()
+        with metrics.timer("llm_json_repair_seconds"):
+            repaired = repair_llm_json(text)
         try:
-            return json.loads(repaired)
+            result = json.loads(repaired)
+            metrics.inc("llm_json_repairs_total", outcome="repaired")
+            return result
         except json.JSONDecodeError as e:
             logger.warning(f"JSON修复后仍解析失败: {e}")
+            metrics.inc("llm_json_repairs_total", outcome="failed")
             raise
 
 
-def analyze_job_with_llm(
-    llm_client: BaseLLM,
-    detail: JobDetail,
-) -> AnalysisResult:
-    prompt_result = process_job_data(detail)
+def _legacy_outcome(llm_response: str) -> str:
+    """
+    按原方式（清理代码块、必要时修复）试解析回复，不计指标
 
-    if not isinstance(llm_client, BaseLLM):
-        raise ValueError("llm_client必须是BaseLLM的实例")
+    返回 ok（直接解析成功）、repair（修复后才能解析）或 retry（仍无法解析，会重新请求）
+    """
+    cleaned = clean_llm_response(llm_response)
+    try:
+        json.loads(cleaned)
+        return "ok"
+    except json.JSONDecodeError:
+        pass
+    try:
+        json.loads(repair_llm_json(cleaned))
+        return "repair"
+    except json.JSONDecodeError:
+        return "retry"
 
-    last_error = None
-    for attempt in range(MAX_RETRIES + 1):
-        llm_response = llm_client.chat(prompt_result["prompt"], keep_history=False)
+
+def _parse_structured(llm_response: str) -> LLMAnalysis | None:
+    """
+    结构化输出的回复直接按 JSON 解析，跳过代码块清理和 JSON 修复
+
+    解析成功的回复再按原方式试解析一次，原方式需要修复或会重新请求的计入
+    llm_retries_avoided_total；解析失败（如回复被 max_tokens 截断）时返回 None，
+    交给常规流程处理
+    """
+    metrics = get_metrics()
+    try:
+        result = json.loads(llm_response)
+    except json.JSONDecodeError:
+        metrics.inc("llm_structured_replies_total", outcome="invalid")
+        return None
+    if not isinstance(result, dict):
+        metrics.inc("llm_structured_replies_total", outcome="invalid")
+        return None
+
+    metrics.inc("llm_structured_replies_total", outcome="ok")
+    legacy = _legacy_outcome(llm_response)
+    if legacy != "ok":
+        metrics.inc("llm_retries_avoided_total", would_have=legacy)
+    return result
+
+
+def parse_analysis_reply(
+    llm_response: str, structured_mode: str = "off"
+) -> LLMAnalysis:
+    """
+    解析单条分析的回复，在线分析和批处理共用
+
+    请求带了 response_format 时先直接按 JSON 解析，失败再走代码块清理和 JSON 修复；
+    仍无法解析时抛出 json.JSONDecodeError
+    """
+    if structured_mode != "off":
+        result = _parse_structured(llm_response)
+        if result is not None:
+            return result
+    return parse_llm_json(clean_llm_response(llm_response))
+
+
+def _parse_attempt(
+    llm_response: str, attempt: int, structured_mode: str = "off"
+) -> LLMAnalysis | None:
+    """解析一次 LLM 回复；可重试的解析失败返回 None，重试次数用完时抛出异常"""
+    try:
+        return parse_analysis_reply(llm_response, structured_mode)
+    except json.JSONDecodeError as e:
+        metrics = get_metrics()
         cleaned_response = clean_llm_response(llm_response)
+        logger.warning(f"第{attempt + 1}次JSON解析失败: {e}")
+        if attempt < MAX_RETRIES:
+            logger.info(f"重试 LLM 调用 ({attempt + 1}/{MAX_RETRIES})")
+            metrics.inc("llm_parse_retries_total", mode=structured_mode)
+            return None
+        logger.error(f"原始响应: {llm_response[:500]}")
+        logger.error(f"清理后响应: {cleaned_response[:500]}")
+        metrics.inc("llm_analyses_total", outcome="parse_failed")
+        raise
 
-        try:
-            cleaned_response_json: LLMAnalysis = parse_llm_json(cleaned_response)
-            break
-        except json.JSONDecodeError as e:
-            last_error = e
-            logger.warning(f"第{attempt + 1}次JSON解析失败: {e}")
-            if attempt < MAX_RETRIES:
-                logger.info(f"重试 LLM 调用 ({attempt + 1}/{MAX_RETRIES})")
-            else:
-                logger.error(f"原始响应: {llm_response[:500]}")
-                logger.error(f"清理后响应: {cleaned_response[:500]}")
-                raise last_error
+
+def build_analysis_result(
+    detail: JobDetail,
+    cleaned_response_json: LLMAnalysis,
+    profiles: list[Profile] | None,
+) -> AnalysisResult:
+    if profiles:
+        # 以逐档案结论为准，符合任一档案即视为符合条件
+        cleaned_response_json["is_qualified"] = bool(
+            qualified_profiles(cleaned_response_json)
+        )
+
+    if not isinstance(cleaned_response_json.get("extracted_info"), dict):
+        # 提示词允许不符合条件时 extracted_info 为 null，统一成空字典
+        cleaned_response_json["extracted_info"] = {}
+
+    get_metrics().inc(
+        "llm_analyses_total",
+        outcome=(
+            "qualified" if cleaned_response_json.get("is_qualified") else "rejected"
+        ),
+    )
 
     source = detail["source"]
     item_id = detail["id"]
@@ -85,3 +168,165 @@ def analyze_job_with_llm(
         "llm_analysis": cleaned_response_json,
         "analyzed_at": datetime.now().isoformat(),
     }
+
+
+def analyze_job_with_llm(
+    llm_client: BaseLLM,
+    detail: JobDetail,
+    profiles: list[Profile] | None = None,
+) -> AnalysisResult:
+    if not isinstance(llm_client, BaseLLM):
+        raise ValueError("llm_client必须是BaseLLM的实例")
+
+    prompt_result = process_job_data(
+        detail, profiles, structured=llm_client.structured_mode != "off"
+    )
+
+    response_format = analysis_response_format(profiles)
+    metrics = get_metrics()
+    for attempt in range(MAX_RETRIES + 1):
+        with metrics.timer("llm_analysis_seconds"):
+            # 重试时跳过缓存，避免反复拿到同一条无法解析的回复
+            llm_response = llm_client.chat(
+                prompt_result["prompt"],
+                keep_history=False,
+                use_cache=attempt == 0,
+                response_format=response_format,
+            )
+        cleaned_response_json = _parse_attempt(
+            llm_response, attempt, llm_client.structured_mode
+        )
+        if cleaned_response_json is not None:
+            break
+
+    return build_analysis_result(detail, cleaned_response_json, profiles)
+
+
+async def analyze_job_with_llm_async(
+    llm_client: BaseLLM,
+    detail: JobDetail,
+    profiles: list[Profile] | None = None,
+) -> AnalysisResult:
+    """analyze_job_with_llm 的异步版本，LLM 请求在事件循环上进行，不占用线程"""
+    if not isinstance(llm_client, BaseLLM):
+        raise ValueError("llm_client必须是BaseLLM的实例")
+
+    prompt_result = process_job_data(
+        detail, profiles, structured=llm_client.structured_mode != "off"
+    )
+
+    response_format = analysis_response_format(profiles)
+    metrics = get_metrics()
+    for attempt in range(MAX_RETRIES + 1):
+        with metrics.timer("llm_analysis_seconds"):
+            llm_response = await llm_client.chat_async(
+                prompt_result["prompt"],
+                keep_history=False,
+                use_cache=attempt == 0,
+                response_format=response_format,
+            )
+        cleaned_response_json = _parse_attempt(
+            llm_response, attempt, llm_client.structured_mode
+        )
+        if cleaned_response_json is not None:
+            break
+
+    return build_analysis_result(detail, cleaned_response_json, profiles)
+
+
+async def analyze_jobs_with_llm_async(
+    llm_client: BaseLLM,
+    details: list[JobDetail],
+    profiles: list[Profile] | None = None,
+    concurrency: int = 4,
+) -> list[AnalysisResult]:
+    """
+    逐条分析一批详情，通过 chat_many 并发请求
+
+    每轮只重发回复无法解析的提示词；请求出错或重试用完仍无法解析的详情记录日志后略过，
+    返回成功的结果
+    """
+    if not isinstance(llm_client, BaseLLM):
+        raise ValueError("llm_client必须是BaseLLM的实例")
+
+    structured = llm_client.structured_mode != "off"
+    prompts = [
+        process_job_data(detail, profiles, structured=structured)["prompt"]
+        for detail in details
+    ]
+    response_format = analysis_response_format(profiles)
+    analyses: list[LLMAnalysis | None] = [None] * len(details)
+    pending = list(range(len(details)))
+    for attempt in range(MAX_RETRIES + 1):
+        replies = await llm_client.chat_many(
+            [prompts[i] for i in pending],
+            concurrency,
+            return_exceptions=True,
+            use_cache=attempt == 0,
+            response_format=response_format,
+        )
+        retry = []
+        for i, reply in zip(pending, replies):
+            if isinstance(reply, BaseException):
+                logger.error(f"分析 {details[i]['id']} 失败: {reply}")
+                continue
+            try:
+                analyses[i] = _parse_attempt(reply, attempt, llm_client.structured_mode)
+            except json.JSONDecodeError as e:
+                logger.error(f"分析 {details[i]['id']} 失败: {e}")
+                continue
+            if analyses[i] is None:
+                retry.append(i)
+        pending = retry
+        if not pending:
+            break
+
+    return [
+        build_analysis_result(detail, analysis, profiles)
+        for detail, analysis in zip(details, analyses)
+        if analysis is not None
+    ]
+
+
+async def analyze_jobs_packed_async(
+    llm_client: BaseLLM,
+    details: list[JobDetail],
+    profiles: list[Profile] | None = None,
+) -> list[AnalysisResult | None]:
+    """
+    一次 LLM 请求分析多条详情
+
+    返回与 details 顺序一致的结果，回复中缺失或格式不对的条目为 None，由调用方逐条补分析；
+    整个回复无法解析为数组时抛出 ValueError。
+    """
+    if not isinstance(llm_client, BaseLLM):
+        raise ValueError("llm_client必须是BaseLLM的实例")
+
+    batch = process_jobs_batch(details, profiles)
+    metrics = get_metrics()
+    with metrics.timer("llm_analysis_seconds"):
+        llm_response = await llm_client.chat_async(
+            batch["prompt"], keep_history=False, max_tokens=1000 * len(details)
+        )
+
+    try:
+        parsed = parse_llm_json(clean_llm_response(llm_response))
+    except json.JSONDecodeError as e:
+        raise ValueError(f"批量分析回复无法解析: {e}") from e
+    if not isinstance(parsed, list):
+        raise ValueError("批量分析回复不是 JSON 数组")
+
+    by_id = {
+        str(item.get("id")): item
+        for item in parsed
+        if isinstance(item, dict) and "is_qualified" in item
+    }
+    results: list[AnalysisResult | None] = []
+    for batch_id, detail in zip(batch["ids"], details):
+        analysis = by_id.get(batch_id)
+        if analysis is None:
+            results.append(None)
+            continue
+        analysis.pop("id", None)
+        results.append(build_analysis_result(detail, analysis, profiles))
+    return results
@@ -0,0 +1,245 @@
+"""
+通过 Batch API 离线分析职位
+
+把待分析职位的提示词（与在线分析相同，来自 process_job_data）连同结构化输出的
+response_format 写成 JSONL 提交到批处理接口，完成后按 custom_id 把回复对回职位，
+经 parse_analysis_reply 解析成与在线分析相同的 AnalysisResult，再交给 ResultSink 走正常的记录/通知流程。
+
+已提交、尚未取回的任务记录在 llm_batches.json，可以提交后退出，下次运行 `batch` 时再取回；
+每个任务的请求、职位详情和结果文件保存在 batches/<名称>/ 下便于排查。
+"""
+
+import json
+import logging
+import os
+from dataclasses import dataclass
+from datetime import datetime
+from typing import NotRequired, Optional, TypedDict
+
+from jobs_agent.core.analyzer import build_analysis_result, parse_analysis_reply
+from jobs_agent.core.metrics import get_metrics
+from jobs_agent.core.profiles import Profile
+from jobs_agent.core.prompt import process_job_data
+from jobs_agent.core.schema import analysis_response_format
+from jobs_agent.llm.batch import TERMINAL_STATUSES, OpenAIBatchClient
+from jobs_agent.llm.openai import OpenAIChat
+from jobs_agent.sources.base import AnalysisResult, JobDetail
+from jobs_agent.storage.base import StorageClient
+
+logger = logging.getLogger(__name__)
+
+BATCHES_PATH = "llm_batches.json"
+BATCH_DIR = "batches"
+
+
+class SubmittedBatch(TypedDict):
+    id: str
+    # batches/ 下的目录名
+    name: str
+    status: str
+    submitted_at: str
+    # 批次内职位的 source:id，在线运行时跳过这些职位
+    ids: list[str]
+    # 提交时请求体使用的结构化输出模式，取回时按同样的方式解析
+    structured_mode: NotRequired[str]
+
+
+@dataclass
+class BatchOutcome:
+    status: str
+    results: list[AnalysisResult]
+    # 没有拿到可解析回复的职位，放回待分析队列
+    failed: list[JobDetail]
+
+
+def _custom_id(detail: JobDetail) -> str:
+    return f"{detail['source']}:{detail['id']}"
+
+
+def build_batch_requests(
+    llm_client: OpenAIChat,
+    details: list[JobDetail],
+    profiles: Optional[list[Profile]],
+    endpoint: str,
+) -> str:
+    """每个职位一行 {custom_id, method, url, body}，body 与在线请求的请求体相同"""
+    response_format = analysis_response_format(profiles)
+    structured = llm_client.structured_mode != "off"
+    lines = []
+    for detail in details:
+        prompt = process_job_data(detail, profiles, structured)["prompt"]
+        lines.append(
+            json.dumps(
+                {
+                    "custom_id": _custom_id(detail),
+                    "method": "POST",
+                    "url": endpoint,
+                    "body": llm_client.payload(prompt, response_format=response_format),
+                },
+                ensure_ascii=False,
+            )
+        )
+    return "\n".join(lines) + "\n"
+
+
+def parse_batch_output(llm_client: OpenAIChat, content: bytes) -> dict[str, str]:
+    """custom_id → 回复内容；出错或状态码非 200 的行跳过"""
+    replies: dict[str, str] = {}
+    for line in content.decode("utf-8").splitlines():
+        if not line.strip():
+            continue
+        try:
+            entry = json.loads(line)
+            response = entry.get("response") or {}
+            if entry.get("error") or response.get("status_code") != 200:
+                logger.warning(
+                    f"批处理请求失败 {entry.get('custom_id')}: "
+                    f"{entry.get('error') or response.get('status_code')}"
+                )
+                continue
+            replies[entry["custom_id"]] = llm_client.completion_content(
+                response["body"]
+            )
+        except (json.JSONDecodeError, KeyError, IndexError, TypeError) as e:
+            logger.warning(f"批处理结果行无法解析，跳过: {e}")
+    return replies
+
+
+async def submit_batch(
+    batch_client: OpenAIBatchClient,
+    llm_client: OpenAIChat,
+    storage: StorageClient,
+    details: list[JobDetail],
+    profiles: Optional[list[Profile]] = None,
+) -> SubmittedBatch:
+    name = f"{datetime.now().strftime('%Y%m%dT%H%M%S')}-{os.getpid()}"
+    requests = build_batch_requests(
+        llm_client, details, profiles, batch_client.endpoint
+    )
+    await storage.write_text(f"{BATCH_DIR}/{name}/requests.jsonl", requests)
+    await storage.write_text(
+        f"{BATCH_DIR}/{name}/details.json", json.dumps(details, ensure_ascii=False)
+    )
+
+    file_id = await batch_client.upload(requests.encode("utf-8"), f"{name}.jsonl")
+    batch = await batch_client.create(file_id, metadata={"name": name})
+    get_metrics().inc("llm_batch_requests_total", len(details))
+    logger.info(f"已提交批处理 {batch['id']}: {len(details)} 个职位")
+    return {
+        "id": batch["id"],
+        "name": name,
+        "status": batch.get("status", "validating"),
+        "submitted_at": datetime.now().isoformat(),
+        "ids": [_custom_id(detail) for detail in details],
+        "structured_mode": llm_client.structured_mode,
+    }
+
+
+async def collect_batch(
+    batch_client: OpenAIBatchClient,
+    llm_client: OpenAIChat,
+    storage: StorageClient,
+    submitted: SubmittedBatch,
+    profiles: Optional[list[Profile]] = None,
+    batch: Optional[dict] = None,
+) -> Optional[BatchOutcome]:
+    """取回已结束的批处理任务，任务仍在运行时返回 None"""
+    if batch is None:
+        batch = await batch_client.retrieve(submitted["id"])
+    status = batch.get("status", "")
+    submitted["status"] = status
+    if status not in TERMINAL_STATUSES:
+        return None
+
+    directory = f"{BATCH_DIR}/{submitted['name']}"
+    details: list[JobDetail] = json.loads(
+        await storage.read_text(f"{directory}/details.json")
+    )
+
+    # expired / cancelled 的任务也可能带有部分结果
+    replies: dict[str, str] = {}
+    if batch.get("output_file_id"):
+        content = await batch_client.content(batch["output_file_id"])
+        await storage.write_file(f"{directory}/output.jsonl", content)
+        replies = parse_batch_output(llm_client, content)
+    if batch.get("error_file_id"):
+        errors = await batch_client.content(batch["error_file_id"])
+        await storage.write_file(f"{directory}/errors.jsonl", errors)
+
+    metrics = get_metrics()
+    # 升级前提交的任务没有记录模式，请求体里也没有 response_format
+    structured_mode = submitted.get("structured_mode", "off")
+    results: list[AnalysisResult] = []
+    failed: list[JobDetail] = []
+    for detail in details:
+        reply = replies.get(_custom_id(detail))
+        if reply is None:
+            failed.append(detail)
+            continue
+        try:
+            analysis = parse_analysis_reply(reply, structured_mode)
+        except json.JSONDecodeError:
+            failed.append(detail)
+            continue
+        results.append(build_analysis_result(detail, analysis, profiles))
+
+    metrics.inc("llm_batch_results_total", len(results), outcome="ok")
+    if failed:
+        metrics.inc("llm_batch_results_total", len(failed), outcome="failed")
+    logger.info(
+        f"批处理 {submitted['id']} {status}: 成功 {len(results)}，失败 {len(failed)}"
+    )
+    return BatchOutcome(status=status, results=results, failed=failed)
+
+
+async def run_batch(
+    batch_client: OpenAIBatchClient,
+    llm_client: OpenAIChat,
+    storage: StorageClient,
+    details: list[JobDetail],
+    profiles: Optional[list[Profile]] = None,
+    poll_interval: float = 30.0,
+) -> list[AnalysisResult]:
+    """提交并等待完成，返回成功的结果；供 replay 这类需要当场拿到结果的场景使用"""
+    submitted = await submit_batch(batch_client, llm_client, storage, details, profiles)
+    print(f"📦 已提交批处理 {submitted['id']}，等待完成...")
+    batch = await batch_client.wait(submitted["id"], poll_interval)
+    outcome = await collect_batch(
+        batch_client, llm_client, storage, submitted, profiles, batch
+    )
+    return outcome.results
+
+
+class BatchStore:
+    """已提交、尚未取回结果的批处理任务"""
+
+    def __init__(self):
+        self.batches: list[SubmittedBatch] = []
+
+    def add(self, submitted: SubmittedBatch) -> None:
+        self.batches.append(submitted)
+
+    def remove(self, batch_id: str) -> None:
+        self.batches = [b for b in self.batches if b["id"] != batch_id]
+
+    def job_ids(self) -> set[str]:
+        return {job_id for batch in self.batches for job_id in batch["ids"]}
+
+    async def load(self, storage: StorageClient, path: str = BATCHES_PATH) -> None:
+        if not await storage.exists(path):
+            return
+        try:
+            self.batches = json.loads(await storage.read_text(path))
+        except Exception as e:
+            logger.warning(f"加载批处理任务记录失败: {e}")
+
+    async def save(self, storage: StorageClient, path: str = BATCHES_PATH) -> None:
+        try:
+            if self.batches:
+                await storage.write_text(
+                    path, json.dumps(self.batches, ensure_ascii=False, indent=2)
+                )
+            elif await storage.exists(path):
+                await storage.unlink(path)
+        except Exception as e:
+            logger.warning(f"保存批处理任务记录失败: {e}")
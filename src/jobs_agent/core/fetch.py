@@ -1,11 +1,17 @@
 import logging
-import requests
 import json
 import os
 import time
 from datetime import datetime
 from urllib.parse import urlparse
 
+import httpx
+
+from jobs_agent.core.http import get_client
+from jobs_agent.core.httpcache import get_http_cache
+from jobs_agent.core.metrics import get_metrics
+from jobs_agent.core.ratelimit import get_rate_limiter, parse_retry_after
+
 logger = logging.getLogger(__name__)
 
 DEFAULT_HEADERS = {
@@ -22,18 +28,30 @@ def _request_with_retry(
 ):
     retries = 0
     delay = base_delay
+    host = urlparse(url).netloc
+    limiter = get_rate_limiter()
+    metrics = get_metrics()
 
     while True:
         try:
-            response = requests.request(method, url, headers=headers, **kwargs)
+            with metrics.timer("http_rate_limit_wait_seconds", host=host):
+                limiter.acquire(host)
+            with metrics.timer("http_request_seconds", host=host):
+                response = get_client().request(method, url, headers=headers, **kwargs)
+            metrics.inc("http_requests_total", host=host, status=response.status_code)
+            retry_after = parse_retry_after(response.headers.get("Retry-After"))
+            limiter.on_response(host, response.status_code, retry_after)
 
             if response.status_code in RETRYABLE_STATUS_CODES and retries < max_retries:
                 retries += 1
+                metrics.inc("http_retries_total", host=host)
+                wait = retry_after if retry_after is not None else delay
+                wait = min(wait, limiter.max_retry_after)
                 logger.warning(
                     f"请求返回 {response.status_code}，第 {retries}/{max_retries} 次重试，"
-                    f"等待 {delay:.1f}s - {url}"
+                    f"等待 {wait:.1f}s - {url}"
                 )
-                time.sleep(delay)
+                time.sleep(wait)
                 delay = min(delay * 2, 60.0)
                 continue
 
@@ -43,12 +61,17 @@ def _request_with_retry(
                 )
                 return None
 
+            if response.status_code == 304:
+                return response
+
             response.raise_for_status()
             return response
 
-        except requests.exceptions.RequestException as e:
+        except httpx.HTTPError as e:
             retries += 1
+            metrics.inc("http_errors_total", host=host, error=type(e).__name__)
             if retries <= max_retries:
+                metrics.inc("http_retries_total", host=host)
                 logger.warning(
                     f"请求失败，第 {retries}/{max_retries} 次重试，等待 {delay:.1f}s - {url} - {e}"
                 )
@@ -62,46 +85,86 @@ def _request_with_retry(
             return None
 
 
-def fetch_page(url, max_retries=3, base_delay=2.0):
-    logger.info(f"fetch_page: {url}")
-    response = _request_with_retry(
-        "GET",
-        url,
-        headers=DEFAULT_HEADERS,
-        max_retries=max_retries,
-        base_delay=base_delay,
-        timeout=30,
-    )
-    if response is None:
-        return None
+JSON_HEADERS = {**DEFAULT_HEADERS, "Accept": "application/json, text/plain, */*"}
 
-    logger.info(f"fetch_page ok: {len(response.text)} chars")
-    return response.text
 
+def _get_text(url, headers, max_retries, base_delay, use_cache):
+    cache = get_http_cache() if use_cache else None
+    if cache:
+        headers = {**headers, **cache.conditional_headers(url)}
 
-def fetch_json(url, max_retries=3, base_delay=2.0):
-    headers = {**DEFAULT_HEADERS, "Accept": "application/json, text/plain, */*"}
-    logger.info(f"fetch_json: {url}")
     response = _request_with_retry(
         "GET",
         url,
         headers=headers,
         max_retries=max_retries,
         base_delay=base_delay,
-        timeout=30,
     )
     if response is None:
-        return None
+        return None, False
+
+    if response.status_code == 304:
+        entry = cache.lookup(url) if cache else None
+        if entry is None:
+            logger.error(f"收到 304 但没有缓存内容: {url}")
+            return None, False
+        logger.info(f"未变化 (304)，使用缓存: {url}")
+        get_metrics().inc("http_cache_hits_total", host=urlparse(url).netloc)
+        return entry["body"], True
+
+    if cache:
+        cache.store(url, response)
+    return response.text, False
 
-    logger.info(f"fetch_json ok: {len(response.text)} chars")
 
+def _parse_json(text):
     try:
-        return json.loads(response.text)
+        return json.loads(text)
     except json.JSONDecodeError as e:
-        logger.error(f"JSON parse failed: {e}, response[:200]: {response.text[:200]}")
+        logger.error(f"JSON parse failed: {e}, response[:200]: {text[:200]}")
         return None
 
 
+def fetch_page_conditional(url, max_retries=3, base_delay=2.0):
+    """带条件请求缓存的 fetch_page，返回 (内容, 是否未变化)"""
+    logger.info(f"fetch_page: {url}")
+    text, unchanged = _get_text(url, DEFAULT_HEADERS, max_retries, base_delay, True)
+    if text is not None and not unchanged:
+        logger.info(f"fetch_page ok: {len(text)} chars")
+    return text, unchanged
+
+
+def fetch_json_conditional(url, max_retries=3, base_delay=2.0):
+    """带条件请求缓存的 fetch_json，返回 (数据, 是否未变化)"""
+    logger.info(f"fetch_json: {url}")
+    text, unchanged = _get_text(url, JSON_HEADERS, max_retries, base_delay, True)
+    if text is None:
+        return None, False
+    if not unchanged:
+        logger.info(f"fetch_json ok: {len(text)} chars")
+    return _parse_json(text), unchanged
+
+
+def fetch_page(url, max_retries=3, base_delay=2.0):
+    logger.info(f"fetch_page: {url}")
+    text, _ = _get_text(url, DEFAULT_HEADERS, max_retries, base_delay, False)
+    if text is None:
+        return None
+
+    logger.info(f"fetch_page ok: {len(text)} chars")
+    return text
+
+
+def fetch_json(url, max_retries=3, base_delay=2.0):
+    logger.info(f"fetch_json: {url}")
+    text, _ = _get_text(url, JSON_HEADERS, max_retries, base_delay, False)
+    if text is None:
+        return None
+
+    logger.info(f"fetch_json ok: {len(text)} chars")
+    return _parse_json(text)
+
+
 def save_content(content, url):
     if not content:
         logger.warning("save_content: no content")
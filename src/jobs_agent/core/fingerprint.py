@@ -0,0 +1,178 @@
+"""
+跨数据源内容去重
+
+同一职位常被同时发到 v2ex 和 eleduck，或换个 id 重发。按 source:id 去重
+识别不出这些副本，每份都要单独调用 LLM、单独发通知。
+这里对归一化后的标题和正文计算指纹，指纹相同的详情直接复用首次的 LLMAnalysis，
+并通过 duplicate_of 关联到原始记录。指纹索引与 analyzed_jobs.json 一起保存。
+精确指纹未命中时，再查询可选的近似重复索引（见 neardup.py）识别稍作修改的重发帖。
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import re
+import unicodedata
+from datetime import datetime
+from typing import Awaitable, Callable, Optional, TypedDict
+
+from jobs_agent.core.metrics import get_metrics
+from jobs_agent.core.neardup import MinHashLSH, minhash_signature
+from jobs_agent.sources.base import AnalysisResult, JobDetail, LLMAnalysis
+from jobs_agent.storage.base import StorageClient
+
+logger = logging.getLogger(__name__)
+
+FINGERPRINT_INDEX_PATH = "content_fingerprints.json"
+
+# 归一化后正文过短时不参与去重，避免空帖、占位帖互相误判
+MIN_CONTENT_LENGTH = 50
+
+_HTML_TAG_RE = re.compile(r"<[^>]+>")
+_URL_RE = re.compile(r"https?://\S+")
+_NON_WORD_RE = re.compile(r"[\W_]+")
+
+
+class FingerprintEntry(TypedDict):
+    id: str
+    llm_analysis: LLMAnalysis
+    analyzed_at: str
+
+
+def normalize_text(text: str) -> str:
+    """去掉 HTML 标签、链接、空白和标点，统一全半角和大小写"""
+    text = unicodedata.normalize("NFKC", text or "")
+    text = _HTML_TAG_RE.sub(" ", text)
+    text = _URL_RE.sub(" ", text)
+    return _NON_WORD_RE.sub("", text.lower())
+
+
+def content_fingerprint(detail: JobDetail) -> Optional[str]:
+    body = normalize_text(detail.get("content", ""))
+    if len(body) < MIN_CONTENT_LENGTH:
+        return None
+    title = normalize_text(detail.get("title", ""))
+    return hashlib.sha256(f"{title}\n{body}".encode("utf-8")).hexdigest()
+
+
+class FingerprintIndex:
+    """指纹 → 首次分析结果；同一轮中并发出现的副本等待首份分析完成后复用"""
+
+    def __init__(self, near: Optional[MinHashLSH] = None):
+        self.near = near
+        self._entries: dict[str, FingerprintEntry] = {}
+        self._inflight: dict[str, asyncio.Future] = {}
+        self._dirty = False
+        self.reused = 0
+
+    def _duplicate(
+        self,
+        detail: JobDetail,
+        entry: FingerprintEntry,
+        similarity: Optional[float] = None,
+    ) -> AnalysisResult:
+        source = detail["source"]
+        global_id = f"{source}:{detail['id']}"
+        self.reused += 1
+        get_metrics().inc(
+            "duplicates_reused_total", kind="exact" if similarity is None else "near"
+        )
+        if similarity is None:
+            similarity = 1.0
+        logger.info(
+            f"内容重复: {global_id} → {entry['id']}（相似度 {similarity:.2f}），复用已有分析结果"
+        )
+        return {
+            "id": global_id,
+            "source": source,
+            "url": detail["url"],
+            "title": detail["title"],
+            "detail": detail,
+            "llm_analysis": entry["llm_analysis"],
+            "analyzed_at": datetime.now().isoformat(),
+            "duplicate_of": entry["id"],
+        }
+
+    async def dedup(
+        self,
+        detail: JobDetail,
+        analyze: Callable[[JobDetail], Awaitable[Optional[AnalysisResult]]],
+    ) -> Optional[AnalysisResult]:
+        """指纹已知时复用已有分析结果，否则调用 analyze 并记录指纹；analyze 返回 None 时不记录"""
+        fingerprint = content_fingerprint(detail)
+        if fingerprint is None:
+            return await analyze(detail)
+
+        if fingerprint in self._entries:
+            return self._duplicate(detail, self._entries[fingerprint])
+
+        inflight = self._inflight.get(fingerprint)
+        if inflight is not None:
+            entry = await asyncio.shield(inflight)
+            if entry is not None:
+                return self._duplicate(detail, entry)
+            return await analyze(detail)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[fingerprint] = future
+        entry = None
+        try:
+            signature = None
+            if self.near is not None:
+                signature = await asyncio.to_thread(
+                    minhash_signature, normalize_text(detail.get("content", ""))
+                )
+                match = self.near.query(signature)
+                if match and match[0] in self._entries:
+                    entry = self._entries[match[0]]
+                    self._entries[fingerprint] = entry
+                    self._dirty = True
+                    return self._duplicate(detail, entry, match[1])
+
+            result = await analyze(detail)
+            if result is None:
+                return None
+            entry = {
+                "id": result["id"],
+                "llm_analysis": result["llm_analysis"],
+                "analyzed_at": result["analyzed_at"],
+            }
+            self._entries[fingerprint] = entry
+            self._dirty = True
+            if signature is not None:
+                self.near.add(fingerprint, signature)
+            return result
+        finally:
+            del self._inflight[fingerprint]
+            future.set_result(entry)
+
+    async def load(
+        self, storage: StorageClient, path: str = FINGERPRINT_INDEX_PATH
+    ) -> None:
+        if self.near is not None:
+            await self.near.load(storage)
+        if not await storage.exists(path):
+            return
+        try:
+            self._entries = json.loads(await storage.read_text(path))
+        except Exception as e:
+            logger.warning(f"加载内容指纹索引失败: {e}")
+            return
+        self._dirty = False
+        logger.info(f"已加载内容指纹索引: {len(self._entries)} 条")
+
+    async def save(
+        self, storage: StorageClient, path: str = FINGERPRINT_INDEX_PATH
+    ) -> None:
+        if self.near is not None:
+            await self.near.save(storage)
+        if not self._dirty:
+            return
+        try:
+            await storage.write_text(
+                path, json.dumps(self._entries, ensure_ascii=False)
+            )
+            self._dirty = False
+        except Exception as e:
+            logger.warning(f"保存内容指纹索引失败: {e}")
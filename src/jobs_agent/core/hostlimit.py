@@ -0,0 +1,22 @@
+import asyncio
+from contextlib import asynccontextmanager
+
+
+class HostLimiter:
+    """按主机限制同时进行的请求数；请求速率由 core.ratelimit 控制"""
+
+    def __init__(self, concurrency: int = 4):
+        self.concurrency = max(1, concurrency)
+        self._semaphores: dict[str, asyncio.Semaphore] = {}
+
+    def _semaphore(self, host: str) -> asyncio.Semaphore:
+        sem = self._semaphores.get(host)
+        if sem is None:
+            sem = asyncio.Semaphore(self.concurrency)
+            self._semaphores[host] = sem
+        return sem
+
+    @asynccontextmanager
+    async def slot(self, host: str):
+        async with self._semaphore(host):
+            yield
@@ -0,0 +1,132 @@
+"""
+共享 HTTP 客户端
+
+所有出站请求（抓取、Telegram）复用同一个 httpx.Client，LLM 请求复用同一个 httpx.AsyncClient：
+按 origin 维护连接池并保持 keep-alive，避免每个请求都重新做 TCP+TLS 握手。
+gzip/deflate 由 httpx 透明解压，安装 brotli 后自动支持 br；
+安装 h2 后可通过 HTTP2_ENABLED 开启 HTTP/2。
+NET_MODE=record/replay 时底层 transport 被替换为录制/回放实现（见 core.netrecord）。
+"""
+
+import importlib.util
+import logging
+import os
+import threading
+
+import httpx
+
+from jobs_agent.core.netrecord import (
+    AsyncReplayTransport,
+    ReplayTransport,
+    wrap_async_transport_from_env,
+    wrap_transport_from_env,
+)
+
+logger = logging.getLogger(__name__)
+
+_client: httpx.Client | None = None
+_async_client: httpx.AsyncClient | None = None
+_lock = threading.Lock()
+
+
+def _env_bool(name: str, default: str = "false") -> bool:
+    return os.getenv(name, default).lower() in ("true", "1", "yes")
+
+
+def _http2_available() -> bool:
+    return importlib.util.find_spec("h2") is not None
+
+
+def _timeout() -> httpx.Timeout:
+    timeout = float(os.getenv("HTTP_TIMEOUT", "30"))
+    connect_timeout = float(os.getenv("HTTP_CONNECT_TIMEOUT", "10"))
+    return httpx.Timeout(timeout, connect=connect_timeout)
+
+
+def _limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=int(os.getenv("HTTP_MAX_CONNECTIONS", "50")),
+        max_keepalive_connections=int(os.getenv("HTTP_MAX_KEEPALIVE", "20")),
+        keepalive_expiry=float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "30")),
+    )
+
+
+def _http2() -> bool:
+    http2 = _env_bool("HTTP2_ENABLED")
+    if http2 and not _http2_available():
+        logger.warning("HTTP2_ENABLED=true 但未安装 h2，回退到 HTTP/1.1")
+        http2 = False
+    return http2
+
+
+def _build_client() -> httpx.Client:
+    limits = _limits()
+    http2 = _http2()
+
+    logger.info(
+        f"初始化 HTTP 客户端: http2={http2}, "
+        f"max_connections={limits.max_connections}, "
+        f"max_keepalive={limits.max_keepalive_connections}"
+    )
+    transport = wrap_transport_from_env(httpx.HTTPTransport(http2=http2, limits=limits))
+    return httpx.Client(
+        transport=transport,
+        timeout=_timeout(),
+        follow_redirects=True,
+        # 回放模式下不能让环境变量里的代理绕过回放 transport
+        trust_env=not isinstance(transport, ReplayTransport),
+    )
+
+
+def _build_async_client() -> httpx.AsyncClient:
+    limits = _limits()
+    http2 = _http2()
+    transport = wrap_async_transport_from_env(
+        lambda: httpx.AsyncHTTPTransport(http2=http2, limits=limits)
+    )
+    return httpx.AsyncClient(
+        transport=transport,
+        timeout=_timeout(),
+        follow_redirects=True,
+        trust_env=not isinstance(transport, AsyncReplayTransport),
+    )
+
+
+def get_client() -> httpx.Client:
+    """返回进程内共享的 HTTP 客户端，首次调用时按环境变量创建"""
+    global _client
+    if _client is None:
+        with _lock:
+            if _client is None:
+                _client = _build_client()
+    return _client
+
+
+def get_async_client() -> httpx.AsyncClient:
+    """
+    返回共享的异步 HTTP 客户端，首次调用时按环境变量创建
+
+    AsyncClient 绑定创建时的事件循环，只能在同一个 asyncio.run 内使用，
+    结束前调用 close_async_client()。
+    """
+    global _async_client
+    if _async_client is None:
+        _async_client = _build_async_client()
+    return _async_client
+
+
+async def close_async_client() -> None:
+    """关闭共享的异步客户端"""
+    global _async_client
+    if _async_client is not None:
+        client, _async_client = _async_client, None
+        await client.aclose()
+
+
+def close_client() -> None:
+    """关闭共享客户端，释放连接池"""
+    global _client
+    with _lock:
+        if _client is not None:
+            _client.close()
+            _client = None
@@ -0,0 +1,127 @@
+"""
+条件请求缓存（ETag / Last-Modified）
+
+缓存列表类请求的校验字段和响应体，下次请求带上 If-None-Match /
+If-Modified-Since，服务端返回 304 时直接复用缓存内容。
+缓存通过 StorageClient 在运行开始时加载、结束时保存，本地和 S3 存储均可用。
+"""
+
+import json
+import logging
+import os
+import threading
+from datetime import datetime
+from typing import TypedDict
+
+import httpx
+
+from jobs_agent.storage.base import StorageClient
+
+logger = logging.getLogger(__name__)
+
+HTTP_CACHE_PATH = "http_cache.json"
+
+
+class CacheEntry(TypedDict):
+    etag: str
+    last_modified: str
+    body: str
+    stored_at: str
+
+
+class HttpCache:
+    """线程安全的条件请求缓存"""
+
+    def __init__(self, enabled: bool = True, max_entries: int = 200):
+        self.enabled = enabled
+        self.max_entries = max_entries
+        self._entries: dict[str, CacheEntry] = {}
+        self._dirty = False
+        self._lock = threading.Lock()
+
+    def lookup(self, url: str) -> CacheEntry | None:
+        with self._lock:
+            return self._entries.get(url)
+
+    def conditional_headers(self, url: str) -> dict[str, str]:
+        if not self.enabled:
+            return {}
+        entry = self.lookup(url)
+        if not entry:
+            return {}
+        headers = {}
+        if entry["etag"]:
+            headers["If-None-Match"] = entry["etag"]
+        if entry["last_modified"]:
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def store(self, url: str, response: httpx.Response) -> None:
+        if not self.enabled:
+            return
+        etag = response.headers.get("ETag", "")
+        last_modified = response.headers.get("Last-Modified", "")
+        if not etag and not last_modified:
+            return
+
+        with self._lock:
+            self._entries[url] = {
+                "etag": etag,
+                "last_modified": last_modified,
+                "body": response.text,
+                "stored_at": datetime.now().isoformat(),
+            }
+            self._dirty = True
+
+    def _evict(self) -> None:
+        if len(self._entries) <= self.max_entries:
+            return
+        newest = sorted(
+            self._entries.items(), key=lambda kv: kv[1]["stored_at"], reverse=True
+        )
+        self._entries = dict(newest[: self.max_entries])
+
+    async def load(self, storage: StorageClient, path: str = HTTP_CACHE_PATH) -> None:
+        if not self.enabled or not await storage.exists(path):
+            return
+        try:
+            entries = json.loads(await storage.read_text(path))
+        except Exception as e:
+            logger.warning(f"加载 HTTP 缓存失败: {e}")
+            return
+
+        with self._lock:
+            self._entries = entries
+            self._dirty = False
+        logger.info(f"已加载 HTTP 缓存: {len(entries)} 条")
+
+    async def save(self, storage: StorageClient, path: str = HTTP_CACHE_PATH) -> None:
+        with self._lock:
+            if not self._dirty:
+                return
+            self._evict()
+            content = json.dumps(self._entries, ensure_ascii=False)
+            self._dirty = False
+
+        try:
+            await storage.write_text(path, content)
+        except Exception as e:
+            logger.warning(f"保存 HTTP 缓存失败: {e}")
+
+
+_cache: HttpCache | None = None
+_cache_lock = threading.Lock()
+
+
+def get_http_cache() -> HttpCache:
+    """返回进程内共享的 HTTP 缓存，首次调用时按环境变量创建"""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = HttpCache(
+                    enabled=os.getenv("HTTP_CACHE_ENABLED", "true").lower()
+                    in ("true", "1", "yes"),
+                    max_entries=int(os.getenv("HTTP_CACHE_MAX_ENTRIES", "200")),
+                )
+    return _cache
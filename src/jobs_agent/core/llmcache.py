@@ -0,0 +1,159 @@
+"""
+LLM 响应缓存
+
+以 (接口地址, 模型, 提示词, 生成参数) 的 sha256 为键缓存 LLM 的回复：崩溃后重跑、
+预算耗尽后下次继续、调试时反复运行同一批职位，都不会为相同的输入重复付费和等待。
+缓存通过 StorageClient 在运行开始时加载、结束时保存，按最近使用时间淘汰，
+超过条数上限、总大小上限或存放时间上限的条目会被移除。
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from typing import TypedDict
+
+from jobs_agent.core.metrics import get_metrics
+from jobs_agent.storage.base import StorageClient
+
+logger = logging.getLogger(__name__)
+
+LLM_CACHE_PATH = "llm_cache.json"
+
+
+class LLMCacheEntry(TypedDict):
+    response: str
+    stored_at: float
+    used_at: float
+
+
+def llm_cache_key(endpoint: str, payload: dict) -> str:
+    """payload 包含模型、消息和全部生成参数，任一变化都对应不同的键"""
+    raw = json.dumps(
+        {"endpoint": endpoint, "payload": payload},
+        ensure_ascii=False,
+        sort_keys=True,
+    )
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class LLMCache:
+    """线程安全的 LLM 响应缓存"""
+
+    def __init__(
+        self,
+        enabled: bool = True,
+        max_entries: int = 2000,
+        max_bytes: int = 20 * 1024 * 1024,
+        ttl_seconds: float = 30 * 86400,
+    ):
+        self.enabled = enabled
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._entries: dict[str, LLMCacheEntry] = {}
+        self._dirty = False
+        self._lock = threading.Lock()
+
+    def _expired(self, entry: LLMCacheEntry, now: float) -> bool:
+        return self.ttl_seconds > 0 and now - entry["stored_at"] > self.ttl_seconds
+
+    def get(self, key: str) -> str | None:
+        if not self.enabled:
+            return None
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self._expired(entry, now):
+                del self._entries[key]
+                self._dirty = True
+                entry = None
+            if entry is not None:
+                entry["used_at"] = now
+                self._dirty = True
+
+        get_metrics().inc("llm_cache_total", outcome="hit" if entry else "miss")
+        return entry["response"] if entry else None
+
+    def put(self, key: str, response: str) -> None:
+        if not self.enabled:
+            return
+        now = time.time()
+        with self._lock:
+            self._entries[key] = {
+                "response": response,
+                "stored_at": now,
+                "used_at": now,
+            }
+            self._dirty = True
+
+    def _evict(self) -> None:
+        now = time.time()
+        entries = [
+            (key, entry)
+            for key, entry in self._entries.items()
+            if not self._expired(entry, now)
+        ]
+        # 最近使用的在前，依次保留直到达到条数或大小上限
+        entries.sort(key=lambda kv: kv[1]["used_at"], reverse=True)
+        kept: dict[str, LLMCacheEntry] = {}
+        total = 0
+        for key, entry in entries[: self.max_entries]:
+            total += len(entry["response"].encode("utf-8"))
+            if self.max_bytes > 0 and total > self.max_bytes:
+                break
+            kept[key] = entry
+
+        evicted = len(self._entries) - len(kept)
+        if evicted:
+            get_metrics().inc("llm_cache_evictions_total", evicted)
+        self._entries = kept
+
+    async def load(self, storage: StorageClient, path: str = LLM_CACHE_PATH) -> None:
+        if not self.enabled or not await storage.exists(path):
+            return
+        try:
+            entries = json.loads(await storage.read_text(path))
+        except Exception as e:
+            logger.warning(f"加载 LLM 缓存失败: {e}")
+            return
+
+        with self._lock:
+            self._entries = entries
+            self._dirty = False
+        logger.info(f"已加载 LLM 缓存: {len(entries)} 条")
+
+    async def save(self, storage: StorageClient, path: str = LLM_CACHE_PATH) -> None:
+        with self._lock:
+            if not self._dirty:
+                return
+            self._evict()
+            content = json.dumps(self._entries, ensure_ascii=False)
+            self._dirty = False
+
+        try:
+            await storage.write_text(path, content)
+        except Exception as e:
+            logger.warning(f"保存 LLM 缓存失败: {e}")
+
+
+_cache: LLMCache | None = None
+_cache_lock = threading.Lock()
+
+
+def get_llm_cache() -> LLMCache:
+    """返回进程内共享的 LLM 缓存，首次调用时按环境变量创建"""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = LLMCache(
+                    enabled=os.getenv("LLM_CACHE_ENABLED", "true").lower()
+                    in ("true", "1", "yes"),
+                    max_entries=int(os.getenv("LLM_CACHE_MAX_ENTRIES", "2000")),
+                    max_bytes=int(float(os.getenv("LLM_CACHE_MAX_MB", "20")) * 1024**2),
+                    ttl_seconds=float(os.getenv("LLM_CACHE_TTL_DAYS", "30")) * 86400,
+                )
+    return _cache
@@ -0,0 +1,234 @@
+"""
+运行指标：计数器、计时器和直方图
+
+各阶段（列表/详情抓取、HTTP 请求、LLM 调用、JSON 修复、存储读写）在代码中打点，
+运行结束时通过 StorageClient 输出 Prometheus textfile 格式和 JSON 摘要，
+便于对延迟和成本回归设置告警。指标名统一加 jobs_agent_ 前缀。
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import TYPE_CHECKING, Iterator
+
+if TYPE_CHECKING:
+    # 存储客户端本身也会打点，运行时导入会形成循环
+    from jobs_agent.storage.base import StorageClient
+
+logger = logging.getLogger(__name__)
+
+METRICS_PREFIX = "jobs_agent_"
+METRICS_PROM_PATH = "metrics/jobs_agent.prom"
+METRICS_JSON_PATH = "metrics/run_summary.json"
+
+DEFAULT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+LabelKey = tuple[tuple[str, str], ...]
+
+
+def _label_key(labels: dict) -> LabelKey:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _format_labels(key: LabelKey, extra: tuple[tuple[str, str], ...] = ()) -> str:
+    pairs = key + extra
+    if not pairs:
+        return ""
+    escaped = (
+        (k, v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for k, v in pairs
+    )
+    return "{" + ",".join(f'{k}="{v}"' for k, v in escaped) + "}"
+
+
+class _Histogram:
+    def __init__(self, buckets: tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+
+    def quantile(self, q: float) -> float:
+        """按桶上界估计分位数，不超过观测到的最大值"""
+        if not self.count:
+            return 0.0
+        target = q * self.count
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= target:
+                return min(bound, self.max)
+        return self.max
+
+
+class Metrics:
+    """线程安全的进程内指标注册表"""
+
+    def __init__(self):
+        self._counters: dict[str, dict[LabelKey, float]] = {}
+        self._histograms: dict[str, dict[LabelKey, _Histogram]] = {}
+        self._lock = threading.Lock()
+        self.started_at = time.time()
+
+    def inc(self, name: str, value: float = 1.0, **labels) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0.0) + value
+
+    def observe(self, name: str, value: float, **labels) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = _Histogram(DEFAULT_BUCKETS)
+            histogram.observe(value)
+
+    def total(self, name: str, **labels) -> float:
+        """计数器中标签包含 labels 的所有序列之和"""
+        wanted = set(_label_key(labels))
+        with self._lock:
+            return sum(
+                value
+                for key, value in self._counters.get(name, {}).items()
+                if wanted.issubset(key)
+            )
+
+    @contextmanager
+    def timer(self, name: str, **labels) -> Iterator[None]:
+        """记录代码块耗时（秒），异常时同样记录"""
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self.observe(name, time.monotonic() - started, **labels)
+
+    def render_prometheus(self) -> str:
+        lines = []
+        with self._lock:
+            for name, series in sorted(self._counters.items()):
+                full_name = f"{METRICS_PREFIX}{name}"
+                lines.append(f"# TYPE {full_name} counter")
+                for key, value in sorted(series.items()):
+                    lines.append(f"{full_name}{_format_labels(key)} {value:g}")
+
+            for name, series in sorted(self._histograms.items()):
+                full_name = f"{METRICS_PREFIX}{name}"
+                lines.append(f"# TYPE {full_name} histogram")
+                for key, histogram in sorted(series.items()):
+                    cumulative = 0
+                    for bound, count in zip(histogram.buckets, histogram.counts):
+                        cumulative += count
+                        le = (("le", f"{bound:g}"),)
+                        lines.append(
+                            f"{full_name}_bucket{_format_labels(key, le)} {cumulative}"
+                        )
+                    inf = (("le", "+Inf"),)
+                    lines.append(
+                        f"{full_name}_bucket{_format_labels(key, inf)} {histogram.count}"
+                    )
+                    lines.append(
+                        f"{full_name}_sum{_format_labels(key)} {histogram.sum:.6f}"
+                    )
+                    lines.append(
+                        f"{full_name}_count{_format_labels(key)} {histogram.count}"
+                    )
+
+        full_name = f"{METRICS_PREFIX}last_run_timestamp_seconds"
+        lines.append(f"# TYPE {full_name} gauge")
+        lines.append(f"{full_name} {time.time():.0f}")
+        return "\n".join(lines) + "\n"
+
+    def summary(self) -> dict:
+        def series_name(name: str, key: LabelKey) -> str:
+            if not key:
+                return name
+            return name + "{" + ",".join(f"{k}={v}" for k, v in key) + "}"
+
+        with self._lock:
+            counters = {
+                series_name(name, key): value
+                for name, series in sorted(self._counters.items())
+                for key, value in sorted(series.items())
+            }
+            timings = {
+                series_name(name, key): {
+                    "count": h.count,
+                    "sum": round(h.sum, 3),
+                    "avg": round(h.sum / h.count, 3) if h.count else 0.0,
+                    "p50": h.quantile(0.5),
+                    "p95": h.quantile(0.95),
+                    "max": round(h.max, 3),
+                }
+                for name, series in sorted(self._histograms.items())
+                for key, h in sorted(series.items())
+            }
+
+        return {
+            "generated_at": datetime.now().isoformat(),
+            "uptime_seconds": round(time.time() - self.started_at, 3),
+            "counters": counters,
+            "timings": timings,
+        }
+
+    async def save(
+        self,
+        storage: "StorageClient",
+        prom_path: str = METRICS_PROM_PATH,
+        json_path: str = METRICS_JSON_PATH,
+    ) -> None:
+        try:
+            await storage.write_text(prom_path, self.render_prometheus())
+            await storage.write_text(
+                json_path, json.dumps(self.summary(), ensure_ascii=False, indent=2)
+            )
+            logger.info(f"已输出运行指标: {prom_path}, {json_path}")
+        except Exception as e:
+            logger.warning(f"输出运行指标失败: {e}")
+
+
+_metrics: Metrics | None = None
+_metrics_lock = threading.Lock()
+
+
+def get_metrics() -> Metrics:
+    """返回进程内共享的指标注册表"""
+    global _metrics
+    if _metrics is None:
+        with _metrics_lock:
+            if _metrics is None:
+                _metrics = Metrics()
+    return _metrics
+
+
+async def save_metrics(storage: "StorageClient") -> None:
+    """
+    按环境变量输出指标
+
+    环境变量:
+        METRICS_ENABLED: 是否输出，默认 true
+        METRICS_PROM_PATH: Prometheus textfile 路径，默认 'metrics/jobs_agent.prom'
+        METRICS_JSON_PATH: JSON 摘要路径，默认 'metrics/run_summary.json'
+    """
+    if os.getenv("METRICS_ENABLED", "true").lower() not in ("true", "1", "yes"):
+        return
+    await get_metrics().save(
+        storage,
+        prom_path=os.getenv("METRICS_PROM_PATH", METRICS_PROM_PATH),
+        json_path=os.getenv("METRICS_JSON_PATH", METRICS_JSON_PATH),
+    )
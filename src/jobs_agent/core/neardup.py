@@ -0,0 +1,176 @@
+"""
+近似重复检测（MinHash + LSH）
+
+招聘方常把同一职位稍作修改后重发，精确指纹无法识别。这里对归一化正文的
+字符 shingle 计算 MinHash 签名，按 band 分桶建立 LSH 索引：查询只比较与新帖
+至少有一个 band 完全相同的候选，不随历史数据量线性增长。
+候选再用签名估计 Jaccard 相似度，达到阈值才视为重复。
+
+索引以 JSON Lines 保存，每次运行只追加新增的签名。
+"""
+
+import array
+import base64
+import hashlib
+import json
+import logging
+import os
+import random
+from typing import Optional
+
+from jobs_agent.storage.base import StorageClient
+
+logger = logging.getLogger(__name__)
+
+NEARDUP_INDEX_PATH = "neardup_index.jsonl"
+
+SHINGLE_SIZE = 5
+NUM_PERM = 64
+BANDS = 8
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+
+# 固定种子，保证已保存的签名在后续运行中仍然可比
+_rng = random.Random(20240601)
+_PERMUTATIONS = [
+    (_rng.randrange(1, _MERSENNE_PRIME), _rng.randrange(0, _MERSENNE_PRIME))
+    for _ in range(NUM_PERM)
+]
+
+
+def _shingle_hashes(normalized: str) -> set[int]:
+    if len(normalized) <= SHINGLE_SIZE:
+        shingles = {normalized}
+    else:
+        shingles = {
+            normalized[i : i + SHINGLE_SIZE]
+            for i in range(len(normalized) - SHINGLE_SIZE + 1)
+        }
+    return {
+        int.from_bytes(
+            hashlib.blake2b(s.encode("utf-8"), digest_size=8).digest(), "big"
+        )
+        for s in shingles
+    }
+
+
+def minhash_signature(normalized: str) -> bytes:
+    """对归一化文本（见 fingerprint.normalize_text）返回 NUM_PERM 个 32 位最小哈希值组成的签名"""
+    hashes = _shingle_hashes(normalized)
+    signature = array.array(
+        "I",
+        (
+            min((a * h + b) % _MERSENNE_PRIME for h in hashes) & _MAX_HASH
+            for a, b in _PERMUTATIONS
+        ),
+    )
+    return signature.tobytes()
+
+
+def estimate_similarity(a: bytes, b: bytes) -> float:
+    sig_a = array.array("I", a)
+    sig_b = array.array("I", b)
+    return sum(x == y for x, y in zip(sig_a, sig_b)) / NUM_PERM
+
+
+class MinHashLSH:
+    """MinHash 签名的 LSH 索引，键为内容指纹"""
+
+    def __init__(self, threshold: float = 0.8):
+        self.threshold = threshold
+        self.rows = NUM_PERM // BANDS
+        self._keys: list[str] = []
+        self._signatures: list[bytes] = []
+        self._buckets: list[dict[int, list[int]]] = [{} for _ in range(BANDS)]
+        self._unsaved: list[int] = []
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def _band_hashes(self, signature: bytes) -> list[int]:
+        width = self.rows * 4
+        return [hash(signature[i * width : (i + 1) * width]) for i in range(BANDS)]
+
+    def _insert(self, key: str, signature: bytes) -> int:
+        index = len(self._keys)
+        self._keys.append(key)
+        self._signatures.append(signature)
+        for band, band_hash in enumerate(self._band_hashes(signature)):
+            self._buckets[band].setdefault(band_hash, []).append(index)
+        return index
+
+    def query(self, signature: bytes) -> Optional[tuple[str, float]]:
+        """返回相似度最高且不低于阈值的已索引键及其相似度"""
+        candidates: set[int] = set()
+        for band, band_hash in enumerate(self._band_hashes(signature)):
+            candidates.update(self._buckets[band].get(band_hash, ()))
+
+        best: Optional[tuple[str, float]] = None
+        for index in candidates:
+            similarity = estimate_similarity(signature, self._signatures[index])
+            if similarity >= self.threshold and (best is None or similarity > best[1]):
+                best = (self._keys[index], similarity)
+        return best
+
+    def add(self, key: str, signature: bytes) -> None:
+        self._unsaved.append(self._insert(key, signature))
+
+    async def load(
+        self, storage: StorageClient, path: str = NEARDUP_INDEX_PATH
+    ) -> None:
+        if not await storage.exists(path):
+            return
+        try:
+            content = await storage.read_text(path)
+        except Exception as e:
+            logger.warning(f"加载近似重复索引失败: {e}")
+            return
+
+        expected = NUM_PERM * 4
+        for line in content.splitlines():
+            if not line.strip():
+                continue
+            try:
+                entry = json.loads(line)
+                signature = base64.b64decode(entry["sig"])
+            except (json.JSONDecodeError, KeyError, ValueError):
+                continue
+            if len(signature) == expected:
+                self._insert(entry["fp"], signature)
+        logger.info(f"已加载近似重复索引: {len(self._keys)} 条")
+
+    async def save(
+        self, storage: StorageClient, path: str = NEARDUP_INDEX_PATH
+    ) -> None:
+        """只追加本次运行新增的签名"""
+        if not self._unsaved:
+            return
+        lines = "".join(
+            json.dumps(
+                {
+                    "fp": self._keys[i],
+                    "sig": base64.b64encode(self._signatures[i]).decode("ascii"),
+                }
+            )
+            + "\n"
+            for i in self._unsaved
+        )
+        try:
+            await storage.append_text(path, lines)
+            self._unsaved = []
+        except Exception as e:
+            logger.warning(f"保存近似重复索引失败: {e}")
+
+
+def create_neardup_index_from_env() -> Optional[MinHashLSH]:
+    """
+    按环境变量创建近似重复索引
+
+    环境变量:
+        NEARDUP_ENABLED: 是否启用，默认 true
+        NEARDUP_THRESHOLD: 判定为重复的估计 Jaccard 相似度，默认 0.8
+    """
+    if os.getenv("NEARDUP_ENABLED", "true").lower() not in ("true", "1", "yes"):
+        return None
+    return MinHashLSH(threshold=float(os.getenv("NEARDUP_THRESHOLD", "0.8")))
@@ -0,0 +1,257 @@
+"""
+网络请求录制/回放
+
+NET_MODE=record 时，共享 HTTP 客户端的每次请求/响应都写入归档目录；
+NET_MODE=replay 时，完全从归档中按录制顺序返回响应，不访问网络，
+用于离线调试和可复现的性能测试。
+
+归档目录结构：
+  index.jsonl              每行一条请求记录（请求指纹、状态码、响应头、body 哈希、耗时）
+  objects/ab/abcdef....gz  gzip 压缩的响应体，按内容 sha256 寻址，相同内容只存一份
+"""
+
+import asyncio
+import gzip
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Callable
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+# 回放时保留的响应头，其余（Set-Cookie、Content-Encoding 等）不录制
+_KEPT_HEADERS = ("content-type", "etag", "last-modified", "retry-after")
+
+_SECRET_IN_URL_RE = re.compile(r"/bot[^/]+/")
+
+
+class ReplayMissError(httpx.TransportError):
+    """回放归档中没有对应请求"""
+
+
+def request_key(request: httpx.Request) -> str:
+    body_hash = hashlib.sha256(request.content).hexdigest()
+    raw = f"{request.method}\n{request.url}\n{body_hash}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def _redact_url(url: str) -> str:
+    return _SECRET_IN_URL_RE.sub("/bot***/", url)
+
+
+class NetArchive:
+    """内容寻址的请求/响应归档"""
+
+    def __init__(self, root: str):
+        self.root = Path(root)
+        self.index_path = self.root / "index.jsonl"
+        self._lock = threading.Lock()
+
+    def _object_path(self, digest: str) -> Path:
+        return self.root / "objects" / digest[:2] / f"{digest}.gz"
+
+    def put_body(self, body: bytes) -> str:
+        digest = hashlib.sha256(body).hexdigest()
+        path = self._object_path(digest)
+        if not path.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_suffix(f".tmp{threading.get_ident()}")
+            tmp_path.write_bytes(gzip.compress(body))
+            os.replace(tmp_path, path)
+        return digest
+
+    def get_body(self, digest: str) -> bytes:
+        return gzip.decompress(self._object_path(digest).read_bytes())
+
+    def append(self, entry: dict) -> None:
+        line = json.dumps(entry, ensure_ascii=False) + "\n"
+        with self._lock:
+            self.root.mkdir(parents=True, exist_ok=True)
+            with open(self.index_path, "a", encoding="utf-8") as f:
+                f.write(line)
+
+    def load_index(self) -> dict[str, list[dict]]:
+        entries: dict[str, list[dict]] = {}
+        if not self.index_path.exists():
+            return entries
+        with open(self.index_path, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    entry = json.loads(line)
+                    entries.setdefault(entry["key"], []).append(entry)
+        return entries
+
+
+class RecordingTransport(httpx.BaseTransport):
+    """透传请求到真实 transport，同时把请求/响应写入归档"""
+
+    def __init__(self, inner: httpx.BaseTransport, archive: NetArchive):
+        self.inner = inner
+        self.archive = archive
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        started = time.monotonic()
+        response = self.inner.handle_request(request)
+        try:
+            body = response.read()
+        finally:
+            response.close()
+        return _record(self.archive, request, response, body, started)
+
+    def close(self) -> None:
+        self.inner.close()
+
+
+class AsyncRecordingTransport(httpx.AsyncBaseTransport):
+    """RecordingTransport 的异步版本，供共享的 AsyncClient 使用"""
+
+    def __init__(self, inner: httpx.AsyncBaseTransport, archive: NetArchive):
+        self.inner = inner
+        self.archive = archive
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        started = time.monotonic()
+        response = await self.inner.handle_async_request(request)
+        try:
+            body = await response.aread()
+        finally:
+            await response.aclose()
+        return _record(self.archive, request, response, body, started)
+
+    async def aclose(self) -> None:
+        await self.inner.aclose()
+
+
+def _record(
+    archive: NetArchive,
+    request: httpx.Request,
+    response: httpx.Response,
+    body: bytes,
+    started: float,
+) -> httpx.Response:
+    elapsed = time.monotonic() - started
+    headers = {k: v for k, v in response.headers.items() if k.lower() in _KEPT_HEADERS}
+    archive.append(
+        {
+            "key": request_key(request),
+            "method": request.method,
+            "url": _redact_url(str(request.url)),
+            "status": response.status_code,
+            "headers": headers,
+            "body": archive.put_body(body),
+            "elapsed": round(elapsed, 4),
+        }
+    )
+    return httpx.Response(
+        response.status_code, headers=headers, content=body, request=request
+    )
+
+
+class ReplayTransport(httpx.BaseTransport):
+    """只从归档返回响应；同一请求多次出现时按录制顺序依次返回，用完后重复最后一条"""
+
+    def __init__(self, archive: NetArchive, latency: str = "0"):
+        self.archive = archive
+        self.latency = latency
+        self._entries = archive.load_index()
+        self._cursors: dict[str, int] = {}
+        self._lock = threading.Lock()
+        logger.info(
+            f"网络回放模式: {archive.root}，{sum(len(v) for v in self._entries.values())} 条记录"
+        )
+
+    def _delay(self, entry: dict) -> float:
+        if self.latency == "recorded":
+            return entry.get("elapsed", 0.0)
+        return float(self.latency)
+
+    def next_entry(self, request: httpx.Request) -> dict:
+        key = request_key(request)
+        with self._lock:
+            candidates = self._entries.get(key)
+            if not candidates:
+                raise ReplayMissError(
+                    f"回放归档中没有该请求: {request.method} {_redact_url(str(request.url))}",
+                    request=request,
+                )
+            index = self._cursors.get(key, 0)
+            self._cursors[key] = index + 1
+            return candidates[min(index, len(candidates) - 1)]
+
+    def response(self, entry: dict, request: httpx.Request) -> httpx.Response:
+        return httpx.Response(
+            entry["status"],
+            headers=entry["headers"],
+            content=self.archive.get_body(entry["body"]),
+            request=request,
+        )
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        entry = self.next_entry(request)
+        delay = self._delay(entry)
+        if delay > 0:
+            time.sleep(delay)
+        return self.response(entry, request)
+
+
+class AsyncReplayTransport(httpx.AsyncBaseTransport):
+    """ReplayTransport 的异步版本，模拟延迟用 asyncio.sleep，不阻塞事件循环"""
+
+    def __init__(self, replay: ReplayTransport):
+        self.replay = replay
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        entry = self.replay.next_entry(request)
+        delay = self.replay._delay(entry)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        return self.replay.response(entry, request)
+
+
+def wrap_transport_from_env(inner: httpx.BaseTransport) -> httpx.BaseTransport:
+    """
+    按环境变量包装 transport
+
+    环境变量:
+        NET_MODE: live（默认）/ record / replay
+        NET_ARCHIVE_DIR: 归档目录，默认 '.data/netarchive'
+        NET_REPLAY_LATENCY: 回放时每个请求的模拟延迟秒数，或 'recorded' 使用录制时的耗时
+    """
+    mode = os.getenv("NET_MODE", "live").lower()
+    archive = NetArchive(os.getenv("NET_ARCHIVE_DIR", ".data/netarchive"))
+
+    if mode == "record":
+        logger.info(f"网络录制模式: {archive.root}")
+        return RecordingTransport(inner, archive)
+    if mode == "replay":
+        inner.close()
+        return ReplayTransport(archive, os.getenv("NET_REPLAY_LATENCY", "0"))
+    return inner
+
+
+def wrap_async_transport_from_env(
+    make_inner: Callable[[], httpx.AsyncBaseTransport],
+) -> httpx.AsyncBaseTransport:
+    """
+    wrap_transport_from_env 的异步版本，环境变量相同
+
+    异步 transport 只能在事件循环里 aclose，这里传入工厂函数，回放模式下不创建底层 transport
+    """
+    mode = os.getenv("NET_MODE", "live").lower()
+    archive = NetArchive(os.getenv("NET_ARCHIVE_DIR", ".data/netarchive"))
+
+    if mode == "replay":
+        return AsyncReplayTransport(
+            ReplayTransport(archive, os.getenv("NET_REPLAY_LATENCY", "0"))
+        )
+    inner = make_inner()
+    if mode == "record":
+        return AsyncRecordingTransport(inner, archive)
+    return inner
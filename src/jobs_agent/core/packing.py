@@ -0,0 +1,164 @@
+"""
+多条职位合并分析
+
+单条分析的提示词里，判断标准和返回格式占了大部分 token，短帖尤其明显。
+JobPacker 把并发到达的详情攒成一批（最多 max_jobs 条、估算 token 不超过 max_tokens），
+用一次 LLM 请求分析，回复中缺失或格式不对的条目再逐条单独分析。
+
+对管线来说 JobPacker.analyze 仍是逐条调用：每条详情等待所在批次完成后拿到自己的结果，
+预算、租约、去重等逐条逻辑不受影响。批次凑不满时最多等待 linger 秒后发出。
+"""
+
+import asyncio
+import logging
+import os
+from typing import Optional
+
+from jobs_agent.core.analyzer import (
+    analyze_job_with_llm_async,
+    analyze_jobs_packed_async,
+)
+from jobs_agent.core.metrics import get_metrics
+from jobs_agent.core.profiles import Profile
+from jobs_agent.llm.base import BaseLLM
+from jobs_agent.sources.base import AnalysisResult, JobDetail
+
+logger = logging.getLogger(__name__)
+
+
+def estimate_tokens(detail: JobDetail) -> int:
+    """粗略估算详情占用的 token：UTF-8 字节数 / 3，中文约一字一 token，英文偏保守"""
+    text = f"{detail.get('title', '')}\n{detail.get('content', '')}"
+    return len(text.encode("utf-8")) // 3 + 1
+
+
+class JobPacker:
+    def __init__(
+        self,
+        llm_client: BaseLLM,
+        profiles: Optional[list[Profile]] = None,
+        max_jobs: int = 4,
+        max_tokens: int = 6000,
+        linger: float = 1.0,
+        concurrency: int = 4,
+    ):
+        self.llm_client = llm_client
+        self.profiles = profiles
+        self.max_jobs = max(1, max_jobs)
+        self.max_tokens = max_tokens
+        self.linger = linger
+        self._semaphore = asyncio.Semaphore(max(1, concurrency))
+        self._batch: list[tuple[JobDetail, asyncio.Future]] = []
+        self._batch_tokens = 0
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks: set[asyncio.Task] = set()
+
+    async def analyze(self, detail: JobDetail) -> AnalysisResult:
+        tokens = estimate_tokens(detail)
+        # 长帖单独分析，合并也省不了多少
+        if self.max_jobs == 1 or tokens * 2 > self.max_tokens:
+            return await self._analyze_one(detail)
+
+        if self._batch and self._batch_tokens + tokens > self.max_tokens:
+            self._flush()
+
+        future = asyncio.get_running_loop().create_future()
+        self._batch.append((detail, future))
+        self._batch_tokens += tokens
+        if len(self._batch) >= self.max_jobs:
+            self._flush()
+        elif self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(
+                self.linger, self._flush
+            )
+        return await future
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._batch, self._batch_tokens = self._batch, [], 0
+        if not batch:
+            return
+        task = asyncio.create_task(self._run(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _analyze_one(self, detail: JobDetail) -> AnalysisResult:
+        async with self._semaphore:
+            return await analyze_job_with_llm_async(
+                self.llm_client, detail, self.profiles
+            )
+
+    async def _analyze_packed(
+        self, details: list[JobDetail]
+    ) -> list[Optional[AnalysisResult]]:
+        metrics = get_metrics()
+        print(f"\n合并分析 {len(details)} 条: {[d['id'] for d in details]}")
+        metrics.inc("llm_pack_jobs_total", len(details))
+        try:
+            async with self._semaphore:
+                results = await analyze_jobs_packed_async(
+                    self.llm_client, details, self.profiles
+                )
+        except Exception as e:
+            logger.warning(f"合并分析失败，逐条重新分析: {e}")
+            metrics.inc("llm_pack_batches_total", outcome="failed")
+            return [None] * len(details)
+
+        missing = results.count(None)
+        metrics.inc("llm_pack_batches_total", outcome="partial" if missing else "ok")
+        if missing:
+            logger.warning(f"合并分析回复缺少 {missing} 条，逐条重新分析")
+        return results
+
+    async def _run(self, batch: list[tuple[JobDetail, asyncio.Future]]) -> None:
+        details = [detail for detail, _ in batch]
+        if len(details) > 1:
+            results = await self._analyze_packed(details)
+        else:
+            results = [None]
+
+        fallback = [i for i, result in enumerate(results) if result is None]
+        if fallback and len(details) > 1:
+            get_metrics().inc("llm_pack_fallbacks_total", len(fallback))
+        outcomes = await asyncio.gather(
+            *(self._analyze_one(details[i]) for i in fallback),
+            return_exceptions=True,
+        )
+
+        for i, outcome in zip(fallback, outcomes):
+            results[i] = outcome
+        for (_, future), result in zip(batch, results):
+            if future.done():
+                continue
+            if isinstance(result, BaseException):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+
+def create_job_packer_from_env(
+    llm_client: BaseLLM,
+    profiles: Optional[list[Profile]] = None,
+    concurrency: int = 4,
+) -> Optional[JobPacker]:
+    """
+    按环境变量创建合并分析器，未开启时返回 None
+
+    环境变量:
+        ANALYSIS_PACK_SIZE: 每次 LLM 请求最多分析的职位数，默认 1（不合并）
+        ANALYSIS_PACK_MAX_TOKENS: 一批职位内容的估算 token 上限，默认 6000
+        ANALYSIS_PACK_LINGER: 批次凑不满时最多等待的秒数，默认 1.0
+    """
+    max_jobs = int(os.getenv("ANALYSIS_PACK_SIZE", "1"))
+    if max_jobs <= 1:
+        return None
+    return JobPacker(
+        llm_client,
+        profiles,
+        max_jobs=max_jobs,
+        max_tokens=int(os.getenv("ANALYSIS_PACK_MAX_TOKENS", "6000")),
+        linger=float(os.getenv("ANALYSIS_PACK_LINGER", "1.0")),
+        concurrency=concurrency,
+    )
@@ -1,44 +1,215 @@
+import asyncio
 import logging
 import os
-import time
+from collections import deque
+from typing import AsyncIterator, Callable, Optional
 
-from jobs_agent.sources.base import BaseSource, JobDetail
+from jobs_agent.core.hostlimit import HostLimiter
+from jobs_agent.core.metrics import get_metrics
+from jobs_agent.sources.base import BaseSource, JobListItem, JobDetail
 
 logger = logging.getLogger(__name__)
 
-DETAIL_DELAY = float(os.getenv("FETCH_DETAIL_DELAY", "3.0"))
 
+_DONE = object()
+
+
+async def _fetch_detail(
+    source: BaseSource,
+    item: JobListItem,
+    limiter: HostLimiter,
+    index: int,
+    total: int,
+    timeout: float,
+) -> Optional[JobDetail]:
+    metrics = get_metrics()
+    try:
+        if source.detail_host is None:
+            with metrics.timer("fetch_detail_seconds", source=source.name):
+                return await asyncio.wait_for(source.fetch_detail_async(item), timeout)
+
+        async with limiter.slot(source.detail_host):
+            logger.info(f"[{source.name}] [{index}/{total}] {item['title']}")
+            with metrics.timer("fetch_detail_seconds", source=source.name):
+                return await asyncio.wait_for(source.fetch_detail_async(item), timeout)
+    except TimeoutError:
+        logger.error(f"[{source.name}] fetch_detail 超时（{timeout}s）{item['id']}")
+        metrics.inc("fetch_failures_total", source=source.name, stage="detail_timeout")
+        return None
+    except Exception as e:
+        logger.error(f"[{source.name}] fetch_detail 异常 {item['id']}: {e}")
+        metrics.inc("fetch_failures_total", source=source.name, stage="detail_error")
+        return None
 
-def fetch_and_parse_all(
-    sources: list[BaseSource],
-    analyzed_ids: set | None = None,
-    detail_delay: float | None = None,
-) -> list[JobDetail]:
-    if detail_delay is None:
-        detail_delay = DETAIL_DELAY
 
-    all_details: list[JobDetail] = []
+async def _produce(
+    source: BaseSource,
+    out: asyncio.Queue,
+    limiter: HostLimiter,
+    analyzed_ids: set | None,
+    window: int,
+    timeout: float,
+    completed: set | None,
+    accept: Callable[[str], bool] | None = None,
+    carried: list[JobListItem] | None = None,
+    remaining: dict[str, JobListItem] | None = None,
+) -> int:
+    metrics = get_metrics()
+    carried = [it for it in carried or [] if it["source"] == source.name]
+    try:
+        with metrics.timer("fetch_list_seconds", source=source.name):
+            items = await asyncio.wait_for(
+                asyncio.to_thread(source.fetch_list), timeout
+            )
+    except TimeoutError:
+        logger.error(f"[{source.name}] fetch_list 超时（{timeout}s），跳过该数据源")
+        metrics.inc("fetch_failures_total", source=source.name, stage="list_timeout")
+        items = None
+    except Exception as e:
+        logger.error(f"[{source.name}] fetch_list 异常，跳过该数据源: {e}")
+        metrics.inc("fetch_failures_total", source=source.name, stage="list_error")
+        items = None
 
-    for source in sources:
-        items = source.fetch_list()
+    if items is None:
+        if not carried:
+            return 0
+        # 列表抓取失败时仍然抓取上次留下的帖子
+        items = []
+    else:
+        metrics.inc("list_items_total", len(items), source=source.name)
+        if completed is not None:
+            completed.add(source.name)
         logger.info(f"[{source.name}] list: {len(items)} items")
 
-        if analyzed_ids:
-            before = len(items)
-            items = [
-                it for it in items if source.global_id(it["id"]) not in analyzed_ids
-            ]
-            logger.info(f"[{source.name}] dedup: skipped {before - len(items)}")
+    if carried:
+        # 上次预算耗尽时未抓取的帖子排在前面，已在列表中的不重复抓取
+        listed_ids = {it["id"] for it in items}
+        items = [it for it in carried if it["id"] not in listed_ids] + items
+        logger.info(f"[{source.name}] carried: {len(carried)} items")
+
+    if analyzed_ids:
+        before = len(items)
+        items = [it for it in items if source.global_id(it["id"]) not in analyzed_ids]
+        logger.info(f"[{source.name}] dedup: skipped {before - len(items)}")
+        metrics.inc("dedup_skipped_total", before - len(items), source=source.name)
+
+    if accept is not None:
+        before = len(items)
+        items = [it for it in items if accept(source.global_id(it["id"]))]
+        logger.info(f"[{source.name}] shard: skipped {before - len(items)}")
+
+    if remaining is not None:
+        for item in items:
+            remaining[source.global_id(item["id"])] = item
+
+    count = 0
+    pending: deque[tuple[JobListItem, asyncio.Task]] = deque()
+
+    async def emit() -> None:
+        nonlocal count
+        item, task = pending[0]
+        detail = await task
+        pending.popleft()
+        if detail:
+            count += 1
+            await out.put(detail)
+        elif remaining is not None:
+            # 抓取失败的帖子不算未抓取，与正常运行时一样等列表下次出现再重试
+            remaining.pop(source.global_id(item["id"]), None)
 
+    try:
         for i, item in enumerate(items, 1):
-            logger.info(f"[{source.name}] [{i}/{len(items)}] {item['title']}")
+            pending.append(
+                (
+                    item,
+                    asyncio.create_task(
+                        _fetch_detail(source, item, limiter, i, len(items), timeout)
+                    ),
+                )
+            )
+            if len(pending) >= window:
+                await emit()
+
+        while pending:
+            await emit()
+    finally:
+        for _, task in pending:
+            task.cancel()
+
+    logger.info(f"[{source.name}] details: {count}")
+    metrics.inc("details_fetched_total", count, source=source.name)
+    return count
+
+
+async def iter_details(
+    sources: list[BaseSource],
+    analyzed_ids: set | None = None,
+    host_concurrency: int | None = None,
+    window: int | None = None,
+    source_timeout: float | None = None,
+    completed: set | None = None,
+    accept: Callable[[str], bool] | None = None,
+    carried: list[JobListItem] | None = None,
+    unfetched: list[JobListItem] | None = None,
+) -> AsyncIterator[JobDetail]:
+    """
+    并发抓取所有数据源，详情到达即产出
+
+    每个数据源独立抓取列表和详情，各自受按主机的并发和限流约束；
+    同一数据源内按列表顺序产出，不同数据源之间按到达先后合并。
+    每个数据源最多 window 个详情请求同时在途，下游消费慢时停止发起新请求。
+    列表抓取和单条详情抓取超过 source_timeout 秒即放弃，
+    某个数据源失败或超时不影响其他数据源。
+
+    Args:
+        completed: 列表抓取成功的数据源名会加入该集合，调用方据此决定是否推进水位线
+        accept: 按 global_id 决定是否抓取详情，分片运行时只保留本分片的职位
+        carried: 上次运行留下的列表项，与各数据源的列表合并后抓取详情
+        unfetched: 调用方提前停止迭代时，已列出但详情尚未产出的列表项会加入该列表
+    """
+    if host_concurrency is None:
+        host_concurrency = int(os.getenv("FETCH_HOST_CONCURRENCY", "4"))
+    if window is None:
+        window = int(os.getenv("FETCH_WINDOW", "16"))
+    if source_timeout is None:
+        source_timeout = float(os.getenv("SOURCE_TIMEOUT", "300"))
+    window = max(1, window)
+
+    limiter = HostLimiter(concurrency=host_concurrency)
+    merged: asyncio.Queue = asyncio.Queue(maxsize=window)
+    remaining: dict[str, JobListItem] = {}
+
+    async def produce_all() -> None:
+        async with asyncio.TaskGroup() as tg:
+            for source in sources:
+                tg.create_task(
+                    _produce(
+                        source,
+                        merged,
+                        limiter,
+                        analyzed_ids,
+                        window,
+                        source_timeout,
+                        completed,
+                        accept,
+                        carried,
+                        remaining,
+                    )
+                )
+        await merged.put(_DONE)
 
-            detail = source.fetch_detail(item)
-            if detail:
-                all_details.append(detail)
+    producer = asyncio.create_task(produce_all())
+    count = 0
+    try:
+        while (detail := await merged.get()) is not _DONE:
+            count += 1
+            remaining.pop(f"{detail['source']}:{detail['id']}", None)
+            yield detail
+        await producer
+    finally:
+        producer.cancel()
+        if unfetched is not None:
+            unfetched.extend(remaining.values())
 
-            if i < len(items) and detail_delay > 0:
-                time.sleep(detail_delay)
+    logger.info(f"iter_details done: {count} details")
 
-    logger.info(f"fetch_and_parse_all done: {len(all_details)} details")
-    return all_details
@@ -0,0 +1,122 @@
+"""
+常驻模式下按数据源自适应调整轮询间隔
+
+每次轮询后用新增帖子数除以距上次轮询的时间估计发帖速率（指数平滑），
+间隔取“预计积累 target_new 个新帖所需时间”，限制在 [min_interval, max_interval]。
+发帖活跃的数据源轮询更频繁，冷清的数据源逐步退避。
+调度状态通过 StorageClient 保存，重启后按上次的节奏继续。
+"""
+
+import json
+import logging
+import os
+import time
+from typing import Optional, TypedDict
+
+from jobs_agent.storage.base import StorageClient
+
+logger = logging.getLogger(__name__)
+
+POLL_SCHEDULE_PATH = "poll_schedule.json"
+
+
+class SourceSchedule(TypedDict):
+    rate: float
+    interval: float
+    last_poll: float
+    next_due: float
+
+
+class PollScheduler:
+    def __init__(
+        self,
+        min_interval: float = 300.0,
+        max_interval: float = 3600.0,
+        target_new: float = 3.0,
+        smoothing: float = 0.3,
+    ):
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.target_new = target_new
+        self.smoothing = smoothing
+        self._schedules: dict[str, SourceSchedule] = {}
+
+    def is_due(self, name: str, now: Optional[float] = None) -> bool:
+        schedule = self._schedules.get(name)
+        if schedule is None:
+            return True
+        return (now or time.time()) >= schedule["next_due"]
+
+    def next_due(self, names: list[str]) -> float:
+        """names 中最早到期的时间戳；有从未轮询过的数据源时返回当前时间"""
+        now = time.time()
+        return min(
+            (
+                self._schedules[name]["next_due"] if name in self._schedules else now
+                for name in names
+            ),
+            default=now + self.max_interval,
+        )
+
+    def record(self, name: str, new_items: int, now: Optional[float] = None) -> float:
+        """记录一次轮询结果，返回该数据源的新间隔（秒）"""
+        now = now or time.time()
+        previous = self._schedules.get(name)
+
+        if previous is None:
+            rate = 0.0
+            interval = self.min_interval
+        else:
+            elapsed = max(now - previous["last_poll"], 1.0)
+            observed = new_items / elapsed
+            rate = self.smoothing * observed + (1 - self.smoothing) * previous["rate"]
+            interval = self.target_new / rate if rate > 0 else self.max_interval
+            interval = min(max(interval, self.min_interval), self.max_interval)
+
+        self._schedules[name] = {
+            "rate": rate,
+            "interval": interval,
+            "last_poll": now,
+            "next_due": now + interval,
+        }
+        logger.info(
+            f"[{name}] 新增 {new_items} 个，估计速率 {rate * 3600:.1f} 个/小时，"
+            f"{interval:.0f}s 后再次轮询"
+        )
+        return interval
+
+    async def load(
+        self, storage: StorageClient, path: str = POLL_SCHEDULE_PATH
+    ) -> None:
+        if not await storage.exists(path):
+            return
+        try:
+            self._schedules = json.loads(await storage.read_text(path))
+        except Exception as e:
+            logger.warning(f"加载轮询调度状态失败: {e}")
+            return
+        logger.info(f"已加载轮询调度状态: {len(self._schedules)} 个数据源")
+
+    async def save(
+        self, storage: StorageClient, path: str = POLL_SCHEDULE_PATH
+    ) -> None:
+        try:
+            await storage.write_text(path, json.dumps(self._schedules, indent=2))
+        except Exception as e:
+            logger.warning(f"保存轮询调度状态失败: {e}")
+
+
+def create_poll_scheduler_from_env() -> PollScheduler:
+    """
+    按环境变量创建轮询调度器
+
+    环境变量:
+        DAEMON_MIN_INTERVAL: 最短轮询间隔秒数，默认 300
+        DAEMON_MAX_INTERVAL: 最长轮询间隔秒数，默认 3600
+        DAEMON_TARGET_NEW: 每次轮询期望积累的新帖数，默认 3
+    """
+    return PollScheduler(
+        min_interval=float(os.getenv("DAEMON_MIN_INTERVAL", "300")),
+        max_interval=float(os.getenv("DAEMON_MAX_INTERVAL", "3600")),
+        target_new=float(os.getenv("DAEMON_TARGET_NEW", "3")),
+    )
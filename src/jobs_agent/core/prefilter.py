@@ -0,0 +1,222 @@
+"""
+LLM 之前的规则预筛选
+
+很多帖子凭结构化标签或列表元数据就能确定不符合条件（外包零活、非远程、
+非开发岗位、人才库求职帖等），无需调用 LLM。规则是声明式的，
+可通过 PREFILTER_RULES 指向的 JSON 文件覆盖默认规则。
+
+规则格式:
+    {
+        "name": "规则名，记录在已分析记录的 filtered_by 中",
+        "source": "可选，只对该数据源生效",
+        "field": "tags.<标签组> | list.<列表字段> | extra.<详情字段> | title",
+        "match": "any | all | none",
+        "keywords": ["..."],
+        "exact": false
+    }
+
+match 含义（字段没有值时规则不生效）:
+    any:  任一值命中关键词即拒绝
+    all:  所有值都命中关键词才拒绝
+    none: 没有任何值命中关键词时拒绝
+exact 为 true 时关键词需与值完全相等，否则按子串匹配。
+"""
+
+import json
+import logging
+import os
+from collections import Counter
+from datetime import datetime
+from typing import Literal, Optional, TypedDict
+
+from jobs_agent.core.metrics import get_metrics
+from jobs_agent.sources.base import AnalysisResult, JobDetail
+
+logger = logging.getLogger(__name__)
+
+
+class PrefilterRule(TypedDict, total=False):
+    name: str
+    source: str
+    field: str
+    match: Literal["any", "all", "none"]
+    keywords: list
+    exact: bool
+
+
+DEFAULT_RULES: list[PrefilterRule] = [
+    {
+        "name": "外包零活",
+        "source": "eleduck",
+        "field": "tags.招聘类型",
+        "match": "any",
+        "keywords": ["外包零活"],
+    },
+    {
+        "name": "非远程",
+        "source": "eleduck",
+        "field": "tags.工作方式",
+        "match": "none",
+        "keywords": ["远程"],
+    },
+    {
+        "name": "非开发岗位",
+        "source": "eleduck",
+        "field": "tags.职业",
+        "match": "all",
+        "keywords": ["产品", "运营", "设计", "市场", "销售", "客服", "行政", "人事"],
+    },
+    {
+        "name": "人才库",
+        "source": "eleduck",
+        "field": "list.category_id",
+        "match": "any",
+        "keywords": ["22"],
+        "exact": True,
+    },
+]
+
+
+def _field_values(detail: JobDetail, field: str) -> list[str]:
+    scope, _, key = field.partition(".")
+    if scope == "tags":
+        for group in detail.get("tags", []):
+            if group.get("category") == key:
+                return [str(v) for v in group.get("values", [])]
+        return []
+    if scope == "list":
+        value = detail.get("list_item", {}).get("extra", {}).get(key)
+    elif scope == "extra":
+        value = detail.get("extra", {}).get(key)
+    else:
+        value = detail.get(scope)
+
+    if value is None or value == "":
+        return []
+    if isinstance(value, list):
+        return [str(v) for v in value]
+    return [str(value)]
+
+
+def _hit(value: str, keywords: list, exact: bool) -> bool:
+    if exact:
+        return any(value == str(k) for k in keywords)
+    return any(str(k) in value for k in keywords)
+
+
+def match_rule(rule: PrefilterRule, detail: JobDetail) -> Optional[list[str]]:
+    """规则命中时返回触发的字段值，否则返回 None"""
+    if rule.get("source") and rule["source"] != detail["source"]:
+        return None
+
+    values = _field_values(detail, rule["field"])
+    if not values:
+        return None
+
+    keywords = rule.get("keywords", [])
+    exact = rule.get("exact", False)
+    hits = [v for v in values if _hit(v, keywords, exact)]
+
+    match = rule.get("match", "any")
+    if match == "any" and hits:
+        return hits
+    if match == "all" and len(hits) == len(values):
+        return values
+    if match == "none" and not hits:
+        return values
+    return None
+
+
+class Prefilter:
+    """按顺序应用规则，第一条命中的规则决定拒绝原因"""
+
+    def __init__(self, rules: list[PrefilterRule], enabled: bool = True):
+        self.rules = rules
+        self.enabled = enabled
+        self.rejected: Counter[str] = Counter()
+
+    @property
+    def saved_calls(self) -> int:
+        return sum(self.rejected.values())
+
+    def check(self, detail: JobDetail) -> Optional[AnalysisResult]:
+        """命中规则时返回不合格的分析结果，否则返回 None 交给 LLM"""
+        if not self.enabled:
+            return None
+
+        for rule in self.rules:
+            values = match_rule(rule, detail)
+            if values is None:
+                continue
+
+            name = rule.get("name", rule["field"])
+            reason = f"预筛选规则[{name}]: {rule['field']}={', '.join(values)}"
+            self.rejected[name] += 1
+            get_metrics().inc("prefilter_rejected_total", rule=name)
+            logger.info(f"[{detail['source']}] 预筛选拒绝 {detail['id']}: {reason}")
+            return {
+                "id": f"{detail['source']}:{detail['id']}",
+                "source": detail["source"],
+                "url": detail["url"],
+                "title": detail["title"],
+                "detail": detail,
+                "llm_analysis": {
+                    "is_qualified": False,
+                    "analysis": {"reasoning": reason},
+                    "extracted_info": {},
+                },
+                "analyzed_at": datetime.now().isoformat(),
+                "filtered_by": name,
+            }
+        return None
+
+    def confidence(self, detail: JobDetail) -> float:
+        """
+        通过预筛选的把握程度：对该数据源生效的规则中，有字段值可供判断的比例
+
+        标签齐全且都通过的帖子为 1.0，缺少标签、只是“没被拒绝”的帖子更低；
+        没有适用规则时返回 0.5。
+        """
+        if not self.enabled:
+            return 0.5
+        rules = [
+            rule
+            for rule in self.rules
+            if not rule.get("source") or rule["source"] == detail["source"]
+        ]
+        if not rules:
+            return 0.5
+        evidenced = sum(1 for rule in rules if _field_values(detail, rule["field"]))
+        return evidenced / len(rules)
+
+    def summary(self) -> str:
+        breakdown = "，".join(f"{k} {v}" for k, v in self.rejected.most_common())
+        return (
+            f"预筛选拒绝 {self.saved_calls} 个，节省 {self.saved_calls} 次 LLM 调用"
+            + (f"（{breakdown}）" if breakdown else "")
+        )
+
+
+def load_rules(path: str) -> list[PrefilterRule]:
+    with open(path, encoding="utf-8") as f:
+        rules = json.load(f)
+    if not isinstance(rules, list):
+        raise ValueError(f"预筛选规则文件必须是 JSON 数组: {path}")
+    return rules
+
+
+def create_prefilter_from_env() -> Prefilter:
+    """
+    按环境变量创建预筛选器
+
+    环境变量:
+        PREFILTER_ENABLED: 是否启用，默认 true
+        PREFILTER_RULES: 规则 JSON 文件路径，不设置时使用 DEFAULT_RULES
+    """
+    enabled = os.getenv("PREFILTER_ENABLED", "true").lower() in ("true", "1", "yes")
+    rules = DEFAULT_RULES
+    rules_path = os.getenv("PREFILTER_RULES", "")
+    if rules_path:
+        rules = load_rules(rules_path)
+        logger.info(f"已加载预筛选规则: {rules_path}，{len(rules)} 条")
+    return Prefilter(rules, enabled=enabled)
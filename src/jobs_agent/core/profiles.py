@@ -0,0 +1,95 @@
+"""
+命名的筛选档案
+
+不同的搜索（薪资下限、技术栈、远程政策）各定义一个档案，同一职位只抓取一次，
+在一次 LLM 调用中按所有档案分别给出结论，结果和通知都按档案区分。
+未配置 PROFILES_FILE 时只使用内置的默认标准，行为与单档案时一致。
+
+档案文件为 JSON 数组:
+    [
+        {
+            "name": "python-remote",
+            "criteria": ["是招聘信息", "是 Python 后端开发", ...],
+            "exclusions": ["排除非远程的工作", ...],
+            "telegram_chat_id": "可选，该档案的通知发到这个 chat"
+        }
+    ]
+"""
+
+import json
+import logging
+import os
+from typing import NotRequired, TypedDict
+
+logger = logging.getLogger(__name__)
+
+
+class Profile(TypedDict):
+    name: str
+    criteria: list[str]
+    exclusions: list[str]
+    telegram_chat_id: NotRequired[str]
+
+
+class ProfileVerdict(TypedDict):
+    is_qualified: bool
+    reasoning: str
+
+
+DEFAULT_PROFILE: Profile = {
+    "name": "default",
+    "criteria": [
+        "是招聘信息",
+        "必须为长期的全职或兼职工作，不能是一次性项目",
+        "是开发类工作，不是非开发类（比如产品运营）",
+    ],
+    "exclusions": [
+        "排除时薪**明显**低于 100 元的工作",
+        "排除预算明确小于 10000 元的工作",
+        "排除明确指出无工资的工作",
+        "排除明确指出工作地点并且非远程的工作",
+        "排除一次性项目",
+    ],
+}
+
+
+def load_profiles(path: str) -> list[Profile]:
+    with open(path, encoding="utf-8") as f:
+        profiles = json.load(f)
+    if not isinstance(profiles, list) or not profiles:
+        raise ValueError(f"档案文件必须是非空 JSON 数组: {path}")
+
+    names = set()
+    for profile in profiles:
+        name = profile.get("name", "")
+        if not name or name in names:
+            raise ValueError(f"档案名为空或重复: {name!r}")
+        names.add(name)
+        profile.setdefault("criteria", [])
+        profile.setdefault("exclusions", [])
+    return profiles
+
+
+def load_profiles_from_env() -> list[Profile]:
+    """
+    按环境变量加载档案
+
+    环境变量:
+        PROFILES_FILE: 档案 JSON 文件路径；不设置时返回空列表，使用内置默认标准
+    """
+    path = os.getenv("PROFILES_FILE", "")
+    if not path:
+        return []
+    profiles = load_profiles(path)
+    logger.info(f"已加载筛选档案: {', '.join(p['name'] for p in profiles)}")
+    return profiles
+
+
+def qualified_profiles(llm_analysis: dict) -> list[str]:
+    """LLM 结论中判定为符合条件的档案名"""
+    verdicts = llm_analysis.get("profiles") or {}
+    return [
+        name
+        for name, verdict in verdicts.items()
+        if isinstance(verdict, dict) and verdict.get("is_qualified")
+    ]
@@ -2,10 +2,95 @@
 招聘信息判断和提取提示词函数
 """
 
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional
 
+from jobs_agent.core.profiles import DEFAULT_PROFILE, Profile
 
-def create_job_analysis_prompt(title: str, content: str, categories: List[Dict]) -> str:
+
+def _format_criteria(profile: Profile) -> str:
+    criteria = "\n".join(
+        f"{i}. {item}" for i, item in enumerate(profile["criteria"], 1)
+    )
+    exclusions = "\n".join(f"- {item}" for item in profile["exclusions"])
+    return (
+        f"需要**全部满足**以下判断标准：\n{criteria}\n\n"
+        f"需要 **排除** 以下情况：\n{exclusions}\n\n"
+    )
+
+
+def _format_categories(categories: List[Dict]) -> str:
+    categories_text = ""
+    if categories:
+        for cat in categories:
+            category_name = cat.get("category", "")
+            values = cat.get("values", [])
+            if category_name and values:
+                categories_text += f"- {category_name}: {', '.join(values)}\n"
+    return categories_text
+
+
+def _criteria_sections(profiles: Optional[List[Profile]]) -> tuple[str, str, str]:
+    """返回 (判断标准, 返回格式中的 profiles 字段, 注意事项中的 profiles 说明)"""
+    if profiles:
+        criteria_text = "## 判断标准：\n\n请按以下每个档案分别判断。\n\n" + "".join(
+            f"### 档案「{profile['name']}」\n\n{_format_criteria(profile)}"
+            for profile in profiles
+        )
+        profiles_format = (
+            '    "profiles": {\n'
+            + ",\n".join(
+                f'        "{profile["name"]}": {{"is_qualified": true/false, "reasoning": "原因（20 字以内）"}}'
+                for profile in profiles
+            )
+            + "\n    },\n"
+        )
+        profiles_note = (
+            "- profiles 中每个档案都要给出结论，is_qualified 表示是否满足任一档案\n"
+        )
+    else:
+        criteria_text = "## 判断标准：\n\n" + _format_criteria(DEFAULT_PROFILE)
+        profiles_format = ""
+        profiles_note = ""
+    return criteria_text, profiles_format, profiles_note
+
+
+def _result_fields(profiles_format: str) -> str:
+    return f"""    "is_qualified": true/false,
+    "analysis": {{
+        "is_recruitment": true/false,
+        "is_long_term": true/false, 
+        "is_development": true/false,
+        "salary_meets_requirement": true/false/null,
+        "reasoning": "详细分析原因（20 字以内，尽量少）"
+    }},
+{profiles_format}    "extracted_info": {{
+        "company_introduction": "公司/产品介绍",
+        "company_website": "公司/产品网站",
+        "job_responsibilities": "职位职责",
+        "skill_requirements": "技能要求", 
+        "salary_benefits": "薪资待遇"
+    }}
+"""
+
+
+_RESULT_NOTES = """- 如果不符合标准，extracted_info 可以为空或null
+- 如果信息中没有明确的薪资信息，salary_meets_requirement 设为 null
+- 尽量从内容中提取具体信息，如果某项信息不存在则标明"未提及"
+"""
+
+# 结构化输出的 schema 要求 extracted_info 的各项都是字符串，不能为 null
+_STRUCTURED_RESULT_NOTES = _RESULT_NOTES.replace(
+    "extracted_info 可以为空或null", "extracted_info 的各项填空字符串"
+)
+
+
+def create_job_analysis_prompt(
+    title: str,
+    content: str,
+    categories: List[Dict],
+    profiles: Optional[List[Profile]] = None,
+    structured: bool = False,
+) -> str:
     """
     创建用于分析招聘信息的提示词
 
@@ -13,19 +98,16 @@ def create_job_analysis_prompt(title: str, content: str, categories: List[Dict])
         title: 文章标题
         content: 文章内容
         categories: 分类标签信息
+        profiles: 筛选档案，为空时使用默认标准；多个档案时要求逐个给出结论
+        structured: 请求是否附带结构化输出的 response_format
 
     Returns:
         str: 格式化的提示词
     """
 
-    # 格式化分类信息
-    categories_text = ""
-    if categories:
-        for cat in categories:
-            category_name = cat.get("category", "")
-            values = cat.get("values", [])
-            if category_name and values:
-                categories_text += f"- {category_name}: {', '.join(values)}\n"
+    categories_text = _format_categories(categories)
+    criteria_text, profiles_format, profiles_note = _criteria_sections(profiles)
+    result_notes = _STRUCTURED_RESULT_NOTES if structured else _RESULT_NOTES
 
     prompt = f"""
 请分析以下招聘信息，判断是否符合标准并提取关键信息。
@@ -39,53 +121,80 @@ def create_job_analysis_prompt(title: str, content: str, categories: List[Dict])
 **分类标签：**
 {categories_text if categories_text else "无"}
 
-## 判断标准：
+{criteria_text}## 请按以下格式返回分析结果：
 
-需要**全部满足**以下判断标准：
-1. 是招聘信息
-2. 必须为长期的全职或兼职工作，不能是一次性项目
-3. 是开发类工作，不是非开发类（比如产品运营）
+```json
+{{
+{_result_fields(profiles_format)}}}
+```
 
-需要 **排除** 以下情况：
-- 排除时薪**明显**低于 100 元的工作
-- 排除预算明确小于 10000 元的工作
-- 排除明确指出无工资的工作
-- 排除明确指出工作地点并且非远程的工作
-- 排除一次性项目
+注意：
+{result_notes}{profiles_note}"""
+
+    return prompt
 
-## 请按以下格式返回分析结果：
+
+def _format_batch_job(job: Dict) -> str:
+    return f"""### 招聘信息 {job["id"]}
+**标题：** {job["title"]}
+
+**内容：**
+{job["content"]}
+
+**分类标签：**
+{_format_categories(job["categories"]) or "无"}
+
+"""
+
+
+def create_jobs_batch_prompt(
+    jobs: List[Dict],
+    profiles: Optional[List[Profile]] = None,
+) -> str:
+    """
+    创建一次分析多条招聘信息的提示词，判断标准和返回格式只出现一次
+
+    Args:
+        jobs: 每项包含 id（批内编号）、title、content、categories
+        profiles: 筛选档案
+
+    Returns:
+        str: 格式化的提示词，要求返回按 id 对应的 JSON 数组
+    """
+
+    criteria_text, profiles_format, profiles_note = _criteria_sections(profiles)
+    jobs_text = "".join(_format_batch_job(job) for job in jobs)
+
+    prompt = f"""
+请逐条分析以下 {len(jobs)} 条招聘信息，分别判断是否符合标准并提取关键信息。
+
+## 输入信息：
+
+{jobs_text}{criteria_text}## 请按以下格式返回分析结果：
+
+返回一个 JSON 数组，每条招聘信息对应一个元素，id 与输入中的编号一致：
 
 ```json
-{{
-    "is_qualified": true/false,
-    "analysis": {{
-        "is_recruitment": true/false,
-        "is_long_term": true/false, 
-        "is_development": true/false,
-        "salary_meets_requirement": true/false/null,
-        "reasoning": "详细分析原因（20 字以内，尽量少）"
-    }},
-    "extracted_info": {{
-        "company_introduction": "公司/产品介绍",
-        "company_website": "公司/产品网站",
-        "job_responsibilities": "职位职责",
-        "skill_requirements": "技能要求", 
-        "salary_benefits": "薪资待遇"
-    }}
-}}
+[
+  {{
+    "id": "招聘信息编号",
+{_result_fields(profiles_format)}  }}
+]
 ```
 
 注意：
-- 如果不符合标准，extracted_info 可以为空或null
-- 如果信息中没有明确的薪资信息，salary_meets_requirement 设为 null
-- 尽量从内容中提取具体信息，如果某项信息不存在则标明"未提及"
-"""
+- 每条招聘信息单独判断，互不影响，数组中必须包含全部 {len(jobs)} 条
+{_RESULT_NOTES}{profiles_note}"""
 
     return prompt
 
 
 def analyze_job_posting(
-    title: str, content: str, categories: List[Dict]
+    title: str,
+    content: str,
+    categories: List[Dict],
+    profiles: Optional[List[Profile]] = None,
+    structured: bool = False,
 ) -> Dict[str, Any]:
     """
     分析招聘信息的工具函数
@@ -94,13 +203,17 @@ def analyze_job_posting(
         title: 文章标题
         content: 文章内容
         categories: 分类标签信息
+        profiles: 筛选档案
+        structured: 请求是否附带结构化输出的 response_format
 
     Returns:
         Dict: 包含分析结果的字典
     """
 
     # 创建提示词
-    prompt = create_job_analysis_prompt(title, content, categories)
+    prompt = create_job_analysis_prompt(
+        title, content, categories, profiles, structured
+    )
 
     # 注意：这里返回提示词，实际使用时需要调用LLM API
     return {
@@ -129,14 +242,18 @@ def extract_categories_from_tags(tags: List[Dict]) -> List[Dict]:
     return categories
 
 
-def process_job_data(job_data: Dict) -> Dict[str, Any]:
+def process_job_data(
+    job_data: Dict,
+    profiles: Optional[List[Profile]] = None,
+    structured: bool = False,
+) -> Dict[str, Any]:
     title = job_data.get("title", "")
     content = job_data.get("content", "")
     tags = job_data.get("tags", [])
 
     categories = extract_categories_from_tags(tags)
 
-    result = analyze_job_posting(title, content, categories)
+    result = analyze_job_posting(title, content, categories, profiles, structured)
 
     result["original_data"] = {
         "extra": job_data.get("extra"),
@@ -146,6 +263,25 @@ def process_job_data(job_data: Dict) -> Dict[str, Any]:
     return result
 
 
+def process_jobs_batch(
+    jobs_data: List[Dict], profiles: Optional[List[Profile]] = None
+) -> Dict[str, Any]:
+    """多条职位详情合并为一个提示词，批内编号从 1 开始，与 jobs_data 顺序一致"""
+    jobs = [
+        {
+            "id": str(index),
+            "title": job_data.get("title", ""),
+            "content": job_data.get("content", ""),
+            "categories": extract_categories_from_tags(job_data.get("tags", [])),
+        }
+        for index, job_data in enumerate(jobs_data, 1)
+    ]
+    return {
+        "prompt": create_jobs_batch_prompt(jobs, profiles),
+        "ids": [job["id"] for job in jobs],
+    }
+
+
 # 示例使用函数
 def example_usage():
     """
@@ -0,0 +1,190 @@
+"""
+按主机的自适应限流
+
+每个主机一个令牌桶，速率按 AIMD 调整：请求正常时线性加速，
+遇到 429/503 时乘性减速并遵守 Retry-After。学到的速率通过 StorageClient
+持久化，下次运行直接从上次的速率开始。
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from email.utils import parsedate_to_datetime
+
+from jobs_agent.storage.base import StorageClient
+
+logger = logging.getLogger(__name__)
+
+RATE_LIMIT_STATE_PATH = "rate_limits.json"
+
+BACKOFF_STATUS_CODES = {429, 503}
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """解析 Retry-After 头（秒数或 HTTP 日期），返回需要等待的秒数"""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, when.timestamp() - time.time())
+
+
+@dataclass
+class _Bucket:
+    rate: float
+    tokens: float
+    updated: float
+    blocked_until: float = 0.0
+
+
+class AdaptiveRateLimiter:
+    """线程安全的按主机令牌桶限流器"""
+
+    def __init__(
+        self,
+        initial_rate: float = 2.0,
+        min_rate: float = 0.2,
+        max_rate: float = 10.0,
+        burst: float = 2.0,
+        increase: float = 0.1,
+        decrease: float = 0.5,
+        max_retry_after: float = 120.0,
+    ):
+        self.initial_rate = initial_rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.burst = max(1.0, burst)
+        self.increase = increase
+        self.decrease = decrease
+        self.max_retry_after = max_retry_after
+        self._buckets: dict[str, _Bucket] = {}
+        self._learned: dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def _clamp(self, rate: float) -> float:
+        return min(self.max_rate, max(self.min_rate, rate))
+
+    def _bucket(self, host: str, now: float) -> _Bucket:
+        bucket = self._buckets.get(host)
+        if bucket is None:
+            rate = self._clamp(self._learned.get(host, self.initial_rate))
+            bucket = _Bucket(rate=rate, tokens=1.0, updated=now)
+            self._buckets[host] = bucket
+        return bucket
+
+    def acquire(self, host: str) -> float:
+        """阻塞直到该主机有可用令牌，返回实际等待的秒数"""
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                bucket = self._bucket(host, now)
+                bucket.tokens = min(
+                    self.burst, bucket.tokens + (now - bucket.updated) * bucket.rate
+                )
+                bucket.updated = now
+
+                if now < bucket.blocked_until:
+                    wait = bucket.blocked_until - now
+                elif bucket.tokens >= 1.0:
+                    bucket.tokens -= 1.0
+                    return waited
+                else:
+                    wait = (1.0 - bucket.tokens) / bucket.rate
+
+            time.sleep(wait)
+            waited += wait
+
+    def on_response(
+        self, host: str, status_code: int, retry_after: float | None = None
+    ) -> None:
+        """根据响应状态调整速率：成功线性加速，429/503 乘性减速"""
+        with self._lock:
+            now = time.monotonic()
+            bucket = self._bucket(host, now)
+
+            if status_code in BACKOFF_STATUS_CODES:
+                old_rate = bucket.rate
+                bucket.rate = self._clamp(bucket.rate * self.decrease)
+                bucket.tokens = 0.0
+                if retry_after is not None:
+                    retry_after = min(retry_after, self.max_retry_after)
+                    bucket.blocked_until = max(bucket.blocked_until, now + retry_after)
+                logger.warning(
+                    f"[{host}] 收到 {status_code}，限速 {old_rate:.2f} → {bucket.rate:.2f} req/s"
+                    + (f"，Retry-After {retry_after:.1f}s" if retry_after else "")
+                )
+            elif status_code < 400:
+                bucket.rate = self._clamp(bucket.rate + self.increase)
+
+            self._learned[host] = bucket.rate
+
+    def rates(self) -> dict[str, float]:
+        with self._lock:
+            return dict(self._learned)
+
+    async def load(
+        self, storage: StorageClient, path: str = RATE_LIMIT_STATE_PATH
+    ) -> None:
+        if not await storage.exists(path):
+            return
+        try:
+            state = json.loads(await storage.read_text(path))
+        except Exception as e:
+            logger.warning(f"加载限流状态失败: {e}")
+            return
+
+        with self._lock:
+            for host, entry in state.get("hosts", {}).items():
+                self._learned[host] = self._clamp(float(entry.get("rate", 0)))
+        logger.info(f"已加载限流状态: {self._learned}")
+
+    async def save(
+        self, storage: StorageClient, path: str = RATE_LIMIT_STATE_PATH
+    ) -> None:
+        updated_at = datetime.now().isoformat()
+        state = {
+            "hosts": {
+                host: {"rate": round(rate, 4), "updated_at": updated_at}
+                for host, rate in self.rates().items()
+            }
+        }
+        try:
+            await storage.write_text(path, json.dumps(state, indent=2))
+        except Exception as e:
+            logger.warning(f"保存限流状态失败: {e}")
+
+
+_limiter: AdaptiveRateLimiter | None = None
+_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter() -> AdaptiveRateLimiter:
+    """返回进程内共享的限流器，首次调用时按环境变量创建"""
+    global _limiter
+    if _limiter is None:
+        with _limiter_lock:
+            if _limiter is None:
+                _limiter = AdaptiveRateLimiter(
+                    initial_rate=float(os.getenv("RATE_LIMIT_INITIAL", "2.0")),
+                    min_rate=float(os.getenv("RATE_LIMIT_MIN", "0.2")),
+                    max_rate=float(os.getenv("RATE_LIMIT_MAX", "10.0")),
+                    burst=float(os.getenv("RATE_LIMIT_BURST", "2")),
+                    increase=float(os.getenv("RATE_LIMIT_INCREASE", "0.1")),
+                    decrease=float(os.getenv("RATE_LIMIT_DECREASE", "0.5")),
+                    max_retry_after=float(
+                        os.getenv("RATE_LIMIT_MAX_RETRY_AFTER", "120")
+                    ),
+                )
+    return _limiter
@@ -0,0 +1,203 @@
+"""
+离线重新分析归档的职位详情
+
+修改提示词或换模型后，从详情归档中按条件选取一批职位，通过 chat_many 并发重新分析，
+与 analyzed_jobs.json 中保存的结论逐条比较，输出结论发生变化的职位。不访问数据源网站，不修改已分析记录，也不发送通知。
+"""
+
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Awaitable, Callable, Literal, Optional, TypedDict
+
+from jobs_agent.core.analyzer import analyze_jobs_with_llm_async
+from jobs_agent.core.profiles import Profile, qualified_profiles
+from jobs_agent.llm.base import BaseLLM
+from jobs_agent.sources.base import AnalysisResult, AnalyzedRecord, JobDetail
+from jobs_agent.storage.archive import ArchivedDetail, DetailArchive
+
+logger = logging.getLogger(__name__)
+
+Verdict = Literal["all", "qualified", "rejected"]
+
+
+@dataclass
+class ReplaySelection:
+    since: Optional[datetime] = None
+    until: Optional[datetime] = None
+    source: Optional[str] = None
+    verdict: Verdict = "all"
+    # 被预筛选规则拒绝的职位从未调用过 LLM，默认不参与比较
+    include_prefiltered: bool = False
+    # 内容重复的副本复用了原记录的结论，默认只重新分析原记录
+    include_duplicates: bool = False
+    limit: int = 0
+
+
+class VerdictDiff(TypedDict):
+    id: str
+    url: str
+    title: str
+    before: Optional[bool]
+    after: bool
+    reason_before: str
+    reason_after: str
+    profiles_before: list[str]
+    profiles_after: list[str]
+
+
+@dataclass
+class ReplayReport:
+    selected: int = 0
+    analyzed: int = 0
+    unchanged: int = 0
+    newly_qualified: int = 0
+    newly_rejected: int = 0
+    profiles_changed: int = 0
+    # 归档中有详情但没有历史记录（例如分析中途失败）
+    no_baseline: int = 0
+    diffs: list[VerdictDiff] = field(default_factory=list)
+
+    @property
+    def failed(self) -> int:
+        return self.selected - self.analyzed
+
+    def summary(self) -> str:
+        return (
+            f"重新分析 {self.analyzed}/{self.selected} 个，结论不变 {self.unchanged} 个，"
+            f"新判定符合 {self.newly_qualified} 个，新判定不符合 {self.newly_rejected} 个，"
+            f"档案结论变化 {self.profiles_changed} 个，无历史结论 {self.no_baseline} 个，"
+            f"失败 {self.failed} 个"
+        )
+
+    def to_dict(self) -> dict:
+        return {
+            "selected": self.selected,
+            "analyzed": self.analyzed,
+            "failed": self.failed,
+            "unchanged": self.unchanged,
+            "newly_qualified": self.newly_qualified,
+            "newly_rejected": self.newly_rejected,
+            "profiles_changed": self.profiles_changed,
+            "no_baseline": self.no_baseline,
+            "diffs": self.diffs,
+        }
+
+
+def _matches(
+    entry: ArchivedDetail,
+    record: Optional[AnalyzedRecord],
+    selection: ReplaySelection,
+) -> bool:
+    if selection.source and entry["detail"]["source"] != selection.source:
+        return False
+    if record is None:
+        return selection.verdict == "all"
+    if "filtered_by" in record and not selection.include_prefiltered:
+        return False
+    if "duplicate_of" in record and not selection.include_duplicates:
+        return False
+    if selection.verdict == "qualified":
+        return record["is_qualified"]
+    if selection.verdict == "rejected":
+        return not record["is_qualified"]
+    return True
+
+
+async def select_details(
+    archive: DetailArchive,
+    history: list[AnalyzedRecord],
+    selection: ReplaySelection,
+) -> list[ArchivedDetail]:
+    """从归档中选出符合条件的详情，同一职位只取最近一次归档"""
+    records = {record["id"]: record for record in history if record.get("id")}
+    latest = await archive.latest(selection.since, selection.until)
+    selected = [
+        entry
+        for entry in latest.values()
+        if _matches(entry, records.get(entry["id"]), selection)
+    ]
+    if selection.limit > 0:
+        selected = selected[: selection.limit]
+    return selected
+
+
+async def replay(
+    llm_client: BaseLLM,
+    entries: list[ArchivedDetail],
+    history: list[AnalyzedRecord],
+    profiles: Optional[list[Profile]] = None,
+    workers: int = 4,
+    analyze_all: Optional[
+        Callable[[list[JobDetail]], Awaitable[list[AnalysisResult]]]
+    ] = None,
+) -> ReplayReport:
+    """
+    并发重新分析 entries，返回与历史结论的差异
+
+    默认通过 chat_many 最多 workers 个并发逐条分析；给定 analyze_all 时（例如通过
+    Batch API）改用它一次分析全部详情。
+    """
+    records = {record["id"]: record for record in history if record.get("id")}
+    report = ReplayReport(selected=len(entries))
+
+    async def compare(result: AnalysisResult) -> None:
+        report.analyzed += 1
+        llm_analysis = result["llm_analysis"]
+        after = bool(llm_analysis.get("is_qualified", False))
+        profiles_after = qualified_profiles(llm_analysis)
+        record = records.get(result["id"])
+
+        if record is None:
+            report.no_baseline += 1
+            before, reason_before, profiles_before = None, "", []
+        else:
+            before = record["is_qualified"]
+            reason_before = record.get("reason", "")
+            profiles_before = record.get("profiles", [])
+
+        if before is None:
+            changed = True
+        elif before != after:
+            changed = True
+            if after:
+                report.newly_qualified += 1
+            else:
+                report.newly_rejected += 1
+        elif "profiles" in llm_analysis and set(profiles_before) != set(profiles_after):
+            changed = True
+            report.profiles_changed += 1
+        else:
+            changed = False
+            report.unchanged += 1
+
+        if not changed:
+            return
+        report.diffs.append(
+            {
+                "id": result["id"],
+                "url": result["url"],
+                "title": result["title"],
+                "before": before,
+                "after": after,
+                "reason_before": reason_before,
+                "reason_after": llm_analysis.get("analysis", {}).get("reasoning", ""),
+                "profiles_before": profiles_before,
+                "profiles_after": profiles_after,
+            }
+        )
+        if before == after:
+            print(f"🔀 {result['id']}: 档案 {profiles_before} → {profiles_after}")
+        else:
+            print(f"{'✅' if after else '❌'} {result['id']}: {before} → {after}")
+
+    if analyze_all is None:
+
+        async def analyze_all(details: list[JobDetail]) -> list[AnalysisResult]:
+            return await analyze_jobs_with_llm_async(
+                llm_client, details, profiles, concurrency=workers
+            )
+
+    for result in await analyze_all([entry["detail"] for entry in entries]):
+        await compare(result)
+    return report
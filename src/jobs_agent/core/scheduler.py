@@ -0,0 +1,346 @@
+"""
+按优先级和预算调度待分析的职位
+
+CI 中一次运行有硬性的墙钟上限，LLM 花费也需要按次封顶。这里:
+
+  - 抓到的详情先进入一个有界的优先级缓冲，按新鲜度、社区信号（eleduck 列表里的
+    点赞/评论/浏览数）和预筛选把握程度排序，先分析最值得分析的职位；
+  - RunBudget 根据已观测的单条耗时和 token 用量判断预算是否即将用完，
+    用完后不再开始新的 LLM 调用，也不再继续抓取；
+  - 未分析的详情和尚未抓取详情的列表项保存到 pending_jobs.json，下次运行优先处理。
+"""
+
+import asyncio
+import heapq
+import itertools
+import json
+import logging
+import math
+import os
+import time
+from contextlib import aclosing
+from datetime import datetime, timezone
+from typing import AsyncIterator, Callable, Optional
+
+from jobs_agent.core.metrics import get_metrics
+from jobs_agent.core.prefilter import Prefilter
+from jobs_agent.sources.base import JobDetail, JobListItem
+from jobs_agent.storage.base import StorageClient
+
+logger = logging.getLogger(__name__)
+
+PENDING_JOBS_PATH = "pending_jobs.json"
+
+# 优先级各项权重，三项均归一化到 [0, 1]
+RECENCY_WEIGHT = 0.5
+SIGNAL_WEIGHT = 0.3
+CONFIDENCE_WEIGHT = 0.2
+
+# 新鲜度半衰期（小时）
+RECENCY_HALF_LIFE_HOURS = 24.0
+# 社区信号达到该值时记满分
+SIGNAL_SATURATION = 500.0
+
+_TIME_FIELDS = ("published_at", "published", "created_at")
+
+
+def _published_at(detail: JobDetail) -> Optional[datetime]:
+    for extra in (
+        detail.get("extra", {}),
+        detail.get("list_item", {}).get("extra", {}),
+    ):
+        for key in _TIME_FIELDS:
+            value = extra.get(key)
+            if not value:
+                continue
+            try:
+                published = datetime.fromisoformat(str(value))
+            except ValueError:
+                continue
+            if published.tzinfo is None:
+                published = published.astimezone()
+            return published
+    return None
+
+
+def _signal(detail: JobDetail) -> float:
+    extra = {**detail.get("list_item", {}).get("extra", {}), **detail.get("extra", {})}
+
+    def count(key: str) -> float:
+        try:
+            return max(float(extra.get(key) or 0), 0.0)
+        except (TypeError, ValueError):
+            return 0.0
+
+    raw = (
+        count("upvotes_count") * 5
+        + count("comments_count") * 2
+        + count("views_count") / 20
+        - count("downvotes_count") * 5
+    )
+    if raw <= 0:
+        return 0.0
+    return min(math.log1p(raw) / math.log1p(SIGNAL_SATURATION), 1.0)
+
+
+def job_priority(
+    detail: JobDetail,
+    prefilter: Optional[Prefilter] = None,
+    now: Optional[datetime] = None,
+) -> float:
+    """越大越优先；没有发布时间的帖子按中等新鲜度处理"""
+    published = _published_at(detail)
+    if published is None:
+        recency = 0.5
+    else:
+        now = now or datetime.now(timezone.utc)
+        age_hours = max((now - published).total_seconds() / 3600, 0.0)
+        recency = 0.5 ** (age_hours / RECENCY_HALF_LIFE_HOURS)
+
+    confidence = prefilter.confidence(detail) if prefilter is not None else 0.5
+    return (
+        RECENCY_WEIGHT * recency
+        + SIGNAL_WEIGHT * _signal(detail)
+        + CONFIDENCE_WEIGHT * confidence
+    )
+
+
+class RunBudget:
+    """
+    单次运行的时间和 token 预算
+
+    开始一条 LLM 分析前调用 admit()：按已完成分析的平均耗时和 token 用量，
+    预计这一条会超出预算时拒绝，并从此保持耗尽状态。
+    time_limit / token_limit 为 0 表示不限制。
+    """
+
+    def __init__(
+        self,
+        time_limit: float = 0.0,
+        token_limit: int = 0,
+        reserve_seconds: float = 30.0,
+        est_job_seconds: float = 20.0,
+        est_job_tokens: int = 2000,
+    ):
+        self.time_limit = time_limit
+        self.token_limit = token_limit
+        self.reserve_seconds = reserve_seconds
+        self.est_job_seconds = est_job_seconds
+        self.est_job_tokens = est_job_tokens
+
+        self.started = time.monotonic()
+        self._tokens_at_start = get_metrics().total("llm_tokens_total")
+        self._completed = 0
+        self._job_seconds = 0.0
+        self._in_flight = 0
+        self.exhausted_reason: Optional[str] = None
+
+    @property
+    def exhausted(self) -> bool:
+        return self.exhausted_reason is not None
+
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started
+
+    def tokens_used(self) -> float:
+        return get_metrics().total("llm_tokens_total") - self._tokens_at_start
+
+    def _job_seconds_estimate(self) -> float:
+        if self._completed:
+            return self._job_seconds / self._completed
+        return self.est_job_seconds
+
+    def _job_tokens_estimate(self) -> float:
+        if self._completed:
+            return self.tokens_used() / self._completed
+        return self.est_job_tokens
+
+    def admit(self) -> bool:
+        """是否还能开始一条新的 LLM 分析；返回 True 时调用方必须在结束后调用 done()"""
+        if self.exhausted:
+            return False
+
+        reason = None
+        if self.time_limit > 0:
+            finish = self.elapsed() + self._job_seconds_estimate()
+            if finish + self.reserve_seconds > self.time_limit:
+                reason = "time"
+        if reason is None and self.token_limit > 0:
+            # 在途的分析尚未计入 token 用量，按估计值预留
+            expected = (
+                self.tokens_used() + (self._in_flight + 1) * self._job_tokens_estimate()
+            )
+            if expected > self.token_limit:
+                reason = "tokens"
+
+        if reason is not None:
+            self.exhausted_reason = reason
+            get_metrics().inc("budget_exhausted_total", reason=reason)
+            if reason == "time":
+                usage = f"已用 {self.elapsed():.0f}s / {self.time_limit:.0f}s"
+            else:
+                usage = f"已用 {self.tokens_used():.0f} / {self.token_limit} tokens"
+            logger.warning(f"预算即将用完，停止开始新的分析: {usage}")
+            return False
+
+        self._in_flight += 1
+        return True
+
+    def cancel(self) -> None:
+        """已 admit 但最终没有调用 LLM"""
+        self._in_flight -= 1
+
+    def done(self, seconds: float) -> None:
+        self._in_flight -= 1
+        self._completed += 1
+        self._job_seconds += seconds
+
+
+def create_run_budget_from_env() -> RunBudget:
+    """
+    按环境变量创建运行预算，从调用时开始计时
+
+    环境变量:
+        RUN_TIME_BUDGET: 单次运行的时间预算秒数，默认 0（不限制）
+        RUN_TOKEN_BUDGET: 单次运行的 LLM token 预算，默认 0（不限制）
+        RUN_BUDGET_RESERVE: 为保存状态预留的秒数，默认 30
+        RUN_EST_JOB_SECONDS: 尚无观测数据时单条分析的预估耗时，默认 20
+        RUN_EST_JOB_TOKENS: 尚无观测数据时单条分析的预估 token 数，默认 2000
+    """
+    return RunBudget(
+        time_limit=float(os.getenv("RUN_TIME_BUDGET", "0")),
+        token_limit=int(os.getenv("RUN_TOKEN_BUDGET", "0")),
+        reserve_seconds=float(os.getenv("RUN_BUDGET_RESERVE", "30")),
+        est_job_seconds=float(os.getenv("RUN_EST_JOB_SECONDS", "20")),
+        est_job_tokens=int(os.getenv("RUN_EST_JOB_TOKENS", "2000")),
+    )
+
+
+class PendingJobs:
+    """
+    上次运行因预算耗尽未分析的职位，按 source:id 去重
+
+    已抓到详情的保存详情；还没来得及抓取详情的保存列表项，下次运行重新抓取。
+    列表页可能已被 HTTP 缓存标记为未变化、水位线也可能已越过它们，不能指望下次列表里还有。
+    """
+
+    def __init__(self):
+        self._details: dict[str, JobDetail] = {}
+        self._items: dict[str, JobListItem] = {}
+
+    def __len__(self) -> int:
+        return len(self._details) + len(self._items)
+
+    def add(self, detail: JobDetail) -> None:
+        key = f"{detail['source']}:{detail['id']}"
+        self._items.pop(key, None)
+        self._details[key] = detail
+
+    def add_item(self, item: JobListItem) -> None:
+        key = f"{item['source']}:{item['id']}"
+        if key not in self._details:
+            self._items[key] = item
+
+    def take_all(self) -> list[JobDetail]:
+        details = list(self._details.values())
+        self._details = {}
+        return details
+
+    def take_items(self) -> list[JobListItem]:
+        items = list(self._items.values())
+        self._items = {}
+        return items
+
+    async def load(self, storage: StorageClient, path: str = PENDING_JOBS_PATH) -> None:
+        if not await storage.exists(path):
+            return
+        try:
+            data = json.loads(await storage.read_text(path))
+        except Exception as e:
+            logger.warning(f"加载待分析职位失败: {e}")
+            return
+        # 旧格式只有详情列表
+        if isinstance(data, list):
+            data = {"details": data}
+        for detail in data.get("details", []):
+            self.add(detail)
+        for item in data.get("items", []):
+            self.add_item(item)
+        logger.info(
+            f"已加载上次未分析的职位: {len(self._details)} 个详情，"
+            f"{len(self._items)} 个未抓取"
+        )
+
+    async def save(self, storage: StorageClient, path: str = PENDING_JOBS_PATH) -> None:
+        try:
+            if self:
+                data = {
+                    "details": list(self._details.values()),
+                    "items": list(self._items.values()),
+                }
+                await storage.write_text(path, json.dumps(data, ensure_ascii=False))
+            elif await storage.exists(path):
+                await storage.unlink(path)
+        except Exception as e:
+            logger.warning(f"保存待分析职位失败: {e}")
+
+
+async def prioritized(
+    details: AsyncIterator[JobDetail],
+    priority: Callable[[JobDetail], float],
+    budget: RunBudget,
+    pending: PendingJobs,
+    carried: Optional[list[JobDetail]] = None,
+    window: int = 64,
+) -> AsyncIterator[JobDetail]:
+    """
+    在最多 window 条的缓冲内按优先级重排详情
+
+    上游已抓到的详情先收进缓冲，下游来取时交出优先级最高的一条；上游暂时没有现成的
+    详情时不等待抓取，直接交出缓冲中最好的，分析不会因为攒满缓冲而推迟。
+    carried（上次留下的详情）与新抓到的详情一起排序。预算耗尽后停止抓取，
+    缓冲中剩余的详情放回 pending。
+    """
+    heap: list[tuple[float, int, JobDetail]] = []
+    seq = itertools.count()
+
+    def push(detail: JobDetail) -> None:
+        heapq.heappush(heap, (-priority(detail), next(seq), detail))
+
+    for detail in carried or []:
+        push(detail)
+
+    fetch: Optional[asyncio.Future] = None
+    upstream_done = False
+    async with aclosing(details) as stream:
+        try:
+            while not budget.exhausted:
+                if fetch is None and not upstream_done:
+                    fetch = asyncio.ensure_future(anext(stream))
+                    # 让抓取先走一步：上游已有现成的详情时这里就完成了
+                    await asyncio.sleep(0)
+                # 缓冲为空时等上游；上游有现成的详情且缓冲未满时先收下
+                if fetch is not None and (
+                    not heap or (fetch.done() and len(heap) < window)
+                ):
+                    try:
+                        push(await fetch)
+                    except StopAsyncIteration:
+                        upstream_done = True
+                    fetch = None
+                    continue
+                if not heap:
+                    break
+                yield heapq.heappop(heap)[2]
+        finally:
+            if fetch is not None:
+                if not fetch.done():
+                    fetch.cancel()
+                try:
+                    # 已取出但没来得及交出的详情与缓冲一起放回 pending
+                    push(await fetch)
+                except (asyncio.CancelledError, StopAsyncIteration):
+                    pass
+
+    for _, _, detail in heap:
+        pending.add(detail)
@@ -0,0 +1,83 @@
+"""
+由 TypedDict 生成 LLM 结构化输出使用的 JSON Schema
+
+接口支持 response_format 时，分析请求附带由 LLMAnalysis 生成的严格（strict）Schema，
+回复保证是符合该结构的合法 JSON，不再需要去除代码块、修复 JSON 和因解析失败重试。
+严格模式要求每个对象列出全部字段并禁止额外字段，因此可选字段（NotRequired）不生成；
+profiles 这类以档案名为键的字段按当前配置的档案逐个展开。
+"""
+
+import types
+from typing import Optional, Union, get_args, get_origin, is_typeddict
+
+from jobs_agent.core.profiles import Profile, ProfileVerdict
+from jobs_agent.sources.base import LLMAnalysis
+
+_SCALAR_TYPES = {bool: "boolean", str: "string", int: "integer", float: "number"}
+
+
+def _object_schema(properties: dict) -> dict:
+    return {
+        "type": "object",
+        "properties": properties,
+        "required": list(properties),
+        "additionalProperties": False,
+    }
+
+
+def type_schema(tp) -> dict:
+    """单个类型注解对应的 Schema，支持标量、Optional、list 和嵌套 TypedDict"""
+    if is_typeddict(tp):
+        return typed_dict_schema(tp)
+    if tp in _SCALAR_TYPES:
+        return {"type": _SCALAR_TYPES[tp]}
+
+    origin = get_origin(tp)
+    args = get_args(tp)
+    if origin in (Union, types.UnionType):
+        members = [arg for arg in args if arg is not type(None)]
+        if len(members) == 1 and members[0] in _SCALAR_TYPES:
+            schema = type_schema(members[0])
+            if len(members) < len(args):
+                schema["type"] = [schema["type"], "null"]
+            return schema
+    if origin is list and len(args) == 1:
+        return {"type": "array", "items": type_schema(args[0])}
+
+    raise TypeError(f"无法为类型 {tp!r} 生成严格模式的 JSON Schema")
+
+
+def typed_dict_schema(cls) -> dict:
+    """TypedDict 的对象 Schema，只包含必填字段"""
+    annotations = cls.__annotations__
+    return _object_schema(
+        {
+            name: type_schema(annotations[name])
+            for name in annotations
+            if name in cls.__required_keys__
+        }
+    )
+
+
+def analysis_schema(profiles: Optional[list[Profile]] = None) -> dict:
+    """单条职位分析回复的 Schema；配置了档案时要求逐个档案给出结论"""
+    schema = typed_dict_schema(LLMAnalysis)
+    if profiles:
+        verdict = typed_dict_schema(ProfileVerdict)
+        schema["properties"]["profiles"] = _object_schema(
+            {profile["name"]: verdict for profile in profiles}
+        )
+        schema["required"].append("profiles")
+    return schema
+
+
+def analysis_response_format(profiles: Optional[list[Profile]] = None) -> dict:
+    """chat/completions 的 response_format 参数"""
+    return {
+        "type": "json_schema",
+        "json_schema": {
+            "name": "job_analysis",
+            "strict": True,
+            "schema": analysis_schema(profiles),
+        },
+    }
@@ -0,0 +1,300 @@
+"""
+多进程/多节点分片运行
+
+SHARD_COUNT 个 worker 共用同一个存储后端，按 global_id 的哈希划分职位：
+每个 worker 仍抓取全部列表，但只抓取和分析属于自己分片的详情。
+
+  - 分析前在 leases/ 下以条件写入（S3 If-None-Match，本地硬链接）认领职位，
+    同一分片误启动多个 worker、或调整分片数后新旧划分重叠时，也不会重复分析；
+    租约过期（worker 崩溃）后可被接管，接管同样通过条件写入保证只有一个赢家。
+  - 各分片的状态和输出写在 shards/<index>/ 下，互不覆盖；worker 启动时先认领
+    分片级租约，同一分片已有 worker 在运行时直接退出；
+    符合条件的职位追加到 shards/<index>/qualified.jsonl，worker 本身不发通知。
+  - `python -m jobs_agent merge` 把各分片的已分析记录合并进 analyzed_jobs.json，
+    发送合并进来的职位的通知并清理其租约；worker 下次启动时删除已合并的分片输出。
+"""
+
+import hashlib
+import json
+import logging
+import os
+import socket
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Optional
+
+from jobs_agent.core.sink import ANALYZED_JOBS_PATH, Notifier, ResultSink, load_history
+from jobs_agent.core.profiles import Profile
+from jobs_agent.sources.base import AnalysisResult, AnalyzedRecord
+from jobs_agent.storage.base import StorageClient
+from jobs_agent.storage.journal import RecordJournal
+from jobs_agent.storage.prefixed import PrefixedStorageClient
+
+logger = logging.getLogger(__name__)
+
+SHARDS_DIR = "shards"
+LEASES_DIR = "leases"
+QUALIFIED_PATH = "qualified.jsonl"
+
+
+def shard_of(global_id: str, count: int) -> int:
+    digest = hashlib.sha1(global_id.encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big") % count
+
+
+@dataclass
+class ShardConfig:
+    index: int
+    count: int
+    worker_id: str
+    lease_ttl: float = 3600.0
+
+    @property
+    def prefix(self) -> str:
+        return f"{SHARDS_DIR}/{self.index}"
+
+    @property
+    def lease_key(self) -> str:
+        """分片级租约，同一分片同时只允许一个 worker 运行"""
+        return f"{SHARDS_DIR}/{self.index}"
+
+    def owns(self, global_id: str) -> bool:
+        return shard_of(global_id, self.count) == self.index
+
+
+def create_shard_from_env() -> Optional[ShardConfig]:
+    """
+    按环境变量创建分片配置，未分片时返回 None
+
+    环境变量:
+        SHARD_COUNT: 分片总数，默认 1（不分片）
+        SHARD_INDEX: 本 worker 的分片序号，0 ~ SHARD_COUNT-1
+        SHARD_WORKER_ID: 写入租约的 worker 标识，默认 主机名-进程号
+        SHARD_LEASE_TTL: 租约有效秒数，超时后其他 worker 可接管，默认 3600
+    """
+    count = int(os.getenv("SHARD_COUNT", "1"))
+    if count <= 1:
+        return None
+    index = int(os.getenv("SHARD_INDEX", "0"))
+    if not 0 <= index < count:
+        raise ValueError(f"SHARD_INDEX 必须在 0 ~ {count - 1} 之间: {index}")
+    return ShardConfig(
+        index=index,
+        count=count,
+        worker_id=os.getenv("SHARD_WORKER_ID", f"{socket.gethostname()}-{os.getpid()}"),
+        lease_ttl=float(os.getenv("SHARD_LEASE_TTL", "3600")),
+    )
+
+
+def _lease_dir(global_id: str) -> str:
+    digest = hashlib.sha1(global_id.encode("utf-8")).hexdigest()
+    return f"{LEASES_DIR}/{digest}"
+
+
+class LeaseManager:
+    """
+    职位级租约
+
+    leases/<sha1(global_id)>/lease.json 记录持有者和过期时间。接管过期租约时先条件创建
+    takeover-<旧 token>，只有创建成功的 worker 才能覆盖 lease.json。
+    """
+
+    def __init__(self, storage: StorageClient, worker_id: str, ttl: float = 3600.0):
+        self.storage = storage
+        self.worker_id = worker_id
+        self.ttl = ttl
+        self.claimed = 0
+        self.contended = 0
+        # 本实例最近写入的各租约 token，续期时据此确认租约仍归自己
+        self._tokens: dict[str, str] = {}
+
+    def _lease(self, global_id: str) -> dict:
+        return {
+            "id": global_id,
+            "worker": self.worker_id,
+            "token": uuid.uuid4().hex,
+            "expires_at": time.time() + self.ttl,
+        }
+
+    async def claim(self, global_id: str) -> bool:
+        directory = _lease_dir(global_id)
+        path = f"{directory}/lease.json"
+        lease = self._lease(global_id)
+        if await self.storage.write_file_if_absent(path, json.dumps(lease)):
+            self._tokens[global_id] = lease["token"]
+            self.claimed += 1
+            return True
+
+        try:
+            current = json.loads(await self.storage.read_text(path))
+        except Exception as e:
+            logger.warning(f"读取租约失败，跳过 {global_id}: {e}")
+            self.contended += 1
+            return False
+
+        if current.get("expires_at", 0) > time.time():
+            logger.info(f"{global_id} 已被 {current.get('worker')} 认领，跳过")
+            self.contended += 1
+            return False
+
+        marker = f"{directory}/takeover-{current.get('token', '')}"
+        if not await self.storage.write_file_if_absent(marker, self.worker_id):
+            self.contended += 1
+            return False
+        await self.storage.write_text(path, json.dumps(lease))
+        self._tokens[global_id] = lease["token"]
+        logger.info(f"接管过期租约: {global_id}（原持有者 {current.get('worker')}）")
+        self.claimed += 1
+        return True
+
+    async def renew(self, global_id: str) -> bool:
+        """
+        延长自己持有的租约，常驻模式每轮调用
+
+        lease.json 的 worker 和 token 与本实例上次写入的不一致时（过期后已被其他 worker 接管）
+        不续期，返回 False。已过期但还没被接管时，与接管一样先条件创建标记再覆盖。
+        """
+        directory = _lease_dir(global_id)
+        path = f"{directory}/lease.json"
+        if not await self.storage.exists(path):
+            logger.warning(f"租约已不存在: {global_id}")
+            return False
+        current = json.loads(await self.storage.read_text(path))
+        token = current.get("token", "")
+        if current.get("worker") != self.worker_id or token != self._tokens.get(
+            global_id
+        ):
+            logger.warning(f"{global_id} 的租约已被 {current.get('worker')} 接管")
+            self._tokens.pop(global_id, None)
+            return False
+
+        if current.get("expires_at", 0) <= time.time():
+            marker = f"{directory}/takeover-{token}"
+            if not await self.storage.write_file_if_absent(marker, self.worker_id):
+                logger.warning(f"{global_id} 的租约已过期并正被其他 worker 接管")
+                self._tokens.pop(global_id, None)
+                return False
+
+        lease = self._lease(global_id)
+        await self.storage.write_text(path, json.dumps(lease))
+        self._tokens[global_id] = lease["token"]
+        return True
+
+    async def release(self, global_id: str) -> None:
+        """删除租约目录下的全部文件"""
+        directory = _lease_dir(global_id)
+        try:
+            if not await self.storage.exists(directory):
+                return
+            for item in await self.storage.readdir(directory):
+                await self.storage.unlink(f"{directory}/{item.basename}")
+        except Exception as e:
+            logger.warning(f"清理租约失败 {global_id}: {e}")
+
+
+async def _shard_names(storage: StorageClient) -> list[str]:
+    if not await storage.exists(SHARDS_DIR):
+        return []
+    return sorted(
+        item.basename
+        for item in await storage.readdir(SHARDS_DIR)
+        if item.type == "directory"
+    )
+
+
+async def _read_shard_records(shard_storage: StorageClient) -> list[AnalyzedRecord]:
+    """只读地加载分片的已分析记录和 journal，不修改 worker 拥有的文件"""
+    records: list[AnalyzedRecord] = []
+    if await shard_storage.exists(ANALYZED_JOBS_PATH):
+        try:
+            records = json.loads(await shard_storage.read_text(ANALYZED_JOBS_PATH))
+        except Exception as e:
+            logger.warning(f"加载分片已分析记录失败: {e}")
+    return await RecordJournal(shard_storage).replay() + records
+
+
+async def prune_merged(
+    shard_storage: StorageClient,
+    history: list[AnalyzedRecord],
+    merged_ids: set[str],
+) -> list[AnalyzedRecord]:
+    """
+    worker 启动时删除分片输出中已被合并的记录
+
+    分片文件只由所属 worker 写入，合并步骤只读，因此清理放在 worker 侧进行。
+    """
+    remaining = [record for record in history if record.get("id") not in merged_ids]
+    if len(remaining) != len(history):
+        await shard_storage.write_text(
+            ANALYZED_JOBS_PATH, json.dumps(remaining, ensure_ascii=False, indent=2)
+        )
+
+    outbox = RecordJournal(shard_storage, QUALIFIED_PATH)
+    pending = await outbox.replay()
+    unmerged = [job for job in pending if job.get("id") not in merged_ids]
+    if len(unmerged) != len(pending):
+        await outbox.clear()
+        for job in unmerged:
+            await outbox.append(job)
+
+    pruned = len(history) - len(remaining)
+    if pruned:
+        logger.info(f"已清理分片中已合并的记录: {pruned} 条")
+    return remaining
+
+
+async def merge_shards(
+    storage: StorageClient,
+    notifier: Optional[Notifier] = None,
+    profiles: Optional[list[Profile]] = None,
+    notify_batch_size: int = 10,
+) -> tuple[list[AnalyzedRecord], list[AnalysisResult]]:
+    """
+    把各分片的已分析记录合并进 analyzed_jobs.json 并发送通知
+
+    按 id 去重，可重复执行，worker 运行中合并也是安全的：对分片输出只读，
+    已合并的记录由 worker 下次启动时清理。先写入合并结果再发通知，通知最多发送一次。
+    """
+    history = await load_history(storage, RecordJournal(storage))
+    known = {record.get("id") for record in history}
+    leases = LeaseManager(storage, worker_id="merge")
+
+    merged: list[AnalyzedRecord] = []
+    qualified: list[AnalysisResult] = []
+    for name in await _shard_names(storage):
+        shard_storage = PrefixedStorageClient(storage, f"{SHARDS_DIR}/{name}")
+        new_records = []
+        for record in await _read_shard_records(shard_storage):
+            if record.get("id") and record["id"] not in known:
+                known.add(record["id"])
+                new_records.append(record)
+        merged.extend(new_records)
+
+        new_ids = {record["id"] for record in new_records}
+        outbox = await RecordJournal(shard_storage, QUALIFIED_PATH).replay()
+        qualified.extend(job for job in outbox if job.get("id") in new_ids)
+        print(f"🧩 分片 {name}: 新增 {len(new_records)} 条记录")
+
+    if merged:
+        history = merged + history
+        await storage.write_text(
+            ANALYZED_JOBS_PATH, json.dumps(history, ensure_ascii=False, indent=2)
+        )
+        logger.info(f"已合并分片记录: 新增 {len(merged)}，总共 {len(history)}")
+
+    sink = ResultSink(
+        storage,
+        history=history,
+        notifier=notifier,
+        profiles=profiles,
+        notify_batch_size=notify_batch_size,
+    )
+    for job in qualified:
+        await sink.enqueue_notification(job)
+    await sink.notify()
+
+    for record in merged:
+        await leases.release(record["id"])
+
+    return merged, qualified
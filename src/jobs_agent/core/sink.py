@@ -0,0 +1,195 @@
+"""
+分析结果下游：逐条生成已分析记录、分批落盘、分批发送通知
+"""
+
+import asyncio
+import json
+import logging
+from typing import Callable, Optional
+
+from jobs_agent.core.profiles import Profile, qualified_profiles
+from jobs_agent.sources.base import AnalysisResult, AnalyzedRecord
+from jobs_agent.storage.archive import DetailArchive
+from jobs_agent.storage.base import StorageClient
+from jobs_agent.storage.journal import RecordJournal
+
+logger = logging.getLogger(__name__)
+
+ANALYZED_JOBS_PATH = "analyzed_jobs.json"
+
+Notifier = Callable[[list[AnalysisResult], Optional[Profile]], bool]
+
+
+def to_analyzed_record(result: AnalysisResult) -> AnalyzedRecord:
+    llm_analysis = result["llm_analysis"]
+    record: AnalyzedRecord = {
+        "id": result["id"],
+        "source": result["source"],
+        "url": result["url"],
+        "is_qualified": llm_analysis.get("is_qualified", False),
+        "analyzed_at": result["analyzed_at"],
+        "reason": llm_analysis.get("analysis", {}).get("reasoning", ""),
+    }
+    for key in ("filtered_by", "duplicate_of"):
+        if key in result:
+            record[key] = result[key]
+    if "profiles" in llm_analysis:
+        record["profiles"] = qualified_profiles(llm_analysis)
+    return record
+
+
+async def load_history(
+    storage: StorageClient,
+    journal: Optional[RecordJournal] = None,
+    path: str = ANALYZED_JOBS_PATH,
+) -> list[AnalyzedRecord]:
+    """加载 analyzed_jobs.json，并把上次运行中断时留在 journal 里的记录合并进去"""
+    history: list[AnalyzedRecord] = []
+    if await storage.exists(path):
+        try:
+            history = json.loads(await storage.read_text(path))
+        except Exception as e:
+            logger.warning(f"加载已分析记录失败: {e}")
+            history = []
+
+    if journal is None:
+        return history
+
+    recovered = await journal.replay()
+    if not recovered:
+        return history
+
+    known = {record.get("id") for record in history}
+    new_records = []
+    for record in recovered:
+        if record.get("id") and record["id"] not in known:
+            known.add(record["id"])
+            new_records.append(record)
+
+    history = new_records + history
+    if new_records:
+        await storage.write_text(
+            path, json.dumps(history, ensure_ascii=False, indent=2)
+        )
+    await journal.clear()
+    print(f"♻️ 从 journal 恢复 {len(new_records)} 条上次中断前的分析记录")
+    return history
+
+
+class ResultSink:
+    """
+    接收流式分析结果
+
+    每条已分析记录先追加到 journal 保证不丢失，原始详情写入归档供日后重新分析，
+    每 flush_every 条与历史记录合并写回 analyzed_jobs.json 并清空 journal；
+    符合条件的职位每 notify_batch_size 条发送一次通知，内容重复的副本不再通知；
+    配置了筛选档案时按档案分别通知。
+    为保持内存平稳，保留的合格职位会去掉原始详情。
+    """
+
+    def __init__(
+        self,
+        storage: StorageClient,
+        history: list[AnalyzedRecord],
+        notifier: Optional[Notifier] = None,
+        journal: Optional[RecordJournal] = None,
+        archive: Optional[DetailArchive] = None,
+        outbox: Optional[RecordJournal] = None,
+        profiles: Optional[list[Profile]] = None,
+        flush_every: int = 20,
+        notify_batch_size: int = 10,
+        path: str = ANALYZED_JOBS_PATH,
+    ):
+        self.storage = storage
+        self.history = history
+        self.notifier = notifier
+        self.journal = journal
+        self.archive = archive
+        self.outbox = outbox
+        self.profiles = profiles or []
+        self.flush_every = max(1, flush_every)
+        self.notify_batch_size = max(1, notify_batch_size)
+        self.path = path
+
+        self.records: list[AnalyzedRecord] = []
+        self.qualified: list[AnalysisResult] = []
+        self._unflushed = 0
+        self._pending_notify: list[AnalysisResult] = []
+
+    async def add(self, result: AnalysisResult) -> None:
+        record = to_analyzed_record(result)
+        if self.journal is not None:
+            await self.journal.append(record)
+        if self.archive is not None and "detail" in result:
+            await self.archive.add(result["detail"])
+        self.records.append(record)
+        self._unflushed += 1
+
+        if "duplicate_of" in record:
+            print(f"🔁 内容重复: {result['id']} → {record['duplicate_of']}")
+        elif record["is_qualified"]:
+            slim = {k: v for k, v in result.items() if k != "detail"}
+            self.qualified.append(slim)
+            if self.outbox is not None:
+                await self.outbox.append(slim)
+            await self.enqueue_notification(slim)
+            print(f"✅ 符合条件: {result['id']}")
+        else:
+            print(f"❌ 不符合条件: {result['id']}")
+
+        if self._unflushed >= self.flush_every:
+            await self.persist()
+
+    async def enqueue_notification(self, job: AnalysisResult) -> None:
+        self._pending_notify.append(job)
+        if len(self._pending_notify) >= self.notify_batch_size:
+            await self.notify()
+
+    async def persist(self) -> None:
+        if not self._unflushed:
+            return
+        all_records = self.records + self.history
+        await self.storage.write_text(
+            self.path, json.dumps(all_records, ensure_ascii=False, indent=2)
+        )
+        logger.info(
+            f"已保存已分析记录: 新增 {len(self.records)}，总共 {len(all_records)}"
+        )
+        if self.journal is not None:
+            await self.journal.clear()
+        self._unflushed = 0
+
+    async def notify(self) -> None:
+        if not self._pending_notify or self.notifier is None:
+            self._pending_notify = []
+            return
+        batch, self._pending_notify = self._pending_notify, []
+
+        if not self.profiles:
+            await self._send(batch, None)
+            return
+        for profile in self.profiles:
+            jobs = [
+                job
+                for job in batch
+                if profile["name"] in qualified_profiles(job["llm_analysis"])
+            ]
+            if jobs:
+                await self._send(jobs, profile)
+
+    async def _send(
+        self, jobs: list[AnalysisResult], profile: Optional[Profile]
+    ) -> None:
+        label = f"[{profile['name']}] " if profile else ""
+        print(f"📲 {label}发送通知...（{len(jobs)} 个职位）")
+        success = await asyncio.to_thread(self.notifier, jobs, profile)
+        if success:
+            print("✅ 通知已发送")
+        else:
+            print("⚠️ 通知发送失败")
+
+    async def close(self) -> None:
+        await self.persist()
+        if self.archive is not None:
+            await self.archive.flush()
+        await self.notify()
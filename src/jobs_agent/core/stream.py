@@ -0,0 +1,103 @@
+"""
+流式处理管线
+
+抓取 → 分析 → 持久化/通知 三个阶段通过有界队列串联：详情抓到即进入分析，
+分析完成即交给下游，网络抓取和 LLM 调用的耗时相互重叠；
+队列满时上游自动等待（背压），内存占用不随积压量增长。
+分析阶段由 ANALYSIS_WORKERS 个 worker 并发执行，单条失败不影响其他条目，
+结果经重排缓冲后按详情产出顺序交给下游，输出顺序与并发度无关。
+"""
+
+import asyncio
+import logging
+import os
+from typing import AsyncIterator, Awaitable, Callable, Optional
+
+from jobs_agent.sources.base import AnalysisResult, JobDetail
+
+logger = logging.getLogger(__name__)
+
+Analyze = Callable[[JobDetail], Awaitable[Optional[AnalysisResult]]]
+Sink = Callable[[AnalysisResult], Awaitable[None]]
+
+_DONE = object()
+
+
+async def run_pipeline(
+    details: AsyncIterator[JobDetail],
+    analyze: Analyze,
+    sink: Sink,
+    queue_size: int | None = None,
+    workers: int | None = None,
+) -> int:
+    """
+    运行流式管线
+
+    Args:
+        details: 详情异步迭代器（抓取阶段）
+        analyze: 分析单条详情，失败返回 None
+        sink: 接收分析结果（持久化/通知阶段），按详情产出顺序调用
+        queue_size: 阶段间队列容量
+        workers: 并发分析的 worker 数
+
+    Returns:
+        进入分析阶段的详情数量
+    """
+    if queue_size is None:
+        queue_size = int(os.getenv("PIPELINE_QUEUE_SIZE", "16"))
+    if workers is None:
+        workers = int(os.getenv("ANALYSIS_WORKERS", "4"))
+    workers = max(1, workers)
+
+    detail_queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+    result_queue: asyncio.Queue = asyncio.Queue()
+    # 限制已进入管线但尚未交给 sink 的条数，避免队头慢任务导致重排缓冲无限增长
+    in_flight = asyncio.Semaphore(queue_size + workers)
+    fed = 0
+
+    async def feed() -> None:
+        nonlocal fed
+        try:
+            async for detail in details:
+                await in_flight.acquire()
+                await detail_queue.put((fed, detail))
+                fed += 1
+        finally:
+            for _ in range(workers):
+                await detail_queue.put(_DONE)
+
+    async def work() -> None:
+        while (entry := await detail_queue.get()) is not _DONE:
+            seq, detail = entry
+            try:
+                result = await analyze(detail)
+            except Exception as e:
+                logger.error(f"分析失败 {detail['id']}: {e}")
+                result = None
+            await result_queue.put((seq, result))
+
+    async def work_all() -> None:
+        async with asyncio.TaskGroup() as wg:
+            for _ in range(workers):
+                wg.create_task(work())
+        await result_queue.put(_DONE)
+
+    async def drain() -> None:
+        buffered: dict[int, Optional[AnalysisResult]] = {}
+        next_seq = 0
+        while (entry := await result_queue.get()) is not _DONE:
+            seq, result = entry
+            buffered[seq] = result
+            while next_seq in buffered:
+                ready = buffered.pop(next_seq)
+                next_seq += 1
+                in_flight.release()
+                if ready is not None:
+                    await sink(ready)
+
+    async with asyncio.TaskGroup() as tg:
+        tg.create_task(feed())
+        tg.create_task(work_all())
+        tg.create_task(drain())
+
+    return fed
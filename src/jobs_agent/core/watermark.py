@@ -0,0 +1,95 @@
+"""
+增量抓取水位线
+
+记录每个数据源上次运行看到的最新帖子（published_at + id），保存在
+crawl_watermarks.json。数据源翻页时遇到整页都不新于水位线即可停止，
+因此可以把最大页数调大用于补抓，而正常运行不会多付出请求。
+"""
+
+import json
+import logging
+import threading
+from datetime import datetime
+
+from jobs_agent.sources.base import Watermark
+from jobs_agent.storage.base import StorageClient
+
+logger = logging.getLogger(__name__)
+
+WATERMARK_PATH = "crawl_watermarks.json"
+
+
+def is_newer(a: Watermark, b: Watermark | None) -> bool:
+    """a 是否比 b 更新"""
+    if b is None:
+        return True
+    try:
+        return datetime.fromisoformat(a["published_at"]) > datetime.fromisoformat(
+            b["published_at"]
+        )
+    except (TypeError, ValueError):
+        return a["published_at"] > b["published_at"]
+
+
+def newest(marks: list[Watermark]) -> Watermark | None:
+    result = None
+    for mark in marks:
+        if mark["published_at"] and is_newer(mark, result):
+            result = mark
+    return result
+
+
+class WatermarkStore:
+    def __init__(self):
+        self._marks: dict[str, Watermark] = {}
+        self._dirty = False
+        self._lock = threading.Lock()
+
+    def get(self, source_name: str) -> Watermark | None:
+        with self._lock:
+            return self._marks.get(source_name)
+
+    def advance(self, source_name: str, mark: Watermark | None) -> None:
+        """水位线只前进不后退"""
+        if not mark:
+            return
+        with self._lock:
+            if is_newer(mark, self._marks.get(source_name)):
+                self._marks[source_name] = mark
+                self._dirty = True
+
+    async def load(self, storage: StorageClient, path: str = WATERMARK_PATH) -> None:
+        if not await storage.exists(path):
+            return
+        try:
+            marks = json.loads(await storage.read_text(path))
+        except Exception as e:
+            logger.warning(f"加载抓取水位线失败: {e}")
+            return
+
+        with self._lock:
+            self._marks = marks
+            self._dirty = False
+        logger.info(f"已加载抓取水位线: {marks}")
+
+    async def save(self, storage: StorageClient, path: str = WATERMARK_PATH) -> None:
+        with self._lock:
+            if not self._dirty:
+                return
+            content = json.dumps(self._marks, ensure_ascii=False, indent=2)
+            self._dirty = False
+
+        try:
+            await storage.write_text(path, content)
+        except Exception as e:
+            logger.warning(f"保存抓取水位线失败: {e}")
+
+
+_store: WatermarkStore | None = None
+
+
+def get_watermark_store() -> WatermarkStore:
+    global _store
+    if _store is None:
+        _store = WatermarkStore()
+    return _store
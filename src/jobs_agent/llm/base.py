@@ -1,5 +1,6 @@
+import asyncio
 from abc import ABC, abstractmethod
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional, Union
 
 class BaseLLM(ABC):
     """LLM抽象基类，定义所有LLM实现的通用接口"""
@@ -31,6 +32,64 @@ class BaseLLM(ABC):
         """
         pass
     
+    async def chat_async(self, message: str, keep_history: bool = True, **kwargs) -> str:
+        """
+        异步发送消息并获取回复
+        
+        默认在线程池中调用 chat，实现类可以覆盖为原生异步实现
+        
+        Args:
+            message: 用户输入的消息
+            keep_history: 是否保持对话历史
+            **kwargs: 其他特定于实现的参数
+        
+        Returns:
+            模型的回复内容
+        """
+        return await asyncio.to_thread(self.chat, message, keep_history, **kwargs)
+    
+    async def chat_many(
+        self,
+        messages: List[str],
+        concurrency: int = 4,
+        return_exceptions: bool = False,
+        **kwargs,
+    ) -> List[Union[str, BaseException]]:
+        """
+        并发发送一批相互独立的消息（不保持对话历史）
+        
+        Args:
+            messages: 用户输入的消息列表
+            concurrency: 同时进行的请求数上限
+            return_exceptions: 为 True 时失败的请求在对应位置返回异常，不影响其他请求
+            **kwargs: 传给 chat_async 的参数
+        
+        Returns:
+            与 messages 顺序一致的回复列表
+        """
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+        
+        async def one(message: str) -> str:
+            async with semaphore:
+                return await self.chat_async(message, keep_history=False, **kwargs)
+        
+        return list(
+            await asyncio.gather(
+                *(one(message) for message in messages),
+                return_exceptions=return_exceptions,
+            )
+        )
+    
+    @property
+    def structured_mode(self) -> str:
+        """
+        当前请求使用的结构化输出模式
+        
+        json_schema 表示回复受 response_format 中的 JSON Schema 约束，json_object 表示
+        回复保证是合法 JSON，off 表示未启用；不支持结构化输出的实现返回 off
+        """
+        return "off"
+    
     @property
     @abstractmethod
     def model_name(self) -> str:
@@ -0,0 +1,110 @@
+"""
+OpenAI 兼容的 Batch API 客户端
+
+上传 JSONL 请求文件 → 创建批处理任务 → 轮询状态 → 下载结果文件。
+批处理不保证时延（通常在 completion_window 内完成），但单价更低、不占用在线接口的速率配额，
+适合补跑积压职位和 replay 这类不需要即时结果的分析。
+"""
+
+import asyncio
+import logging
+import os
+import time
+from typing import Optional
+
+from jobs_agent.core.http import get_async_client
+
+logger = logging.getLogger(__name__)
+
+# 批处理任务的终止状态，其余（validating / in_progress / finalizing / cancelling）需继续轮询
+TERMINAL_STATUSES = ("completed", "failed", "expired", "cancelled")
+
+
+class OpenAIBatchClient:
+    def __init__(
+        self,
+        api_key: str = None,
+        base_url: str = None,
+        endpoint: str = None,
+        completion_window: str = None,
+    ):
+        self.api_key = api_key or os.environ.get("OPENAI_API_KEY")
+        self.base_url = base_url or os.environ.get("OPENAI_API_ENDPOINT")
+        # 写入 JSONL 每行的 url 字段，也是创建任务时的 endpoint 参数
+        self.endpoint = endpoint or os.environ.get(
+            "BATCH_ENDPOINT", "/v1/chat/completions"
+        )
+        self.completion_window = completion_window or os.environ.get(
+            "BATCH_COMPLETION_WINDOW", "24h"
+        )
+
+        if not self.api_key:
+            raise ValueError("请设置OPENAI_API_KEY环境变量或传入api_key参数")
+
+        if not self.base_url:
+            raise ValueError("请设置OPENAI_API_ENDPOINT环境变量或传入base_url参数")
+
+    @property
+    def _headers(self) -> dict:
+        return {"Authorization": f"Bearer {self.api_key}"}
+
+    async def upload(self, content: bytes, filename: str = "batch.jsonl") -> str:
+        """上传请求文件，返回文件 id"""
+        response = await get_async_client().post(
+            f"{self.base_url}/files",
+            headers=self._headers,
+            data={"purpose": "batch"},
+            files={"file": (filename, content, "application/jsonl")},
+        )
+        response.raise_for_status()
+        return response.json()["id"]
+
+    async def create(self, input_file_id: str, metadata: Optional[dict] = None) -> dict:
+        response = await get_async_client().post(
+            f"{self.base_url}/batches",
+            headers=self._headers,
+            json={
+                "input_file_id": input_file_id,
+                "endpoint": self.endpoint,
+                "completion_window": self.completion_window,
+                "metadata": metadata or {},
+            },
+        )
+        response.raise_for_status()
+        return response.json()
+
+    async def retrieve(self, batch_id: str) -> dict:
+        response = await get_async_client().get(
+            f"{self.base_url}/batches/{batch_id}", headers=self._headers
+        )
+        response.raise_for_status()
+        return response.json()
+
+    async def content(self, file_id: str) -> bytes:
+        response = await get_async_client().get(
+            f"{self.base_url}/files/{file_id}/content", headers=self._headers
+        )
+        response.raise_for_status()
+        return response.content
+
+    async def wait(
+        self, batch_id: str, poll_interval: float = 30.0, timeout: float = 0.0
+    ) -> dict:
+        """
+        轮询直到任务进入终止状态，返回最后一次查询结果
+
+        timeout 为 0 表示不限时；超时后返回当前状态，任务在服务端继续运行。
+        """
+        started = time.monotonic()
+        while True:
+            batch = await self.retrieve(batch_id)
+            if batch.get("status") in TERMINAL_STATUSES:
+                return batch
+            counts = batch.get("request_counts") or {}
+            logger.info(
+                f"批处理 {batch_id}: {batch.get('status')} "
+                f"{counts.get('completed', 0)}/{counts.get('total', '?')}"
+            )
+            if timeout > 0 and time.monotonic() - started + poll_interval > timeout:
+                return batch
+            await asyncio.sleep(poll_interval)
@@ -1,9 +1,25 @@
+import asyncio
 import os
+import threading
 import time
-import requests
 
+import httpx
+
+from jobs_agent.core.http import get_async_client, get_client
+from jobs_agent.core.llmcache import get_llm_cache, llm_cache_key
+from jobs_agent.core.metrics import get_metrics
 from jobs_agent.llm.base import BaseLLM
 
+# 结构化输出模式，接口拒绝时按此顺序降级
+STRUCTURED_MODES = ("json_schema", "json_object", "off")
+
+# 400/422 的错误信息包含这些词时才认为是不支持 response_format，其余错误照常重试
+_FORMAT_ERROR_HINTS = ("response_format", "json_schema", "json_object")
+
+# (接口地址, 模型) → 探测到的可用模式，同一进程内的客户端共享
+_structured_support: dict[tuple[str, str], str] = {}
+_structured_lock = threading.Lock()
+
 
 class OpenAIChat(BaseLLM):
     def __init__(
@@ -12,6 +28,22 @@ class OpenAIChat(BaseLLM):
         self.api_key = api_key or os.environ.get("OPENAI_API_KEY")
         self.model = model or os.environ.get("OPENAI_MODEL_ID", "gpt-4")
         self.base_url = base_url or os.environ.get("OPENAI_API_ENDPOINT")
+        self.timeout = float(
+            kwargs.get("timeout") or os.environ.get("OPENAI_TIMEOUT", "120")
+        )
+        self.connect_timeout = float(
+            kwargs.get("connect_timeout")
+            or os.environ.get("OPENAI_CONNECT_TIMEOUT", "10")
+        )
+        # auto：先按 json_schema 请求，被接口拒绝时自动降级；其余取值固定使用该模式
+        self.structured_output = (
+            kwargs.get("structured_output")
+            or os.environ.get("LLM_STRUCTURED_OUTPUT", "auto")
+        ).lower()
+        if self.structured_output not in ("auto", *STRUCTURED_MODES):
+            raise ValueError(
+                f"LLM_STRUCTURED_OUTPUT 只能是 auto/{'/'.join(STRUCTURED_MODES)}"
+            )
 
         if not self.api_key:
             raise ValueError("请设置OPENAI_API_KEY环境变量或传入api_key参数")
@@ -21,14 +53,8 @@ class OpenAIChat(BaseLLM):
 
         print(f"✅ OpenAI Compatible 客户端初始化成功！使用模型：{self.model}")
 
-    def chat(
-        self,
-        message: str,
-        keep_history: bool = True,
-        max_retries: int = 3,
-        retry_delay: int = 1,
-        **kwargs,
-    ) -> str:
+    def payload(self, message: str, **kwargs) -> dict:
+        """chat/completions 请求体，在线调用和批处理共用"""
         messages = [{"role": "user", "content": message}]
 
         temperature = kwargs.get("temperature", 0.7)
@@ -37,11 +63,6 @@ class OpenAIChat(BaseLLM):
         # 深度思考参数：enabled启用深度思考，disabled禁用深度思考
         thinking_config = {"type": "disabled"}
 
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json",
-        }
-
         payload = {
             "model": self.model,
             "messages": messages,
@@ -50,29 +71,182 @@ class OpenAIChat(BaseLLM):
             "thinking": thinking_config,
         }
 
+        # response_format 为 json_schema 格式，接口只支持 json_object 时只保留类型
+        response_format = kwargs.get("response_format")
+        mode = self.structured_mode
+        if response_format and mode == "json_schema":
+            payload["response_format"] = response_format
+        elif response_format and mode == "json_object":
+            payload["response_format"] = {"type": "json_object"}
+        return payload
+
+    @property
+    def structured_mode(self) -> str:
+        if self.structured_output != "auto":
+            return self.structured_output
+        return _structured_support.get((self.base_url, self.model), "json_schema")
+
+    def _format_fallback(
+        self, response: httpx.Response, request: dict, message: str, kwargs: dict
+    ) -> dict | None:
+        """
+        接口以 400/422 拒绝带 response_format 的请求时降级结构化输出模式，返回重新构造的请求
+
+        auto 模式下第一个带 response_format 的请求就是能力探测，不额外发请求；
+        探测结果按 (接口地址, 模型) 在进程内共享，并发请求同时被拒绝时只会降到下一级。
+        错误信息与 response_format 无关（如上下文超长）时不降级
+        """
+        sent = request["json"].get("response_format")
+        if (
+            sent is None
+            or self.structured_output != "auto"
+            or response.status_code not in (400, 422)
+        ):
+            return None
+        error = response.text.lower()
+        if not any(hint in error for hint in _FORMAT_ERROR_HINTS):
+            return None
+
+        sent_mode = (
+            "json_object" if sent.get("type") == "json_object" else "json_schema"
+        )
+        fallback = STRUCTURED_MODES[STRUCTURED_MODES.index(sent_mode) + 1]
+        with _structured_lock:
+            current = self.structured_mode
+            if STRUCTURED_MODES.index(current) < STRUCTURED_MODES.index(fallback):
+                _structured_support[(self.base_url, self.model)] = fallback
+
+        get_metrics().inc(
+            "llm_structured_fallbacks_total", model=self.model, mode=sent_mode
+        )
+        print(
+            f"⚠️ 接口不支持 response_format={sent_mode}"
+            f"（HTTP {response.status_code}），改用 {fallback}"
+        )
+        return self._request(message, **kwargs)
+
+    def _request(self, message: str, **kwargs) -> dict:
+        headers = {
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json",
+        }
+
+        return {
+            "url": f"{self.base_url}/chat/completions",
+            "headers": headers,
+            "json": self.payload(message, **kwargs),
+            "timeout": httpx.Timeout(self.timeout, connect=self.connect_timeout),
+        }
+
+    def _content(self, response: httpx.Response) -> str:
+        response.raise_for_status()
+        return self.completion_content(response.json())
+
+    def completion_content(self, result: dict) -> str:
+        """从 chat/completions 响应体取出回复内容，并记录请求数和 token 用量"""
+        metrics = get_metrics()
+        metrics.inc("llm_requests_total", model=self.model, outcome="ok")
+        for kind, count in (result.get("usage") or {}).items():
+            if kind in ("prompt_tokens", "completion_tokens"):
+                metrics.inc("llm_tokens_total", count, model=self.model, kind=kind)
+
+        return result["choices"][0]["message"]["content"]
+
+    def _on_error(
+        self, e: Exception, attempt: int, max_retries: int, retry_delay: float
+    ) -> str | None:
+        """记录失败；还可以重试时返回 None，否则返回错误信息"""
+        get_metrics().inc("llm_requests_total", model=self.model, outcome="error")
+        if attempt < max_retries - 1:
+            print(f"⚠️ 第 {attempt + 1} 次请求失败: {e}，{retry_delay}秒后重试...")
+            return None
+        print(f"❌ 已重试 {max_retries} 次，请求仍然失败: {e}")
+        return f"❌ 请求失败: {e}"
+
+    def _cache_key(self, request: dict, use_cache: bool) -> tuple[str, str | None]:
+        """返回缓存键和命中的回复；use_cache=False 时跳过查找，但成功后仍会更新缓存"""
+        key = llm_cache_key(self.base_url, request["json"])
+        return key, get_llm_cache().get(key) if use_cache else None
+
+    def _post(self, request: dict, message: str, kwargs: dict) -> httpx.Response:
+        metrics = get_metrics()
+        while True:
+            with metrics.timer("llm_request_seconds", model=self.model):
+                response = get_client().post(**request)
+            fallback = self._format_fallback(response, request, message, kwargs)
+            if fallback is None:
+                return response
+            request = fallback
+
+    async def _post_async(
+        self, request: dict, message: str, kwargs: dict
+    ) -> httpx.Response:
+        metrics = get_metrics()
+        while True:
+            with metrics.timer("llm_request_seconds", model=self.model):
+                response = await get_async_client().post(**request)
+            fallback = self._format_fallback(response, request, message, kwargs)
+            if fallback is None:
+                return response
+            request = fallback
+
+    def chat(
+        self,
+        message: str,
+        keep_history: bool = True,
+        max_retries: int = 3,
+        retry_delay: int = 1,
+        use_cache: bool = True,
+        **kwargs,
+    ) -> str:
+        request = self._request(message, **kwargs)
+        key, cached = self._cache_key(request, use_cache)
+        if cached is not None:
+            return cached
+
         for attempt in range(max_retries):
             try:
-                response = requests.post(
-                    f"{self.base_url}/chat/completions",
-                    headers=headers,
-                    json=payload,
-                )
-
-                response.raise_for_status()
-                result = response.json()
+                response = self._post(request, message, kwargs)
+                content = self._content(response)
+                get_llm_cache().put(key, content)
+                return content
+            except Exception as e:
+                error = self._on_error(e, attempt, max_retries, retry_delay)
+                if error is not None:
+                    return error
+                time.sleep(retry_delay)
+                retry_delay *= 2
 
-                return result["choices"][0]["message"]["content"]
+    async def chat_async(
+        self,
+        message: str,
+        keep_history: bool = True,
+        max_retries: int = 3,
+        retry_delay: int = 1,
+        use_cache: bool = True,
+        **kwargs,
+    ) -> str:
+        """
+        使用共享的 httpx.AsyncClient 发送请求，连接池和 keep-alive 与其他异步请求共用；
+        重试间隔用 asyncio.sleep，任务取消时立即退出
+        """
+        request = self._request(message, **kwargs)
+        key, cached = self._cache_key(request, use_cache)
+        if cached is not None:
+            return cached
 
+        for attempt in range(max_retries):
+            try:
+                response = await self._post_async(request, message, kwargs)
+                content = self._content(response)
+                get_llm_cache().put(key, content)
+                return content
             except Exception as e:
-                if attempt < max_retries - 1:
-                    print(
-                        f"⚠️ 第 {attempt + 1} 次请求失败: {e}，{retry_delay}秒后重试..."
-                    )
-                    time.sleep(retry_delay)
-                    retry_delay *= 2
-                else:
-                    print(f"❌ 已重试 {max_retries} 次，请求仍然失败: {e}")
-                    return f"❌ 请求失败: {e}"
+                error = self._on_error(e, attempt, max_retries, retry_delay)
+                if error is not None:
+                    return error
+                await asyncio.sleep(retry_delay)
+                retry_delay *= 2
 
     @property
     def model_name(self) -> str:
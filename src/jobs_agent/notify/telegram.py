@@ -1,8 +1,10 @@
 import os
 import logging
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 
-import requests
+import httpx
+
+from jobs_agent.core.http import get_client
 
 logger = logging.getLogger(__name__)
 
@@ -26,23 +28,27 @@ def is_configured() -> bool:
     return bool(token and chat_id)
 
 
-def send_message(text: str, parse_mode: str = "HTML") -> bool:
-    token, chat_id = _get_config()
+def send_message(
+    text: str, parse_mode: str = "HTML", chat_id: Optional[str] = None
+) -> bool:
+    token, default_chat_id = _get_config()
+    chat_id = chat_id or default_chat_id
     if not token or not chat_id:
         logger.warning(
             "Telegram 未配置 (TELEGRAM_BOT_TOKEN / TELEGRAM_CHAT_ID)，跳过通知"
         )
         return False
 
-    url = f"{TELEGRAM_API_BASE}/bot{token}/sendMessage"
+    api_base = os.getenv("TELEGRAM_API_BASE", TELEGRAM_API_BASE).rstrip("/")
+    url = f"{api_base}/bot{token}/sendMessage"
     payload = {"chat_id": chat_id, "text": text, "parse_mode": parse_mode}
 
     try:
-        resp = requests.post(url, json=payload, timeout=15)
+        resp = get_client().post(url, json=payload, timeout=15)
         resp.raise_for_status()
         logger.info("Telegram 通知发送成功")
         return True
-    except requests.exceptions.RequestException as e:
+    except httpx.HTTPError as e:
         logger.error(f"Telegram 通知发送失败: {e}")
         return False
 
@@ -51,8 +57,9 @@ def _escape_html(text: str) -> str:
     return text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
 
 
-def format_jobs_message(jobs: List[Dict[str, Any]]) -> str:
-    lines = [f"🔔 发现 {len(jobs)} 个新的符合条件的招聘信息：\n"]
+def format_jobs_message(jobs: List[Dict[str, Any]], profile_name: str = "") -> str:
+    label = f"[{_escape_html(profile_name)}] " if profile_name else ""
+    lines = [f"🔔 {label}发现 {len(jobs)} 个新的符合条件的招聘信息：\n"]
 
     for i, job in enumerate(jobs, 1):
         url = job.get("url", "")
@@ -78,19 +85,24 @@ def format_jobs_message(jobs: List[Dict[str, Any]]) -> str:
     return "\n".join(lines)
 
 
-def notify_jobs(jobs: List[Dict[str, Any]]) -> bool:
+def notify_jobs(
+    jobs: List[Dict[str, Any]], profile: Optional[Dict[str, Any]] = None
+) -> bool:
+    """发送职位通知；指定档案时消息带档案名，并优先发到档案配置的 telegram_chat_id"""
     if not jobs:
         return True
     if not is_configured():
         logger.info("Telegram 未配置，跳过发送")
         return False
 
-    message = format_jobs_message(jobs)
+    profile = profile or {}
+    chat_id = profile.get("telegram_chat_id")
+    message = format_jobs_message(jobs, profile.get("name", ""))
 
     if len(message) <= 4096:
-        return send_message(message)
+        return send_message(message, chat_id=chat_id)
 
     for i in range(0, len(message), 4096):
         chunk = message[i : i + 4096]
-        send_message(chunk)
+        send_message(chunk, chat_id=chat_id)
     return True
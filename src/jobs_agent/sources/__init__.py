@@ -15,12 +15,15 @@ def create_sources_from_env() -> list[BaseSource]:
         "yes",
     )
     if eleduck_enabled:
-        from jobs_agent.sources.eleduck import EleduckSource
+        from jobs_agent.sources.eleduck import API_BASE, EleduckSource
 
         pages = int(os.getenv("ELEDUCK_PAGES", "2"))
         offset = int(os.getenv("ELEDUCK_OFFSET", "0"))
         limit = int(os.getenv("ELEDUCK_LIMIT", "0"))
-        sources.append(EleduckSource(pages=pages, offset=offset, limit=limit))
+        api_base = os.getenv("ELEDUCK_API_BASE", API_BASE)
+        sources.append(
+            EleduckSource(pages=pages, offset=offset, limit=limit, api_base=api_base)
+        )
         logger.info(
             f"已启用 eleduck 数据源 (pages={pages}, offset={offset}, limit={limit})"
         )
@@ -31,11 +34,12 @@ def create_sources_from_env() -> list[BaseSource]:
         "yes",
     )
     if v2ex_enabled:
-        from jobs_agent.sources.v2ex import V2exSource
+        from jobs_agent.sources.v2ex import FEED_URL, V2exSource
 
         offset = int(os.getenv("V2EX_OFFSET", "0"))
         limit = int(os.getenv("V2EX_LIMIT", "0"))
-        sources.append(V2exSource(offset=offset, limit=limit))
+        feed_url = os.getenv("V2EX_FEED_URL", FEED_URL)
+        sources.append(V2exSource(offset=offset, limit=limit, feed_url=feed_url))
         logger.info(f"已启用 v2ex 数据源 (offset={offset}, limit={limit})")
 
     if not sources:
@@ -1,5 +1,8 @@
+import asyncio
 from abc import ABC, abstractmethod
-from typing import Optional, TypedDict
+from typing import NotRequired, Optional, TypedDict
+
+from jobs_agent.core.profiles import ProfileVerdict
 
 
 class JobListItem(TypedDict):
@@ -21,10 +24,29 @@ class JobDetail(TypedDict):
     extra: dict
 
 
+class JobChecks(TypedDict):
+    is_recruitment: bool
+    is_long_term: bool
+    is_development: bool
+    # 没有明确薪资信息时为 None
+    salary_meets_requirement: Optional[bool]
+    reasoning: str
+
+
+class ExtractedInfo(TypedDict):
+    company_introduction: str
+    company_website: str
+    job_responsibilities: str
+    skill_requirements: str
+    salary_benefits: str
+
+
 class LLMAnalysis(TypedDict):
     is_qualified: bool
-    analysis: dict
-    extracted_info: dict
+    analysis: JobChecks
+    extracted_info: ExtractedInfo
+    # 配置了多个筛选档案时，档案名 → 结论
+    profiles: NotRequired[dict[str, ProfileVerdict]]
 
 
 class AnalysisResult(TypedDict):
@@ -35,6 +57,10 @@ class AnalysisResult(TypedDict):
     detail: JobDetail
     llm_analysis: LLMAnalysis
     analyzed_at: str
+    # 被预筛选规则拒绝时为规则名，未调用 LLM
+    filtered_by: NotRequired[str]
+    # 内容与已分析职位重复时为原记录 id，复用其 LLM 分析结果
+    duplicate_of: NotRequired[str]
 
 
 class AnalyzedRecord(TypedDict):
@@ -44,9 +70,25 @@ class AnalyzedRecord(TypedDict):
     is_qualified: bool
     analyzed_at: str
     reason: str
+    filtered_by: NotRequired[str]
+    duplicate_of: NotRequired[str]
+    # 符合条件的档案名
+    profiles: NotRequired[list[str]]
+
+
+class Watermark(TypedDict):
+    published_at: str
+    id: str
 
 
 class BaseSource(ABC):
+    # fetch_detail 请求的目标主机，用于按主机限流；None 表示详情不发网络请求
+    detail_host: Optional[str] = None
+    # 上次运行时看到的最新帖子，支持增量抓取的数据源据此提前停止翻页
+    watermark: Optional[Watermark] = None
+    # 本次 fetch_list 看到的最新帖子，运行结束后成为新的水位线
+    newest_seen: Optional[Watermark] = None
+
     @property
     @abstractmethod
     def name(self) -> str: ...
@@ -57,5 +99,10 @@ class BaseSource(ABC):
     @abstractmethod
     def fetch_detail(self, item: JobListItem) -> Optional[JobDetail]: ...
 
+    async def fetch_detail_async(self, item: JobListItem) -> Optional[JobDetail]:
+        if self.detail_host is None:
+            return self.fetch_detail(item)
+        return await asyncio.to_thread(self.fetch_detail, item)
+
     def global_id(self, item_id: str) -> str:
         return f"{self.name}:{item_id}"
@@ -1,18 +1,26 @@
 import logging
 from typing import Optional
+from urllib.parse import urlparse
 
-from jobs_agent.core.fetch import fetch_json
-from jobs_agent.sources.base import BaseSource, JobListItem, JobDetail
+from jobs_agent.core.fetch import fetch_json, fetch_json_conditional
+from jobs_agent.core.watermark import is_newer, newest
+from jobs_agent.sources.base import BaseSource, JobListItem, JobDetail, Watermark
 from jobs_agent.sources.parsers.eleduck_list import parse_eleduck_list
 
 logger = logging.getLogger(__name__)
 
+API_BASE = "https://svc.eleduck.com"
+
 
 class EleduckSource(BaseSource):
-    def __init__(self, pages: int = 2, offset: int = 0, limit: int = 0):
+    def __init__(
+        self, pages: int = 2, offset: int = 0, limit: int = 0, api_base: str = API_BASE
+    ):
         self.pages = pages
         self.offset = offset
         self.limit = limit
+        self.api_base = api_base.rstrip("/")
+        self.detail_host = urlparse(self.api_base).netloc
 
     @property
     def name(self) -> str:
@@ -20,13 +28,28 @@ class EleduckSource(BaseSource):
 
     def fetch_list(self) -> list[JobListItem]:
         items: list[JobListItem] = []
+        self.newest_seen = None
         for page in range(1, self.pages + 1):
-            url = f"https://svc.eleduck.com/api/v1/posts?page={page}"
-            data = fetch_json(url)
+            url = f"{self.api_base}/api/v1/posts?page={page}"
+            data, unchanged = fetch_json_conditional(url)
             if not data:
                 logger.error(f"fetch_list failed: page={page}")
                 continue
+            # 未变化时仍解析缓存的内容，没有分析记录的帖子需要再次列出，已分析的由历史记录去重
+            if unchanged:
+                logger.info(f"[{self.name}] page={page} 未变化，使用缓存内容")
             posts = parse_eleduck_list(data)
+
+            # 置顶帖不按时间排序，不参与水位线判断
+            marks: list[Watermark] = [
+                {"published_at": post["created_at"], "id": post["id"]}
+                for post in posts
+                if not post.get("pinned")
+            ]
+            page_newest = newest(marks)
+            if page_newest and is_newer(page_newest, self.newest_seen):
+                self.newest_seen = page_newest
+
             for post in posts:
                 items.append(
                     {
@@ -38,9 +61,19 @@ class EleduckSource(BaseSource):
                     }
                 )
 
+            if self.watermark and marks:
+                if not any(is_newer(mark, self.watermark) for mark in marks):
+                    logger.info(
+                        f"[{self.name}] page={page} 全部不新于水位线 "
+                        f"{self.watermark['published_at']}，停止翻页"
+                    )
+                    break
+
         if self.offset > 0 or self.limit > 0:
             end = self.offset + self.limit if self.limit > 0 else None
             items = items[self.offset : end]
+            # 测试切片只处理部分帖子，不能据此推进水位线
+            self.newest_seen = None
             logger.info(
                 f"[{self.name}] slice: offset={self.offset}, limit={self.limit or 'unlimited'}, kept {len(items)}"
             )
@@ -49,7 +82,7 @@ class EleduckSource(BaseSource):
 
     def fetch_detail(self, item: JobListItem) -> Optional[JobDetail]:
         post_id = item["id"]
-        api_url = f"https://svc.eleduck.com/api/v1/posts/{post_id}"
+        api_url = f"{self.api_base}/api/v1/posts/{post_id}"
         data = fetch_json(api_url)
         if not data:
             logger.error(f"fetch_detail failed: {api_url}")
@@ -37,6 +37,7 @@ def parse_eleduck_list(data: Dict) -> List[Dict]:
                 'upvotes_count': post.get('upvotes_count', 0),
                 'downvotes_count': post.get('downvotes_count', 0),
                 'category': category_info.get('name', ''),
+                'category_id': category_id,
                 'user_nickname': post.get('user', {}).get('nickname', ''),
                 'pinned': post.get('pinned', False),
                 'featured': post.get('featured', False)
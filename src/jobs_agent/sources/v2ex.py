@@ -1,7 +1,7 @@
 import logging
 from typing import Optional
 
-from jobs_agent.core.fetch import fetch_page
+from jobs_agent.core.fetch import fetch_page_conditional
 from jobs_agent.sources.base import BaseSource, JobListItem, JobDetail
 from jobs_agent.sources.parsers.v2ex_feed import parse_v2ex_feed, _html_to_text
 
@@ -11,20 +11,26 @@ FEED_URL = "https://www.v2ex.com/feed/tab/jobs.xml"
 
 
 class V2exSource(BaseSource):
-    def __init__(self, offset: int = 0, limit: int = 0):
+    def __init__(self, offset: int = 0, limit: int = 0, feed_url: str = FEED_URL):
         self.offset = offset
         self.limit = limit
+        self.feed_url = feed_url
 
     @property
     def name(self) -> str:
         return "v2ex"
 
     def fetch_list(self) -> list[JobListItem]:
-        xml_text = fetch_page(FEED_URL)
+        xml_text, unchanged = fetch_page_conditional(self.feed_url)
         if not xml_text:
             logger.error(f"fetch_list failed: RSS feed empty")
             return []
 
+        # 未变化时仍解析缓存的内容：上次列出但没有分析记录的帖子（LLM 失败、预算耗尽、
+        # 运行中断等）需要再次列出，已分析的由历史记录去重
+        if unchanged:
+            logger.info(f"[{self.name}] RSS feed 未变化，使用缓存内容")
+
         posts = parse_v2ex_feed(xml_text)
         logger.info(f"[{self.name}] RSS feed parsed: {len(posts)} entries")
 
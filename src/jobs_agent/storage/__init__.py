@@ -11,6 +11,9 @@ from typing import Literal
 from jobs_agent.storage.base import StorageClient, FileStat
 from jobs_agent.storage.local import LocalStorageClient
 from jobs_agent.storage.s3 import S3StorageClient
+from jobs_agent.storage.journal import RecordJournal
+from jobs_agent.storage.archive import DetailArchive, create_detail_archive_from_env
+from jobs_agent.storage.prefixed import PrefixedStorageClient
 
 logger = logging.getLogger(__name__)
 
@@ -119,6 +122,10 @@ __all__ = [
     "FileStat",
     "LocalStorageClient",
     "S3StorageClient",
+    "PrefixedStorageClient",
+    "RecordJournal",
+    "DetailArchive",
+    "create_detail_archive_from_env",
     "StorageType",
     "create_storage_client",
     "create_storage_from_env",
@@ -0,0 +1,159 @@
+"""
+抓取到的职位详情归档
+
+analyzed_jobs.json 只保存精简的已分析记录，修改提示词或换模型后无法重新评估旧职位。
+这里把每条 JobDetail 连同抓取时间按块写成 gzip 压缩的 JSON Lines，
+供 replay 子命令离线重新分析。每块写成独立文件，不依赖追加写，S3 同样适用；
+文件名以写入时间开头，按日期筛选时可跳过整块。
+"""
+
+import gzip
+import json
+import logging
+import os
+from datetime import datetime, timezone
+from typing import AsyncIterator, Optional, TypedDict
+
+from jobs_agent.sources.base import JobDetail
+from jobs_agent.storage.base import StorageClient
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_DIR = "archive/details"
+
+_CHUNK_TIME_FORMAT = "%Y%m%dT%H%M%S"
+
+
+class ArchivedDetail(TypedDict):
+    # 与 AnalyzedRecord.id 相同的 source:id
+    id: str
+    fetched_at: str
+    detail: JobDetail
+
+
+def _to_utc(value: datetime) -> datetime:
+    """统一为带时区的 UTC 时间；归档中的时间不带时区，按本地时间解释"""
+    return value.astimezone(timezone.utc)
+
+
+class DetailArchive:
+    """按块缓冲 JobDetail，满 chunk_size 条或 flush 时写出一个 .jsonl.gz"""
+
+    def __init__(
+        self,
+        storage: StorageClient,
+        chunk_size: int = 200,
+        directory: str = ARCHIVE_DIR,
+    ):
+        self.storage = storage
+        self.chunk_size = max(1, chunk_size)
+        self.directory = directory.rstrip("/")
+        self._buffer: list[ArchivedDetail] = []
+        self._chunk_seq = 0
+
+    async def add(self, detail: JobDetail) -> None:
+        self._buffer.append(
+            {
+                "id": f"{detail['source']}:{detail['id']}",
+                "fetched_at": datetime.now().isoformat(),
+                "detail": detail,
+            }
+        )
+        if len(self._buffer) >= self.chunk_size:
+            await self.flush()
+
+    async def flush(self) -> None:
+        if not self._buffer:
+            return
+        entries, self._buffer = self._buffer, []
+        self._chunk_seq += 1
+        name = (
+            f"{datetime.now().strftime(_CHUNK_TIME_FORMAT)}"
+            f"-{os.getpid()}-{self._chunk_seq:04d}.jsonl.gz"
+        )
+        payload = "".join(
+            json.dumps(entry, ensure_ascii=False) + "\n" for entry in entries
+        )
+        try:
+            await self.storage.write_file(
+                f"{self.directory}/{name}",
+                gzip.compress(payload.encode("utf-8"), compresslevel=6),
+            )
+            logger.info(f"已归档职位详情: {name} ({len(entries)} 条)")
+        except Exception as e:
+            logger.warning(f"归档职位详情失败: {e}")
+
+    async def _chunk_names(self) -> list[str]:
+        if not await self.storage.exists(self.directory):
+            return []
+        return sorted(
+            item.basename
+            for item in await self.storage.readdir(self.directory)
+            if item.type == "file" and item.basename.endswith(".jsonl.gz")
+        )
+
+    async def iter_entries(
+        self,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+    ) -> AsyncIterator[ArchivedDetail]:
+        """按写入顺序遍历归档，可按抓取时间 [since, until) 筛选，since/until 可以带时区"""
+        since = _to_utc(since) if since else None
+        until = _to_utc(until) if until else None
+        for name in await self._chunk_names():
+            try:
+                chunk_start = _to_utc(
+                    datetime.strptime(name.split("-", 1)[0], _CHUNK_TIME_FORMAT)
+                )
+            except ValueError:
+                chunk_start = None
+            # 块内记录都早于块的写入时间，块写入时间早于 since 的整块跳过
+            if since and chunk_start and chunk_start < since:
+                continue
+
+            try:
+                raw = await self.storage.read_file(f"{self.directory}/{name}")
+                lines = gzip.decompress(raw).decode("utf-8").splitlines()
+            except Exception as e:
+                logger.warning(f"读取归档失败，跳过: {name}: {e}")
+                continue
+
+            for line in lines:
+                if not line.strip():
+                    continue
+                try:
+                    entry = json.loads(line)
+                    fetched_at = _to_utc(datetime.fromisoformat(entry["fetched_at"]))
+                except (json.JSONDecodeError, KeyError, ValueError):
+                    continue
+                if since and fetched_at < since:
+                    continue
+                if until and fetched_at >= until:
+                    continue
+                yield entry
+
+    async def latest(
+        self,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+    ) -> dict[str, ArchivedDetail]:
+        """id → 最近一次归档的详情"""
+        entries: dict[str, ArchivedDetail] = {}
+        async for entry in self.iter_entries(since, until):
+            entries[entry["id"]] = entry
+        return entries
+
+
+def create_detail_archive_from_env(storage: StorageClient) -> Optional[DetailArchive]:
+    """
+    按环境变量创建详情归档
+
+    环境变量:
+        ARCHIVE_ENABLED: 是否归档抓取到的职位详情，默认 true
+        ARCHIVE_CHUNK_SIZE: 每个归档文件的详情条数，默认 200
+    """
+    if os.getenv("ARCHIVE_ENABLED", "true").lower() not in ("true", "1", "yes"):
+        return None
+    return DetailArchive(
+        storage, chunk_size=int(os.getenv("ARCHIVE_CHUNK_SIZE", "200"))
+    )
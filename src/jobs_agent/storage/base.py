@@ -135,3 +135,40 @@ class StorageClient(ABC):
             encoding: 文本编码
         """
         await self.write_file(path, content.encode(encoding))
+
+    async def append_text(
+        self, path: str, content: str, encoding: str = "utf-8"
+    ) -> None:
+        """
+        追加文本到文件末尾，文件不存在时创建
+
+        默认实现为读出后整体写回；支持原生追加的存储应覆盖此方法。
+
+        Args:
+            path: 文件路径
+            content: 追加的文本内容
+            encoding: 文本编码
+        """
+        existing = b""
+        if await self.exists(path):
+            existing = await self.read_file(path)
+        await self.write_file(path, existing + content.encode(encoding))
+
+    async def write_file_if_absent(self, path: str, content: Union[str, bytes]) -> bool:
+        """
+        文件不存在时写入，已存在时不覆盖
+
+        默认实现先检查再写入，不是原子操作；多个进程竞争同一路径时，
+        支持条件写入的存储应覆盖此方法。
+
+        Args:
+            path: 文件路径
+            content: 文件内容（字符串或字节）
+
+        Returns:
+            是否由本次调用创建了文件
+        """
+        if await self.exists(path):
+            return False
+        await self.write_file(path, content)
+        return True
@@ -0,0 +1,49 @@
+"""
+已分析记录的追加日志
+
+每条分析结果完成后立即追加一行到 journal，进程中途退出（超时、OOM、LLM 故障）
+也不会丢失已付费的分析。下次运行先回放 journal 合并进 analyzed_jobs.json，
+再清空 journal。
+"""
+
+import json
+import logging
+
+from jobs_agent.storage.base import StorageClient
+
+logger = logging.getLogger(__name__)
+
+JOURNAL_PATH = "analyzed_jobs.journal.jsonl"
+
+
+class RecordJournal:
+    """基于 StorageClient.append_text 的 JSON Lines 日志"""
+
+    def __init__(self, storage: StorageClient, path: str = JOURNAL_PATH):
+        self.storage = storage
+        self.path = path
+
+    async def append(self, record: dict) -> None:
+        await self.storage.append_text(
+            self.path, json.dumps(record, ensure_ascii=False) + "\n"
+        )
+
+    async def replay(self) -> list[dict]:
+        """读取全部记录；进程崩溃时最后一行可能不完整，跳过无法解析的行"""
+        if not await self.storage.exists(self.path):
+            return []
+
+        content = await self.storage.read_text(self.path)
+        records = []
+        for line_no, line in enumerate(content.splitlines(), 1):
+            if not line.strip():
+                continue
+            try:
+                records.append(json.loads(line))
+            except json.JSONDecodeError:
+                logger.warning(f"跳过损坏的 journal 记录: {self.path}:{line_no}")
+        return records
+
+    async def clear(self) -> None:
+        if await self.storage.exists(self.path):
+            await self.storage.unlink(self.path)
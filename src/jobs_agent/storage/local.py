@@ -8,6 +8,7 @@ import logging
 from pathlib import Path
 from typing import Union
 
+from jobs_agent.core.metrics import get_metrics
 from jobs_agent.storage.base import StorageClient, FileStat
 
 logger = logging.getLogger(__name__)
@@ -89,7 +90,12 @@ class LocalStorageClient(StorageClient):
             raise IsADirectoryError(f"不是文件: {path}")
 
         logger.debug(f"读取文件: {full_path}")
-        return full_path.read_bytes()
+        with get_metrics().timer("storage_op_seconds", backend="local", op="read"):
+            content = full_path.read_bytes()
+        get_metrics().inc(
+            "storage_bytes_total", len(content), backend="local", op="read"
+        )
+        return content
 
     async def write_file(self, path: str, content: Union[str, bytes]) -> None:
         """写入文件内容"""
@@ -101,7 +107,51 @@ class LocalStorageClient(StorageClient):
             content = content.encode("utf-8")
 
         logger.debug(f"写入文件: {full_path}, 大小: {len(content)} 字节")
-        full_path.write_bytes(content)
+        with get_metrics().timer("storage_op_seconds", backend="local", op="write"):
+            full_path.write_bytes(content)
+        get_metrics().inc(
+            "storage_bytes_total", len(content), backend="local", op="write"
+        )
+
+    async def append_text(
+        self, path: str, content: str, encoding: str = "utf-8"
+    ) -> None:
+        """追加文本，写入后 fsync 保证落盘"""
+        full_path = self._resolve_path(path)
+
+        full_path.parent.mkdir(parents=True, exist_ok=True)
+
+        data = content.encode(encoding)
+        with get_metrics().timer("storage_op_seconds", backend="local", op="append"):
+            with open(full_path, "ab") as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+        get_metrics().inc(
+            "storage_bytes_total", len(data), backend="local", op="append"
+        )
+        logger.debug(f"追加文件: {full_path}, 大小: {len(content)} 字符")
+
+    async def write_file_if_absent(self, path: str, content: Union[str, bytes]) -> bool:
+        """先写临时文件再硬链接到目标路径，目标已存在时链接失败，保证只有一个写入者成功"""
+        full_path = self._resolve_path(path)
+
+        full_path.parent.mkdir(parents=True, exist_ok=True)
+
+        if isinstance(content, str):
+            content = content.encode("utf-8")
+
+        tmp_path = full_path.with_name(f".{full_path.name}.{os.getpid()}.tmp")
+        with get_metrics().timer("storage_op_seconds", backend="local", op="create"):
+            tmp_path.write_bytes(content)
+            try:
+                os.link(tmp_path, full_path)
+            except FileExistsError:
+                return False
+            finally:
+                tmp_path.unlink(missing_ok=True)
+        logger.debug(f"创建文件: {full_path}, 大小: {len(content)} 字节")
+        return True
 
     async def unlink(self, path: str) -> None:
         """删除文件"""
@@ -0,0 +1,53 @@
+"""
+带路径前缀的存储视图
+
+分片运行时每个分片的状态文件（已分析记录、journal、水位线、指纹索引等）
+放在 shards/<index>/ 下，组件代码仍使用原来的相对路径。
+"""
+
+from typing import Union
+
+from jobs_agent.storage.base import FileStat, StorageClient
+
+
+class PrefixedStorageClient(StorageClient):
+    """把所有路径加上 prefix 后转交给底层存储"""
+
+    def __init__(self, inner: StorageClient, prefix: str):
+        self.inner = inner
+        self.prefix = prefix.strip("/")
+
+    def _path(self, path: str) -> str:
+        path = path.strip("/")
+        if path in ("", "."):
+            return self.prefix
+        return f"{self.prefix}/{path}"
+
+    async def readdir(self, path: str) -> list[FileStat]:
+        return await self.inner.readdir(self._path(path))
+
+    async def read_file(self, path: str) -> bytes:
+        return await self.inner.read_file(self._path(path))
+
+    async def write_file(self, path: str, content: Union[str, bytes]) -> None:
+        await self.inner.write_file(self._path(path), content)
+
+    async def write_file_if_absent(self, path: str, content: Union[str, bytes]) -> bool:
+        return await self.inner.write_file_if_absent(self._path(path), content)
+
+    async def append_text(
+        self, path: str, content: str, encoding: str = "utf-8"
+    ) -> None:
+        await self.inner.append_text(self._path(path), content, encoding)
+
+    async def unlink(self, path: str) -> None:
+        await self.inner.unlink(self._path(path))
+
+    async def stat(self, path: str) -> FileStat:
+        return await self.inner.stat(self._path(path))
+
+    async def exists(self, path: str) -> bool:
+        return await self.inner.exists(self._path(path))
+
+    async def ensure_dir(self, path: str) -> None:
+        await self.inner.ensure_dir(self._path(path))
@@ -12,6 +12,7 @@ import boto3
 from botocore.config import Config
 from botocore.exceptions import ClientError
 
+from jobs_agent.core.metrics import get_metrics
 from jobs_agent.storage.base import StorageClient, FileStat
 
 logger = logging.getLogger(__name__)
@@ -156,8 +157,13 @@ class S3StorageClient(StorageClient):
 
         try:
             logger.debug(f"读取 S3 对象: {key}")
-            response = self.client.get_object(Bucket=self.bucket, Key=key)
-            return response["Body"].read()
+            with get_metrics().timer("storage_op_seconds", backend="s3", op="read"):
+                response = self.client.get_object(Bucket=self.bucket, Key=key)
+                content = response["Body"].read()
+            get_metrics().inc(
+                "storage_bytes_total", len(content), backend="s3", op="read"
+            )
+            return content
         except ClientError as e:
             if e.response["Error"]["Code"] == "NoSuchKey":
                 raise FileNotFoundError(f"文件不存在: {path}")
@@ -173,11 +179,38 @@ class S3StorageClient(StorageClient):
 
         try:
             logger.debug(f"写入 S3 对象: {key}, 大小: {len(content)} 字节")
-            self.client.put_object(Bucket=self.bucket, Key=key, Body=content)
+            with get_metrics().timer("storage_op_seconds", backend="s3", op="write"):
+                self.client.put_object(Bucket=self.bucket, Key=key, Body=content)
+            get_metrics().inc(
+                "storage_bytes_total", len(content), backend="s3", op="write"
+            )
         except ClientError as e:
             logger.error(f"写入文件失败: {path}, 错误: {e}")
             raise
 
+    async def write_file_if_absent(self, path: str, content: Union[str, bytes]) -> bool:
+        """使用 If-None-Match: * 条件写入，对象已存在时服务端返回 412"""
+        key = self._get_key(path)
+
+        if isinstance(content, str):
+            content = content.encode("utf-8")
+
+        try:
+            with get_metrics().timer("storage_op_seconds", backend="s3", op="create"):
+                self.client.put_object(
+                    Bucket=self.bucket, Key=key, Body=content, IfNoneMatch="*"
+                )
+        except ClientError as e:
+            if e.response["Error"]["Code"] in (
+                "PreconditionFailed",
+                "ConditionalRequestConflict",
+            ):
+                return False
+            logger.error(f"条件写入文件失败: {path}, 错误: {e}")
+            raise
+        get_metrics().inc("storage_bytes_total", len(content), backend="s3", op="write")
+        return True
+
     async def unlink(self, path: str) -> None:
         """删除文件"""
         key = self._get_key(path)
@@ -0,0 +1,44 @@
+import pytest
+
+from jobs_agent.core import metrics as metrics_module
+from jobs_agent.core.metrics import Metrics
+from jobs_agent.storage.local import LocalStorageClient
+
+
+class FakeClock:
+    """可手动推进的时钟，替换被测模块中的 time.monotonic / time.time / time.sleep"""
+
+    def __init__(self, start: float = 1000.0):
+        self.now = start
+        self.sleeps: list[float] = []
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def time(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+    def advance(self, seconds: float) -> None:
+        self.now += seconds
+
+
+@pytest.fixture
+def clock() -> FakeClock:
+    return FakeClock()
+
+
+@pytest.fixture(autouse=True)
+def metrics(monkeypatch) -> Metrics:
+    """每个测试使用独立的指标注册表"""
+    registry = Metrics()
+    monkeypatch.setattr(metrics_module, "_metrics", registry)
+    return registry
+
+
+@pytest.fixture
+def storage(tmp_path) -> LocalStorageClient:
+    return LocalStorageClient(str(tmp_path))
@@ -0,0 +1,113 @@
+from datetime import datetime, timedelta, timezone
+from typing import AsyncIterator, Iterable
+from xml.sax.saxutils import escape
+
+from jobs_agent.sources.base import AnalysisResult, JobDetail, JobListItem
+
+
+def make_item(item_id: str, source: str = "fake") -> JobListItem:
+    return {
+        "id": item_id,
+        "source": source,
+        "url": f"https://{source}.test/{item_id}",
+        "title": f"职位 {item_id}",
+        "extra": {},
+    }
+
+
+def make_detail(
+    item_id: str, source: str = "fake", content: str | None = None
+) -> JobDetail:
+    item = make_item(item_id, source)
+    return {
+        "id": item_id,
+        "source": source,
+        "url": item["url"],
+        "title": item["title"],
+        "content": content if content is not None else f"招聘 Python 开发 {item_id}",
+        "tags": [],
+        "list_item": item,
+        "extra": {},
+    }
+
+
+def make_analysis(qualified: bool = False, reasoning: str = "ok") -> dict:
+    return {
+        "is_qualified": qualified,
+        "analysis": {
+            "is_recruitment": True,
+            "is_long_term": True,
+            "is_development": True,
+            "salary_meets_requirement": None,
+            "reasoning": reasoning,
+        },
+        "extracted_info": {
+            "company_introduction": "未提及",
+            "company_website": "未提及",
+            "job_responsibilities": "未提及",
+            "skill_requirements": "未提及",
+            "salary_benefits": "未提及",
+        },
+    }
+
+
+def make_result(detail: JobDetail, qualified: bool = False) -> AnalysisResult:
+    return {
+        "id": f"{detail['source']}:{detail['id']}",
+        "source": detail["source"],
+        "url": detail["url"],
+        "title": detail["title"],
+        "detail": detail,
+        "llm_analysis": make_analysis(qualified),
+        "analyzed_at": datetime.now().isoformat(),
+    }
+
+
+async def aiter_details(details: Iterable[JobDetail]) -> AsyncIterator[JobDetail]:
+    for detail in details:
+        yield detail
+
+
+def _published_at(index: int) -> str:
+    base = datetime(2025, 1, 1, tzinfo=timezone(timedelta(hours=8)))
+    return (base - timedelta(minutes=index * 7)).isoformat()
+
+
+def eleduck_list(page: int, count: int, page_size: int = 20) -> dict:
+    """eleduck 列表接口的替身数据：共 count 个帖子，按发布时间倒序分页"""
+    start = (page - 1) * page_size
+    posts = [
+        {
+            "id": f"post{i}",
+            "title": f"招聘 {i} 号岗位",
+            "full_title": f"招聘 {i} 号岗位",
+            "summary": f"远程招聘 Python 开发 {i}",
+            "published_at": _published_at(i),
+            "category": {"id": 5, "name": "招聘"},
+            "user": {"nickname": f"user{i}"},
+        }
+        for i in range(start, min(start + page_size, count))
+    ]
+    return {"posts": posts}
+
+
+def v2ex_feed(host: str, count: int) -> str:
+    """v2ex 酷工作节点 Atom feed 的替身数据"""
+    entries = []
+    for i in range(count):
+        url = f"http://{host}/t/{1_000_000 + i}"
+        content = escape(f"<p>远程招聘 Python 开发 {i}</p>")
+        entries.append(f"""<entry>
+<title>[远程] 招聘 v2ex {i}</title>
+<link rel="alternate" type="text/html" href="{url}"/>
+<id>tag:www.v2ex.com,2025:/t/{1_000_000 + i}</id>
+<published>{_published_at(i)}</published>
+<updated>{_published_at(i)}</updated>
+<author><name>v2user{i}</name></author>
+<content type="html">{content}</content>
+</entry>""")
+    return (
+        '<?xml version="1.0" encoding="utf-8"?>\n'
+        '<feed xmlns="http://www.w3.org/2005/Atom">\n'
+        "<title>V2EX - 酷工作</title>\n" + "\n".join(entries) + "\n</feed>\n"
+    )
@@ -0,0 +1,75 @@
+import asyncio
+import gzip
+import json
+import time
+from datetime import datetime
+
+import pytest
+
+from jobs_agent.storage.archive import ARCHIVE_DIR, DetailArchive
+from tests.helpers import make_detail
+
+
+@pytest.fixture
+def utc_local_time(monkeypatch):
+    """归档中的时间不带时区，按本地时间解释；固定本地时区为 UTC"""
+    monkeypatch.setenv("TZ", "UTC")
+    time.tzset()
+    yield
+    monkeypatch.undo()
+    time.tzset()
+
+
+def write_chunk(storage, name: str, fetched_at: list[str]) -> None:
+    lines = "".join(
+        json.dumps({"id": f"fake:{i}", "fetched_at": at, "detail": make_detail(str(i))})
+        + "\n"
+        for i, at in enumerate(fetched_at)
+    )
+    asyncio.run(
+        storage.write_file(f"{ARCHIVE_DIR}/{name}", gzip.compress(lines.encode()))
+    )
+
+
+def select(archive: DetailArchive, since=None, until=None) -> list[str]:
+    async def run():
+        return [entry["id"] async for entry in archive.iter_entries(since, until)]
+
+    return asyncio.run(run())
+
+
+@pytest.mark.usefixtures("utc_local_time")
+def test_timezone_aware_bounds_compare_with_naive_archive_times(storage):
+    write_chunk(
+        storage,
+        "20250701T020000-1-0001.jsonl.gz",
+        ["2025-07-01T00:30:00", "2025-07-01T01:30:00"],
+    )
+    archive = DetailArchive(storage)
+
+    # 2025-07-01T08:00+08:00 即 00:00 UTC
+    assert select(archive, since=datetime.fromisoformat("2025-07-01T08:00+08:00")) == [
+        "fake:0",
+        "fake:1",
+    ]
+    assert select(archive, since=datetime.fromisoformat("2025-07-01T01:00+00:00")) == [
+        "fake:1"
+    ]
+    assert select(archive, until=datetime.fromisoformat("2025-07-01T09:00+08:00")) == [
+        "fake:0"
+    ]
+    # 不带时区的参数按本地时间解释，行为与之前一致
+    assert select(archive, since=datetime.fromisoformat("2025-07-01T01:00")) == [
+        "fake:1"
+    ]
+
+
+@pytest.mark.usefixtures("utc_local_time")
+def test_chunks_written_before_since_are_skipped(storage):
+    write_chunk(storage, "20250601T000000-1-0001.jsonl.gz", ["2025-07-02T00:00:00"])
+    write_chunk(storage, "20250703T000000-1-0002.jsonl.gz", ["2025-07-02T12:00:00"])
+    archive = DetailArchive(storage)
+
+    since = datetime.fromisoformat("2025-07-02T00:00+00:00")
+    assert select(archive, since=since) == ["fake:0"]
+    assert len(select(archive)) == 2
@@ -0,0 +1,86 @@
+import asyncio
+import json
+
+from jobs_agent.core.batch import build_batch_requests, collect_batch, submit_batch
+from jobs_agent.llm.openai import OpenAIChat
+from tests.helpers import make_analysis, make_detail
+
+
+class FakeBatchClient:
+    """按 replies（custom_id → 回复内容）生成结果文件的 Batch API 替身"""
+
+    endpoint = "/v1/chat/completions"
+
+    def __init__(self, replies: dict[str, str]):
+        self.replies = replies
+        self.uploaded = b""
+
+    async def upload(self, content: bytes, filename: str) -> str:
+        self.uploaded = content
+        return "file-in"
+
+    async def create(self, file_id: str, metadata: dict) -> dict:
+        return {"id": "batch_1", "status": "validating"}
+
+    async def retrieve(self, batch_id: str) -> dict:
+        return {"id": batch_id, "status": "completed", "output_file_id": "file-out"}
+
+    async def content(self, file_id: str) -> bytes:
+        lines = [
+            {
+                "custom_id": custom_id,
+                "response": {
+                    "status_code": 200,
+                    "body": {"choices": [{"message": {"content": reply}}]},
+                },
+            }
+            for custom_id, reply in self.replies.items()
+        ]
+        return "".join(json.dumps(line) + "\n" for line in lines).encode()
+
+
+def llm(structured_output: str = "auto") -> OpenAIChat:
+    return OpenAIChat(
+        api_key="k",
+        model="m",
+        base_url="https://batch.test/v1",
+        structured_output=structured_output,
+    )
+
+
+def test_request_bodies_carry_the_analysis_response_format():
+    lines = build_batch_requests(
+        llm(), [make_detail("1")], None, FakeBatchClient.endpoint
+    ).splitlines()
+    body = json.loads(lines[0])["body"]
+    assert body["response_format"]["type"] == "json_schema"
+    assert body["response_format"]["json_schema"]["name"] == "job_analysis"
+
+    body = json.loads(
+        build_batch_requests(llm("json_object"), [make_detail("1")], None, "/v1")
+    )["body"]
+    assert body["response_format"] == {"type": "json_object"}
+
+
+def test_collected_replies_are_parsed_like_online_replies(storage, metrics):
+    details = [make_detail(str(i)) for i in range(4)]
+    analysis = json.dumps(make_analysis(qualified=True))
+    client = FakeBatchClient(
+        {
+            "fake:0": analysis,
+            # 接口没有遵守 response_format 时仍按原方式清理
+            "fake:1": f"```json\n{analysis}\n```",
+            "fake:2": "无法解析",
+        }
+    )
+
+    async def run():
+        submitted = await submit_batch(client, llm(), storage, details)
+        return submitted, await collect_batch(client, llm(), storage, submitted)
+
+    submitted, outcome = asyncio.run(run())
+    assert submitted["structured_mode"] == "json_schema"
+    assert [r["id"] for r in outcome.results] == ["fake:0", "fake:1"]
+    assert all(r["llm_analysis"]["is_qualified"] for r in outcome.results)
+    assert [d["id"] for d in outcome.failed] == ["2", "3"]
+    assert metrics.total("llm_structured_replies_total", outcome="ok") == 1
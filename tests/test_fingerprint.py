@@ -0,0 +1,108 @@
+import asyncio
+
+from jobs_agent.core.fingerprint import (
+    FingerprintIndex,
+    content_fingerprint,
+    normalize_text,
+)
+from tests.helpers import make_detail, make_result
+
+BODY = (
+    "招聘远程 Python 后端工程师，负责数据平台开发，要求熟悉 asyncio 和 PostgreSQL，薪资面议。"
+    * 2
+)
+
+
+def copies(*sources: str) -> list[dict]:
+    details = []
+    for i, source in enumerate(sources):
+        detail = make_detail(str(i), source=source, content=BODY)
+        detail["title"] = "Python 后端"
+        details.append(detail)
+    return details
+
+
+class CountingAnalyzer:
+    def __init__(self, delay: float = 0.02, fail: bool = False):
+        self.delay = delay
+        self.fail = fail
+        self.calls: list[str] = []
+
+    async def __call__(self, detail):
+        self.calls.append(detail["id"])
+        await asyncio.sleep(self.delay)
+        return None if self.fail else make_result(detail, qualified=True)
+
+
+def test_normalization_ignores_markup_links_and_width():
+    plain = normalize_text("Python 开发，详见 https://x.test/a")
+    assert plain == normalize_text("<p>ＰＹＴＨＯＮ　开发!详见</p>")
+    assert plain == "python开发详见"
+
+
+def test_short_content_is_never_deduplicated():
+    detail = make_detail("1", content="面议")
+    assert content_fingerprint(detail) is None
+
+    analyzer = CountingAnalyzer(delay=0)
+    index = FingerprintIndex()
+
+    async def run():
+        await index.dedup(detail, analyzer)
+        await index.dedup(make_detail("2", content="面议"), analyzer)
+
+    asyncio.run(run())
+    assert analyzer.calls == ["1", "2"]
+
+
+def test_concurrent_copies_share_one_analysis(metrics):
+    analyzer = CountingAnalyzer()
+    index = FingerprintIndex()
+
+    async def run():
+        return await asyncio.gather(
+            *(
+                index.dedup(detail, analyzer)
+                for detail in copies("v2ex", "eleduck", "x")
+            )
+        )
+
+    first, second, third = asyncio.run(run())
+    assert analyzer.calls == ["0"]
+    assert "duplicate_of" not in first
+    assert second["duplicate_of"] == third["duplicate_of"] == "v2ex:0"
+    assert second["id"] == "eleduck:1"
+    assert second["llm_analysis"] is first["llm_analysis"]
+    assert metrics.total("duplicates_reused_total", kind="exact") == 2
+
+
+def test_waiters_analyze_themselves_when_the_first_analysis_fails():
+    analyzer = CountingAnalyzer(fail=True)
+    index = FingerprintIndex()
+
+    async def run():
+        return await asyncio.gather(
+            *(index.dedup(detail, analyzer) for detail in copies("v2ex", "eleduck"))
+        )
+
+    assert asyncio.run(run()) == [None, None]
+    assert analyzer.calls == ["0", "1"]
+
+
+def test_index_persists_between_runs(storage):
+    first, second = copies("v2ex", "eleduck")
+
+    async def run():
+        index = FingerprintIndex()
+        await index.dedup(first, CountingAnalyzer(delay=0))
+        await index.save(storage)
+
+        restarted = FingerprintIndex()
+        await restarted.load(storage)
+        analyzer = CountingAnalyzer(delay=0)
+        result = await restarted.dedup(second, analyzer)
+        return result, analyzer.calls
+
+    result, calls = asyncio.run(run())
+    assert calls == []
+    assert result["duplicate_of"] == "v2ex:0"
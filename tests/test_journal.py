@@ -0,0 +1,47 @@
+import asyncio
+import json
+
+from jobs_agent.core.sink import ResultSink, load_history
+from jobs_agent.storage.journal import RecordJournal
+from tests.helpers import make_detail, make_result
+
+
+def test_replay_skips_truncated_last_line(storage):
+    journal = RecordJournal(storage)
+
+    async def run():
+        await journal.append({"id": "fake:1"})
+        await journal.append({"id": "fake:2"})
+        # 进程在写入中途被杀，最后一行不完整
+        await storage.append_text(journal.path, '{"id": "fake:3", "is_qua')
+        return await journal.replay()
+
+    assert asyncio.run(run()) == [{"id": "fake:1"}, {"id": "fake:2"}]
+
+
+def test_records_survive_a_crash_before_flush(storage):
+    async def crashed_run():
+        sink = ResultSink(
+            storage, history=[], journal=RecordJournal(storage), flush_every=100
+        )
+        for i in range(3):
+            await sink.add(make_result(make_detail(str(i))))
+        # 没有调用 close()：analyzed_jobs.json 尚未写入
+
+    async def next_run():
+        await storage.write_text(
+            "analyzed_jobs.json", json.dumps([{"id": "fake:old"}, {"id": "fake:1"}])
+        )
+        journal = RecordJournal(storage)
+        history = await load_history(storage, journal)
+        return history, await storage.exists(journal.path)
+
+    asyncio.run(crashed_run())
+    history, journal_left = asyncio.run(next_run())
+
+    ids = [record["id"] for record in history]
+    assert ids == ["fake:0", "fake:2", "fake:old", "fake:1"]
+    assert not journal_left
+
+    saved = json.loads(asyncio.run(storage.read_text("analyzed_jobs.json")))
+    assert [record["id"] for record in saved] == ids
@@ -0,0 +1,104 @@
+import asyncio
+
+import httpx
+import pytest
+
+from jobs_agent.core import llmcache as llmcache_module
+from jobs_agent.core.llmcache import LLMCache, llm_cache_key
+from jobs_agent.llm import openai as openai_module
+from jobs_agent.llm.openai import OpenAIChat
+
+ENDPOINT = "https://llm.test/v1"
+PAYLOAD = {
+    "model": "m",
+    "messages": [{"role": "user", "content": "hi"}],
+    "temperature": 0.7,
+}
+
+
+@pytest.fixture
+def clock(clock, monkeypatch):
+    monkeypatch.setattr(llmcache_module, "time", clock)
+    return clock
+
+
+def test_key_covers_endpoint_and_every_payload_field():
+    key = llm_cache_key(ENDPOINT, PAYLOAD)
+    assert key == llm_cache_key(ENDPOINT, dict(reversed(PAYLOAD.items())))
+    assert key != llm_cache_key("https://other.test/v1", PAYLOAD)
+    for change in (
+        {"model": "n"},
+        {"temperature": 0},
+        {"messages": [{"role": "user", "content": "hello"}]},
+        {"response_format": {"type": "json_object"}},
+    ):
+        assert key != llm_cache_key(ENDPOINT, {**PAYLOAD, **change})
+
+
+def test_entries_expire_after_ttl(clock, metrics):
+    cache = LLMCache(ttl_seconds=60)
+    cache.put("k", "reply")
+
+    clock.advance(59)
+    assert cache.get("k") == "reply"
+    # 命中只刷新使用时间，不延长存放时间
+    clock.advance(2)
+    assert cache.get("k") is None
+    assert metrics.total("llm_cache_total", outcome="hit") == 1
+    assert metrics.total("llm_cache_total", outcome="miss") == 1
+
+
+def test_save_keeps_most_recently_used_within_limits(storage, clock, metrics):
+    cache = LLMCache(max_entries=2, max_bytes=0)
+    for key in ("a", "b", "c"):
+        cache.put(key, key * 10)
+        clock.advance(1)
+    cache.get("a")
+
+    asyncio.run(cache.save(storage))
+    restored = LLMCache()
+    asyncio.run(restored.load(storage))
+    assert [restored.get(key) for key in "abc"] == ["a" * 10, None, "c" * 10]
+    assert metrics.total("llm_cache_evictions_total") == 1
+
+
+def test_save_enforces_size_limit_and_drops_expired(storage, clock, metrics):
+    cache = LLMCache(max_bytes=25, ttl_seconds=100)
+    cache.put("old", "x")
+    clock.advance(101)
+    for key in ("a", "b", "c"):
+        cache.put(key, key * 10)
+        clock.advance(1)
+
+    asyncio.run(cache.save(storage))
+    restored = LLMCache(ttl_seconds=100)
+    asyncio.run(restored.load(storage))
+    assert [restored.get(key) for key in ("old", "a", "b", "c")] == [
+        None,
+        None,
+        "b" * 10,
+        "c" * 10,
+    ]
+    assert metrics.total("llm_cache_evictions_total") == 2
+
+
+def test_chat_serves_repeated_prompts_from_cache(monkeypatch):
+    calls: list[httpx.Request] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        reply = f"reply {len(calls)}"
+        return httpx.Response(200, json={"choices": [{"message": {"content": reply}}]})
+
+    client = httpx.Client(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(openai_module, "get_client", lambda: client)
+    monkeypatch.setattr(llmcache_module, "_cache", LLMCache())
+    llm = OpenAIChat(api_key="k", model="m", base_url=ENDPOINT)
+
+    assert llm.chat("hi") == "reply 1"
+    assert llm.chat("hi") == "reply 1"
+    assert llm.chat("hi", temperature=0) == "reply 2"
+    # 跳过查找时仍然请求，并用新回复更新缓存
+    assert llm.chat("hi", use_cache=False) == "reply 3"
+    assert llm.chat("hi") == "reply 3"
+    assert len(calls) == 3
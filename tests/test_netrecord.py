@@ -0,0 +1,28 @@
+import httpx
+
+from jobs_agent.core.netrecord import (
+    AsyncRecordingTransport,
+    AsyncReplayTransport,
+    wrap_async_transport_from_env,
+)
+
+
+def test_async_replay_does_not_create_the_inner_transport(monkeypatch, tmp_path):
+    created: list[httpx.AsyncBaseTransport] = []
+
+    def make_inner() -> httpx.AsyncBaseTransport:
+        created.append(httpx.AsyncHTTPTransport())
+        return created[-1]
+
+    monkeypatch.setenv("NET_ARCHIVE_DIR", str(tmp_path))
+    monkeypatch.setenv("NET_MODE", "replay")
+    assert isinstance(wrap_async_transport_from_env(make_inner), AsyncReplayTransport)
+    assert created == []
+
+    monkeypatch.setenv("NET_MODE", "record")
+    assert isinstance(
+        wrap_async_transport_from_env(make_inner), AsyncRecordingTransport
+    )
+    monkeypatch.setenv("NET_MODE", "live")
+    assert wrap_async_transport_from_env(make_inner) is created[-1]
+    assert len(created) == 2
@@ -0,0 +1,121 @@
+import asyncio
+import json
+
+from jobs_agent.core.packing import JobPacker
+from jobs_agent.llm.base import BaseLLM
+from tests.helpers import make_analysis, make_detail
+
+
+class FakeLLM(BaseLLM):
+    """合并请求按 packed 返回回复，单条请求返回不符合条件的分析"""
+
+    def __init__(self, packed=None):
+        self.packed = packed
+        self.calls: list[str] = []
+
+    @property
+    def model_name(self) -> str:
+        return "fake"
+
+    def chat(self, message: str, keep_history: bool = True, **kwargs) -> str:
+        raise NotImplementedError
+
+    async def chat_async(self, message: str, keep_history: bool = True, **kwargs):
+        await asyncio.sleep(0)
+        # 单条分析附带 response_format，合并分析没有
+        if "response_format" in kwargs:
+            self.calls.append("one")
+            return json.dumps(make_analysis(reasoning="one"))
+        self.calls.append("packed")
+        return self.packed(message) if callable(self.packed) else self.packed
+
+
+def packed_reply(*ids: str) -> str:
+    return json.dumps(
+        [{"id": i, **make_analysis(qualified=True, reasoning="packed")} for i in ids]
+    )
+
+
+def analyze_all(packer: JobPacker, count: int) -> list[dict]:
+    async def run():
+        return await asyncio.wait_for(
+            asyncio.gather(
+                *(packer.analyze(make_detail(str(i))) for i in range(count))
+            ),
+            timeout=5,
+        )
+
+    return asyncio.run(run())
+
+
+def reasons(results: list[dict]) -> list[str]:
+    return [r["llm_analysis"]["analysis"]["reasoning"] for r in results]
+
+
+def test_full_batch_is_sent_without_waiting_for_linger(metrics):
+    llm = FakeLLM(packed_reply("1", "2", "3"))
+    packer = JobPacker(llm, max_jobs=3, linger=60)
+
+    results = analyze_all(packer, 3)
+    assert llm.calls == ["packed"]
+    assert [r["id"] for r in results] == ["fake:0", "fake:1", "fake:2"]
+    assert reasons(results) == ["packed"] * 3
+    assert metrics.total("llm_pack_batches_total", outcome="ok") == 1
+
+
+def test_partial_batch_is_sent_after_linger():
+    llm = FakeLLM(packed_reply("1", "2"))
+    packer = JobPacker(llm, max_jobs=4, linger=0.05)
+
+    async def run():
+        pending = [
+            asyncio.create_task(packer.analyze(make_detail(str(i)))) for i in range(2)
+        ]
+        await asyncio.sleep(0.01)
+        assert llm.calls == []
+        return await asyncio.wait_for(asyncio.gather(*pending), timeout=1)
+
+    assert reasons(asyncio.run(run())) == ["packed"] * 2
+    assert llm.calls == ["packed"]
+
+
+def test_lone_job_after_linger_is_analyzed_alone():
+    llm = FakeLLM(packed_reply("1"))
+    packer = JobPacker(llm, max_jobs=4, linger=0.01)
+
+    assert reasons(analyze_all(packer, 1)) == ["one"]
+    assert llm.calls == ["one"]
+
+
+def test_missing_and_malformed_entries_fall_back_per_item(metrics):
+    def reply(prompt: str) -> str:
+        # 第 2 条缺少结论字段，第 3 条没有返回
+        entries = json.loads(packed_reply("1", "2"))
+        del entries[1]["is_qualified"]
+        return json.dumps(entries)
+
+    llm = FakeLLM(reply)
+    packer = JobPacker(llm, max_jobs=3, linger=60)
+
+    assert reasons(analyze_all(packer, 3)) == ["packed", "one", "one"]
+    assert llm.calls == ["packed", "one", "one"]
+    assert metrics.total("llm_pack_batches_total", outcome="partial") == 1
+    assert metrics.total("llm_pack_fallbacks_total") == 2
+
+
+def test_unparseable_reply_falls_back_for_the_whole_batch(metrics):
+    llm = FakeLLM('{"id": "1", "is_qualified": true}')
+    packer = JobPacker(llm, max_jobs=2, linger=60)
+
+    assert reasons(analyze_all(packer, 2)) == ["one", "one"]
+    assert metrics.total("llm_pack_batches_total", outcome="failed") == 1
+    assert metrics.total("llm_pack_fallbacks_total") == 2
+
+
+def test_batches_are_split_by_token_estimate():
+    llm = FakeLLM(lambda prompt: packed_reply("1", "2"))
+    # 每条约 11 token，两条凑满上限
+    packer = JobPacker(llm, max_jobs=8, max_tokens=24, linger=0.01)
+
+    assert reasons(analyze_all(packer, 4)) == ["packed"] * 4
+    assert llm.calls == ["packed", "packed"]
@@ -0,0 +1,83 @@
+import json
+
+import pytest
+
+from jobs_agent.core.prefilter import DEFAULT_RULES, Prefilter, load_rules, match_rule
+from tests.helpers import make_detail
+
+
+def eleduck_detail(tags: dict[str, list[str]], category_id: str = "5") -> dict:
+    detail = make_detail("1", source="eleduck")
+    detail["tags"] = [
+        {"category": name, "values": values} for name, values in tags.items()
+    ]
+    detail["list_item"]["extra"] = {"category_id": category_id}
+    return detail
+
+
+REMOTE_DEV = {"招聘类型": ["全职"], "工作方式": ["远程工作"], "职业": ["开发"]}
+
+
+@pytest.mark.parametrize(
+    "tags, category_id, rejected_by",
+    [
+        (REMOTE_DEV, "5", None),
+        ({**REMOTE_DEV, "招聘类型": ["外包零活"]}, "5", "外包零活"),
+        ({**REMOTE_DEV, "工作方式": ["坐班"]}, "5", "非远程"),
+        # all：全部职业都是非开发才拒绝
+        ({**REMOTE_DEV, "职业": ["产品", "设计"]}, "5", "非开发岗位"),
+        ({**REMOTE_DEV, "职业": ["产品", "开发"]}, "5", None),
+        # exact：只有完全相等才命中
+        (REMOTE_DEV, "22", "人才库"),
+        (REMOTE_DEV, "122", None),
+        # 字段缺失时规则不生效
+        ({}, "5", None),
+    ],
+)
+def test_default_rules(tags, category_id, rejected_by):
+    result = Prefilter(DEFAULT_RULES).check(eleduck_detail(tags, category_id))
+    if rejected_by is None:
+        assert result is None
+    else:
+        assert result["filtered_by"] == rejected_by
+        assert result["llm_analysis"]["is_qualified"] is False
+
+
+def test_first_matching_rule_wins_and_is_counted(metrics):
+    prefilter = Prefilter(DEFAULT_RULES)
+    tags = {"招聘类型": ["外包零活"], "工作方式": ["坐班"]}
+    assert prefilter.check(eleduck_detail(tags))["filtered_by"] == "外包零活"
+    assert prefilter.saved_calls == 1
+    assert metrics.total("prefilter_rejected_total", rule="外包零活") == 1
+
+
+def test_rules_are_scoped_to_their_source():
+    detail = make_detail("1", source="v2ex")
+    detail["tags"] = [{"category": "招聘类型", "values": ["外包零活"]}]
+    assert Prefilter(DEFAULT_RULES).check(detail) is None
+
+
+def test_title_and_extra_fields():
+    rule = {"name": "求职", "field": "title", "match": "any", "keywords": ["求职"]}
+    detail = make_detail("1")
+    detail["title"] = "【求职】Python 开发"
+    assert match_rule(rule, detail) == ["【求职】Python 开发"]
+
+    rule = {"field": "extra.category", "match": "none", "keywords": ["招聘"]}
+    detail["extra"]["category"] = "闲聊"
+    assert match_rule(rule, detail) == ["闲聊"]
+
+
+def test_disabled_prefilter_passes_everything():
+    detail = eleduck_detail({"招聘类型": ["外包零活"]})
+    assert Prefilter(DEFAULT_RULES, enabled=False).check(detail) is None
+
+
+def test_load_rules_requires_a_list(tmp_path):
+    path = tmp_path / "rules.json"
+    path.write_text(json.dumps(DEFAULT_RULES[:1]), encoding="utf-8")
+    assert load_rules(str(path)) == DEFAULT_RULES[:1]
+
+    path.write_text(json.dumps({"name": "x"}), encoding="utf-8")
+    with pytest.raises(ValueError):
+        load_rules(str(path))
@@ -0,0 +1,102 @@
+import asyncio
+from email.utils import format_datetime
+from datetime import datetime, timedelta, timezone
+
+import httpx
+import pytest
+
+from jobs_agent.core import fetch, ratelimit
+from jobs_agent.core.ratelimit import AdaptiveRateLimiter, parse_retry_after
+
+
+@pytest.fixture
+def limiter(clock, monkeypatch) -> AdaptiveRateLimiter:
+    monkeypatch.setattr(ratelimit, "time", clock)
+    return AdaptiveRateLimiter(
+        initial_rate=2.0,
+        min_rate=0.2,
+        max_rate=4.0,
+        burst=1.0,
+        increase=0.5,
+        decrease=0.5,
+        max_retry_after=30.0,
+    )
+
+
+def test_parse_retry_after_seconds_and_date():
+    assert parse_retry_after("5") == 5.0
+    assert parse_retry_after("-3") == 0.0
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("soon") is None
+
+    when = datetime.now(timezone.utc) + timedelta(seconds=60)
+    assert 55 < parse_retry_after(format_datetime(when, usegmt=True)) <= 60
+
+
+def test_tokens_refill_at_current_rate(limiter, clock):
+    assert limiter.acquire("h") == 0.0
+    # 2 req/s，下一个令牌需要 0.5 秒
+    assert limiter.acquire("h") == pytest.approx(0.5)
+    assert clock.sleeps == [pytest.approx(0.5)]
+
+
+def test_backoff_halves_rate_and_honours_retry_after(limiter, clock):
+    limiter.acquire("h")
+    limiter.on_response("h", 429, retry_after=5.0)
+    assert limiter.rates()["h"] == 1.0
+
+    # 被封锁到 Retry-After 结束，封锁期间按新速率补充的令牌足够立即放行
+    assert limiter.acquire("h") == pytest.approx(5.0)
+    assert limiter.acquire("h") == pytest.approx(1.0)
+    # 其他主机不受影响
+    assert limiter.acquire("other") == 0.0
+
+
+def test_retry_after_is_capped(limiter):
+    limiter.on_response("h", 503, retry_after=3600.0)
+    assert limiter.acquire("h") == pytest.approx(30.0)
+
+
+def test_recovery_is_additive_and_clamped(limiter):
+    for _ in range(10):
+        limiter.on_response("h", 429)
+    assert limiter.rates()["h"] == 0.2
+
+    limiter.on_response("h", 200)
+    assert limiter.rates()["h"] == pytest.approx(0.7)
+    for _ in range(10):
+        limiter.on_response("h", 200)
+    assert limiter.rates()["h"] == 4.0
+
+    # 其他 4xx 不改变速率
+    limiter.on_response("h", 404)
+    assert limiter.rates()["h"] == 4.0
+
+
+def test_learned_rates_survive_restart(limiter, storage):
+    limiter.on_response("h", 429)
+    asyncio.run(limiter.save(storage))
+
+    restarted = AdaptiveRateLimiter(initial_rate=2.0, min_rate=0.2, max_rate=4.0)
+    asyncio.run(restarted.load(storage))
+    assert restarted.rates() == {"h": 1.0}
+
+
+def test_fetch_waits_for_retry_after_then_succeeds(limiter, clock, monkeypatch):
+    responses = iter(
+        [
+            httpx.Response(429, headers={"Retry-After": "3"}),
+            httpx.Response(200, text="ok"),
+        ]
+    )
+    client = httpx.Client(transport=httpx.MockTransport(lambda _: next(responses)))
+    monkeypatch.setattr(fetch, "get_client", lambda: client)
+    monkeypatch.setattr(fetch, "get_rate_limiter", lambda: limiter)
+    monkeypatch.setattr(fetch, "time", clock)
+
+    response = fetch._request_with_retry("GET", "https://example.com/list")
+
+    assert response.status_code == 200
+    assert clock.sleeps[0] == 3.0
+    assert limiter.rates()["example.com"] == pytest.approx(1.0 + 0.5)
+    assert fetch.get_metrics().total("http_retries_total") == 1
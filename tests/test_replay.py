@@ -0,0 +1,93 @@
+import asyncio
+import json
+
+import pytest
+
+from jobs_agent.core.replay import replay
+from jobs_agent.llm.base import BaseLLM
+from tests.helpers import make_analysis, make_detail
+
+
+class FakeLLM(BaseLLM):
+    """按提示词中的标记回复，记录每次请求和最大并发数"""
+
+    def __init__(self, replies: dict[str, list]):
+        self.replies = replies
+        self.calls: list[tuple[str, bool]] = []
+        self.running = 0
+        self.peak = 0
+
+    @property
+    def model_name(self) -> str:
+        return "fake"
+
+    def chat(self, message: str, keep_history: bool = True, **kwargs) -> str:
+        raise NotImplementedError
+
+    async def chat_async(self, message: str, keep_history: bool = True, **kwargs):
+        marker = next(m for m in self.replies if m in message)
+        self.calls.append((marker, kwargs.get("use_cache", True)))
+        self.running += 1
+        self.peak = max(self.peak, self.running)
+        try:
+            await asyncio.sleep(0.01)
+            reply = self.replies[marker].pop(0)
+        finally:
+            self.running -= 1
+        if isinstance(reply, Exception):
+            raise reply
+        return reply
+
+
+def test_chat_many_bounds_concurrency_and_keeps_order():
+    llm = FakeLLM({f"m{i}": [f"r{i}"] for i in range(6)})
+    replies = asyncio.run(llm.chat_many([f"m{i}" for i in range(6)], concurrency=2))
+
+    assert replies == [f"r{i}" for i in range(6)]
+    assert llm.peak == 2
+
+
+def test_chat_many_returns_exceptions_in_place():
+    llm = FakeLLM({"a": ["ra"], "b": [RuntimeError("boom")]})
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(llm.chat_many(["a", "b"]))
+
+    llm = FakeLLM({"a": ["ra"], "b": [RuntimeError("boom")]})
+    first, second = asyncio.run(llm.chat_many(["a", "b"], return_exceptions=True))
+    assert first == "ra"
+    assert isinstance(second, RuntimeError)
+
+
+def test_replay_retries_unparseable_replies_and_skips_failures():
+    qualified = json.dumps(make_analysis(qualified=True))
+    llm = FakeLLM(
+        {
+            "job-a": [qualified],
+            "job-b": ["无法解析", qualified],
+            "job-c": [RuntimeError("timeout")],
+        }
+    )
+    entries = [
+        {
+            "id": f"fake:{i}",
+            "fetched_at": "2025-01-01T00:00:00",
+            "detail": make_detail(i, content=f"job-{i}"),
+        }
+        for i in "abc"
+    ]
+    history = [{"id": "fake:a", "is_qualified": False, "reason": "旧结论"}]
+
+    report = asyncio.run(replay(llm, entries, history, workers=2))
+
+    # 只重发无法解析的那条，且重试时跳过缓存
+    assert llm.calls == [
+        ("job-a", True),
+        ("job-b", True),
+        ("job-c", True),
+        ("job-b", False),
+    ]
+    assert llm.peak == 2
+    assert (report.analyzed, report.failed) == (2, 1)
+    assert (report.newly_qualified, report.no_baseline) == (1, 1)
+    assert [diff["id"] for diff in report.diffs] == ["fake:a", "fake:b"]
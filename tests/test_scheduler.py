@@ -0,0 +1,162 @@
+import asyncio
+import json
+from typing import Optional
+
+from jobs_agent.core.pipeline import iter_details
+from jobs_agent.core.scheduler import (
+    PENDING_JOBS_PATH,
+    PendingJobs,
+    RunBudget,
+    prioritized,
+)
+from jobs_agent.core.stream import run_pipeline
+from jobs_agent.sources.base import BaseSource, JobDetail, JobListItem
+from tests.helpers import aiter_details, make_detail, make_item
+
+
+class FakeSource(BaseSource):
+    def __init__(self, ids: list[str]):
+        self.ids = ids
+
+    @property
+    def name(self) -> str:
+        return "fake"
+
+    def fetch_list(self) -> list[JobListItem]:
+        return [make_item(item_id) for item_id in self.ids]
+
+    def fetch_detail(self, item: JobListItem) -> Optional[JobDetail]:
+        return make_detail(item["id"])
+
+
+def run_once(source, storage, metrics, token_limit: int = 0) -> list[str]:
+    """按 process_data 的方式串起抓取、调度和预算，返回本次分析的职位 id"""
+
+    async def run():
+        pending = PendingJobs()
+        await pending.load(storage)
+        budget = RunBudget(token_limit=token_limit, est_job_tokens=1000)
+        carried = pending.take_all()
+        unfetched: list[JobListItem] = []
+        analyzed: list[str] = []
+        try:
+            async for detail in prioritized(
+                iter_details(
+                    [source],
+                    window=2,
+                    source_timeout=5,
+                    carried=pending.take_items(),
+                    unfetched=unfetched,
+                ),
+                priority=lambda detail: 0.0,
+                budget=budget,
+                pending=pending,
+                carried=carried,
+                window=3,
+            ):
+                if not budget.admit():
+                    pending.add(detail)
+                    continue
+                analyzed.append(detail["id"])
+                metrics.inc("llm_tokens_total", 1000)
+                budget.done(1.0)
+        finally:
+            for item in unfetched:
+                pending.add_item(item)
+            await pending.save(storage)
+        return analyzed
+
+    return asyncio.run(run())
+
+
+def test_next_run_picks_up_every_item_left_by_the_budget(storage, metrics):
+    ids = [str(i) for i in range(20)]
+    source = FakeSource(ids)
+
+    first = run_once(source, storage, metrics, token_limit=5500)
+    assert len(first) == 5
+    saved = json.loads(asyncio.run(storage.read_text(PENDING_JOBS_PATH)))
+    # 缓冲中的详情和尚未抓取详情的列表项都留给下次
+    assert saved["details"] and saved["items"]
+    assert len(saved["details"]) + len(saved["items"]) == 15
+
+    # 下次运行时列表页未变化，没有列出任何帖子
+    source.ids = []
+    second = run_once(source, storage, metrics)
+    assert sorted(first + second, key=int) == ids
+    assert not set(first) & set(second)
+    assert not asyncio.run(storage.exists(PENDING_JOBS_PATH))
+
+
+def test_pending_jobs_loads_the_old_details_only_format(storage):
+    asyncio.run(storage.write_text(PENDING_JOBS_PATH, json.dumps([make_detail("1")])))
+    pending = PendingJobs()
+    asyncio.run(pending.load(storage))
+    pending.add_item(make_item("1"))
+    pending.add_item(make_item("2"))
+
+    assert [detail["id"] for detail in pending.take_all()] == ["1"]
+    assert [item["id"] for item in pending.take_items()] == ["2"]
+
+
+class SlowSource(FakeSource):
+    """详情逐条慢速到达，记录抓取完成的顺序"""
+
+    def __init__(self, ids: list[str], events: list[str]):
+        super().__init__(ids)
+        self.events = events
+
+    async def fetch_detail_async(self, item: JobListItem) -> Optional[JobDetail]:
+        await asyncio.sleep(0.01)
+        self.events.append(f"fetched {item['id']}")
+        return make_detail(item["id"])
+
+
+def test_analysis_starts_before_fetching_ends(metrics):
+    events: list[str] = []
+    source = SlowSource([str(i) for i in range(6)], events)
+
+    async def analyze(detail):
+        events.append(f"analyze {detail['id']}")
+        return detail
+
+    async def sink(result):
+        pass
+
+    async def run():
+        await run_pipeline(
+            prioritized(
+                iter_details([source], window=1, source_timeout=5),
+                priority=lambda detail: 0.0,
+                budget=RunBudget(),
+                pending=PendingJobs(),
+            ),
+            analyze,
+            sink,
+            workers=2,
+        )
+
+    asyncio.run(run())
+    # 缓冲远未攒满，第一条详情抓到后就开始分析
+    assert events.index("analyze 0") < events.index("fetched 5")
+    assert sorted(events) == sorted(
+        [f"fetched {i}" for i in range(6)] + [f"analyze {i}" for i in range(6)]
+    )
+
+
+def test_ready_details_are_reordered_by_priority():
+    details = [make_detail(str(i)) for i in range(5)]
+
+    async def run():
+        return [
+            detail["id"]
+            async for detail in prioritized(
+                aiter_details(details),
+                priority=lambda detail: int(detail["id"]),
+                budget=RunBudget(),
+                pending=PendingJobs(),
+                carried=[make_detail("9")],
+            )
+        ]
+
+    assert asyncio.run(run()) == ["9", "4", "3", "2", "1", "0"]
@@ -0,0 +1,68 @@
+import pytest
+
+from jobs_agent.core.profiles import DEFAULT_PROFILE
+from jobs_agent.core.schema import (
+    analysis_response_format,
+    analysis_schema,
+    type_schema,
+)
+from tests.helpers import make_analysis
+
+VERDICT = {
+    "type": "object",
+    "properties": {
+        "is_qualified": {"type": "boolean"},
+        "reasoning": {"type": "string"},
+    },
+    "required": ["is_qualified", "reasoning"],
+    "additionalProperties": False,
+}
+
+
+def assert_strict(schema: dict) -> None:
+    """严格模式：每个对象列出全部字段且禁止额外字段"""
+    if schema.get("type") == "object":
+        assert schema["additionalProperties"] is False
+        assert schema["required"] == list(schema["properties"])
+        for child in schema["properties"].values():
+            assert_strict(child)
+
+
+def test_schema_without_profiles():
+    schema = analysis_schema()
+    assert_strict(schema)
+    assert schema["required"] == ["is_qualified", "analysis", "extracted_info"]
+
+    analysis = schema["properties"]["analysis"]["properties"]
+    assert analysis["salary_meets_requirement"] == {"type": ["boolean", "null"]}
+    assert analysis["reasoning"] == {"type": "string"}
+    extracted = schema["properties"]["extracted_info"]
+    assert {p["type"] for p in extracted["properties"].values()} == {"string"}
+    assert set(extracted["required"]) == set(make_analysis()["extracted_info"])
+
+
+def test_schema_expands_each_configured_profile():
+    profiles = [DEFAULT_PROFILE, {**DEFAULT_PROFILE, "name": "前端"}]
+    schema = analysis_schema(profiles)
+    assert_strict(schema)
+    assert schema["required"][-1] == "profiles"
+    assert schema["properties"]["profiles"]["properties"] == {
+        "default": VERDICT,
+        "前端": VERDICT,
+    }
+    # 每次调用生成新的 Schema，不影响未配置档案的请求
+    assert "profiles" not in analysis_schema()["properties"]
+
+
+def test_response_format_wraps_the_schema():
+    response_format = analysis_response_format()
+    assert response_format["type"] == "json_schema"
+    assert response_format["json_schema"]["name"] == "job_analysis"
+    assert response_format["json_schema"]["strict"] is True
+    assert response_format["json_schema"]["schema"] == analysis_schema()
+
+
+def test_unsupported_types_are_rejected():
+    assert type_schema(list[int]) == {"type": "array", "items": {"type": "integer"}}
+    with pytest.raises(TypeError):
+        type_schema(dict[str, str])
@@ -0,0 +1,183 @@
+import asyncio
+import io
+import json
+
+import pytest
+from botocore.exceptions import ClientError
+
+from jobs_agent.core import shard as shard_module
+from jobs_agent.core.shard import LeaseManager, _lease_dir
+from jobs_agent.storage.s3 import S3StorageClient
+
+JOB = "v2ex:1"
+
+
+class FakeS3Client:
+    """内存中的 S3，按 IfNoneMatch 实现条件写入"""
+
+    def __init__(self):
+        self.objects: dict[str, bytes] = {}
+        self.puts: list[tuple[str, str | None]] = []
+
+    def put_object(self, Bucket, Key, Body, IfNoneMatch=None):
+        self.puts.append((Key, IfNoneMatch))
+        if IfNoneMatch == "*" and Key in self.objects:
+            raise ClientError(
+                {"Error": {"Code": "PreconditionFailed", "Message": "exists"}},
+                "PutObject",
+            )
+        self.objects[Key] = Body
+        return {}
+
+    def get_object(self, Bucket, Key):
+        if Key not in self.objects:
+            raise ClientError({"Error": {"Code": "NoSuchKey"}}, "GetObject")
+        return {"Body": io.BytesIO(self.objects[Key])}
+
+
+@pytest.fixture
+def clock(clock, monkeypatch):
+    monkeypatch.setattr(shard_module, "time", clock)
+    return clock
+
+
+def s3_nodes(count: int) -> list[S3StorageClient]:
+    """多个节点共用同一个存储桶"""
+    bucket = FakeS3Client()
+    nodes = []
+    for _ in range(count):
+        node = S3StorageClient(bucket="jobs", region="us-east-1")
+        node.client = bucket
+        nodes.append(node)
+    return nodes
+
+
+def test_local_claim_conflicts_until_released(storage, clock):
+    a = LeaseManager(storage, "a", ttl=60)
+    b = LeaseManager(storage, "b", ttl=60)
+
+    async def run():
+        assert await a.claim(JOB)
+        assert not await b.claim(JOB)
+        await a.release(JOB)
+        assert await b.claim(JOB)
+
+    asyncio.run(run())
+    assert (a.claimed, b.claimed, b.contended) == (1, 1, 1)
+
+
+def test_local_create_does_not_overwrite_or_leave_temp_files(storage, tmp_path):
+    path = "leases/x/lease.json"
+
+    async def run():
+        assert await storage.write_file_if_absent(path, "first")
+        assert not await storage.write_file_if_absent(path, "second")
+        return await storage.read_text(path)
+
+    assert asyncio.run(run()) == "first"
+    assert [p.name for p in (tmp_path / "leases" / "x").iterdir()] == ["lease.json"]
+
+
+def test_expired_lease_is_taken_over_by_one_worker(storage, clock):
+    a = LeaseManager(storage, "a", ttl=60)
+    b = LeaseManager(storage, "b", ttl=60)
+    c = LeaseManager(storage, "c", ttl=60)
+    path = f"{_lease_dir(JOB)}/lease.json"
+
+    async def run():
+        assert await a.claim(JOB)
+        clock.advance(30)
+        assert not await b.claim(JOB)
+
+        clock.advance(31)
+        stale = await storage.read_text(path)
+        assert await b.claim(JOB)
+        assert json.loads(await storage.read_text(path))["worker"] == "b"
+
+        # c 与 b 同时读到了过期的租约：接管标记已被 b 创建，c 不能再覆盖
+        await storage.write_text(path, stale)
+        assert not await c.claim(JOB)
+
+    asyncio.run(run())
+    assert (b.claimed, c.claimed, c.contended) == (1, 0, 1)
+
+
+def test_s3_claim_uses_if_none_match(clock):
+    first, second = s3_nodes(2)
+    a = LeaseManager(first, "a", ttl=60)
+    b = LeaseManager(second, "b", ttl=60)
+
+    async def run():
+        assert await a.claim(JOB)
+        assert not await b.claim(JOB)
+        clock.advance(61)
+        assert await b.claim(JOB)
+        assert not await a.claim(JOB)
+
+    asyncio.run(run())
+    lease_key = f"{_lease_dir(JOB)}/lease.json"
+    marker_key = next(key for key, _ in first.client.puts if "takeover-" in key)
+    # 每次认领都先条件创建 lease.json；接管时条件创建标记后才无条件覆盖
+    assert first.client.puts == [
+        (lease_key, "*"),
+        (lease_key, "*"),
+        (lease_key, "*"),
+        (marker_key, "*"),
+        (lease_key, None),
+        (lease_key, "*"),
+    ]
+
+
+def test_s3_other_errors_are_not_treated_as_conflicts():
+    (node,) = s3_nodes(1)
+
+    def denied(**kwargs):
+        raise ClientError({"Error": {"Code": "AccessDenied"}}, "PutObject")
+
+    node.client.put_object = denied
+    with pytest.raises(ClientError):
+        asyncio.run(LeaseManager(node, "a").claim(JOB))
+
+
+def test_renew_stops_once_the_lease_was_taken_over(storage, clock):
+    a = LeaseManager(storage, "a", ttl=60)
+    b = LeaseManager(storage, "b", ttl=60)
+    path = f"{_lease_dir(JOB)}/lease.json"
+
+    async def run():
+        assert await a.claim(JOB)
+        clock.advance(30)
+        assert await a.renew(JOB)
+
+        # 续期后从续期时刻重新计时
+        clock.advance(59)
+        assert not await b.claim(JOB)
+
+        # a 停顿过久，租约过期后被 b 接管；a 恢复后不能再抢回来
+        clock.advance(2)
+        assert await b.claim(JOB)
+        assert not await a.renew(JOB)
+        assert json.loads(await storage.read_text(path))["worker"] == "b"
+        assert await b.renew(JOB)
+
+    asyncio.run(run())
+
+
+def test_expired_lease_is_renewed_when_nobody_took_it_over(storage, clock):
+    a = LeaseManager(storage, "a", ttl=60)
+    b = LeaseManager(storage, "b", ttl=60)
+    path = f"{_lease_dir(JOB)}/lease.json"
+
+    async def run():
+        assert await a.claim(JOB)
+        clock.advance(61)
+        stale = await storage.read_text(path)
+        assert await a.renew(JOB)
+        assert not await b.claim(JOB)
+
+        # b 与 a 同时读到了过期的租约：续期与接管争用同一个标记，b 不能再覆盖
+        await storage.write_text(path, stale)
+        assert not await b.claim(JOB)
+
+    asyncio.run(run())
+    assert b.contended == 2
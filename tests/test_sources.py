@@ -0,0 +1,66 @@
+import httpx
+import pytest
+
+from jobs_agent.core import fetch
+from jobs_agent.core.httpcache import HttpCache
+from jobs_agent.core.ratelimit import AdaptiveRateLimiter
+from jobs_agent.sources.eleduck import EleduckSource
+from jobs_agent.sources.v2ex import V2exSource
+from tests.helpers import eleduck_list, v2ex_feed
+
+
+@pytest.fixture
+def served(monkeypatch):
+    """把 core.fetch 的请求交给替身数据，带 ETag 的请求返回 304"""
+    statuses: list[int] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.headers.get("If-None-Match") == '"v1"':
+            statuses.append(304)
+            return httpx.Response(304)
+        statuses.append(200)
+        if request.url.host == "v2ex.test":
+            return httpx.Response(
+                200, text=v2ex_feed("v2ex.test", 4), headers={"ETag": '"v1"'}
+            )
+        page = int(request.url.params["page"])
+        return httpx.Response(200, json=eleduck_list(page, 5), headers={"ETag": '"v1"'})
+
+    client = httpx.Client(transport=httpx.MockTransport(handler))
+    limiter = AdaptiveRateLimiter(initial_rate=1000, max_rate=1000, burst=1000)
+    cache = HttpCache()
+    monkeypatch.setattr(fetch, "get_client", lambda: client)
+    monkeypatch.setattr(fetch, "get_rate_limiter", lambda: limiter)
+    monkeypatch.setattr(fetch, "get_http_cache", lambda: cache)
+    return statuses
+
+
+def test_eleduck_relists_unchanged_page_from_cache(served):
+    source = EleduckSource(pages=1, api_base="https://svc.test")
+    first = source.fetch_list()
+    second = source.fetch_list()
+
+    assert served == [200, 304]
+    assert len(first) == 5
+    assert [item["id"] for item in second] == [item["id"] for item in first]
+
+
+def test_eleduck_unchanged_page_still_stops_at_watermark(served):
+    source = EleduckSource(pages=3, api_base="https://svc.test")
+    first = source.fetch_list()
+    source.watermark = source.newest_seen
+
+    second = source.fetch_list()
+    # 首次运行翻完 3 页；有水位线后第 1 页就全部不新于水位线，停止翻页
+    assert served == [200, 200, 200, 304]
+    assert [item["id"] for item in second] == [item["id"] for item in first]
+
+
+def test_v2ex_relists_unchanged_feed_from_cache(served):
+    source = V2exSource(feed_url="https://v2ex.test/feed.xml")
+    first = source.fetch_list()
+    second = source.fetch_list()
+
+    assert served == [200, 304]
+    assert len(first) == 4
+    assert [item["id"] for item in second] == [item["id"] for item in first]
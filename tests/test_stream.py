@@ -0,0 +1,156 @@
+import asyncio
+import json
+from typing import Optional
+
+from jobs_agent.core.pipeline import iter_details
+from jobs_agent.core.sink import ResultSink
+from jobs_agent.core.stream import run_pipeline
+from jobs_agent.sources.base import BaseSource, JobDetail, JobListItem
+from jobs_agent.storage.journal import RecordJournal
+from tests.helpers import aiter_details, make_detail, make_item, make_result
+
+
+class FakeSource(BaseSource):
+    def __init__(self, ids: list[str], fail: set[str] = frozenset()):
+        self.ids = ids
+        self.fail = fail
+
+    @property
+    def name(self) -> str:
+        return "fake"
+
+    def fetch_list(self) -> list[JobListItem]:
+        return [make_item(item_id) for item_id in self.ids]
+
+    def fetch_detail(self, item: JobListItem) -> Optional[JobDetail]:
+        if item["id"] in self.fail:
+            return None
+        return make_detail(item["id"])
+
+
+def test_iter_details_skips_analyzed_and_failed_items():
+    source = FakeSource([str(i) for i in range(6)], fail={"4"})
+
+    async def collect():
+        return [
+            detail["id"]
+            async for detail in iter_details(
+                [source], analyzed_ids={"fake:1"}, window=2, source_timeout=5
+            )
+        ]
+
+    assert asyncio.run(collect()) == ["0", "2", "3", "5"]
+
+
+def test_pipeline_streams_results_and_isolates_failures():
+    async def analyze(detail):
+        if detail["id"] == "3":
+            raise RuntimeError("boom")
+        if detail["id"] == "5":
+            return None
+        return make_result(detail)
+
+    received: list[str] = []
+
+    async def sink(result):
+        received.append(result["id"])
+
+    details = [make_detail(str(i)) for i in range(8)]
+    fed = asyncio.run(
+        run_pipeline(aiter_details(details), analyze, sink, queue_size=2, workers=1)
+    )
+
+    assert fed == 8
+    assert received == [f"fake:{i}" for i in (0, 1, 2, 4, 6, 7)]
+
+
+def test_sink_flushes_journal_and_batches_notifications(storage):
+    sent: list[list[str]] = []
+
+    def notifier(jobs, profile):
+        sent.append([job["id"] for job in jobs])
+        return True
+
+    journal = RecordJournal(storage)
+    sink = ResultSink(
+        storage,
+        history=[],
+        notifier=notifier,
+        journal=journal,
+        flush_every=2,
+        notify_batch_size=2,
+    )
+
+    async def run():
+        await sink.add(make_result(make_detail("0"), qualified=True))
+        await sink.add(make_result(make_detail("1")))
+        # 第 2 条触发落盘，journal 清空
+        saved = json.loads(await storage.read_text("analyzed_jobs.json"))
+        assert [record["id"] for record in saved] == ["fake:0", "fake:1"]
+        assert await journal.replay() == []
+
+        await sink.add(make_result(make_detail("2"), qualified=True))
+        assert [record["id"] for record in await journal.replay()] == ["fake:2"]
+        assert sent == [["fake:0", "fake:2"]]
+
+        await sink.close()
+        saved = json.loads(await storage.read_text("analyzed_jobs.json"))
+        assert len(saved) == 3
+
+    asyncio.run(run())
+    # 合格职位只保留精简内容
+    assert all("detail" not in job for job in sink.qualified)
+
+
+def test_pipeline_reorders_results_to_input_order():
+    async def analyze(detail):
+        # 越靠前的条目越慢，完成顺序与输入顺序相反
+        await asyncio.sleep(0.01 * (10 - int(detail["id"])))
+        return make_result(detail)
+
+    received: list[str] = []
+
+    async def sink(result):
+        received.append(result["id"])
+
+    details = [make_detail(str(i)) for i in range(10)]
+    asyncio.run(
+        run_pipeline(aiter_details(details), analyze, sink, queue_size=4, workers=4)
+    )
+    assert received == [f"fake:{i}" for i in range(10)]
+
+
+def test_pipeline_bounds_in_flight_behind_a_slow_head():
+    queue_size, workers = 3, 2
+    pulled = 0
+    release_head = asyncio.Event()
+
+    async def details():
+        nonlocal pulled
+        for i in range(50):
+            pulled += 1
+            yield make_detail(str(i))
+
+    async def analyze(detail):
+        if detail["id"] == "0":
+            await release_head.wait()
+        return make_result(detail)
+
+    received: list[str] = []
+
+    async def sink(result):
+        received.append(result["id"])
+
+    async def run():
+        pipeline = asyncio.create_task(
+            run_pipeline(details(), analyze, sink, queue_size, workers)
+        )
+        await asyncio.sleep(0.05)
+        # 队头未完成时，已取出的详情不超过在途上限（多出的 1 条在等待名额）
+        assert pulled <= queue_size + workers + 1
+        assert received == []
+        release_head.set()
+        return await pipeline
+
+    assert asyncio.run(run()) == 50
+    assert received == [f"fake:{i}" for i in range(50)]
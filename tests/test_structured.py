@@ -0,0 +1,143 @@
+import json
+
+import httpx
+import pytest
+
+from jobs_agent.core import llmcache as llmcache_module
+from jobs_agent.core.analyzer import (
+    _legacy_outcome,
+    _parse_attempt,
+    build_analysis_result,
+)
+from jobs_agent.core.llmcache import LLMCache
+from jobs_agent.core.prompt import process_job_data
+from jobs_agent.llm import openai as openai_module
+from jobs_agent.llm.openai import OpenAIChat
+from tests.helpers import make_analysis, make_detail
+
+REPLY = json.dumps(make_analysis())
+RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {"name": "job_analysis", "strict": True, "schema": {}},
+}
+
+
+class FakeLLMServer:
+    """按顺序返回 responses 中的错误，之后正常回复；记录每次请求的 response_format 类型"""
+
+    def __init__(self, *responses: tuple[int, str]):
+        self.responses = list(responses)
+        self.formats: list[str | None] = []
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        body = json.loads(request.content)
+        self.formats.append((body.get("response_format") or {}).get("type"))
+        if self.responses:
+            status, error = self.responses.pop(0)
+            return httpx.Response(status, json={"error": {"message": error}})
+        return httpx.Response(200, json={"choices": [{"message": {"content": REPLY}}]})
+
+
+@pytest.fixture
+def server(monkeypatch, clock):
+    def install(*responses):
+        fake = FakeLLMServer(*responses)
+        client = httpx.Client(transport=httpx.MockTransport(fake))
+        monkeypatch.setattr(openai_module, "get_client", lambda: client)
+        return fake
+
+    monkeypatch.setattr(openai_module, "_structured_support", {})
+    monkeypatch.setattr(openai_module, "time", clock)
+    monkeypatch.setattr(llmcache_module, "_cache", LLMCache(enabled=False))
+    return install
+
+
+def chat(llm: OpenAIChat) -> str:
+    return llm.chat("prompt", response_format=RESPONSE_FORMAT)
+
+
+def test_format_rejection_downgrades_for_every_client(server, metrics):
+    fake = server(
+        (400, "Invalid parameter: response_format json_schema is not supported"),
+        (400, "response_format.type json_object is not supported"),
+    )
+    llm = OpenAIChat(api_key="k", model="m", base_url="https://llm.test/v1")
+
+    assert chat(llm) == REPLY
+    assert fake.formats == ["json_schema", "json_object", None]
+    assert llm.structured_mode == "off"
+    assert metrics.total("llm_structured_fallbacks_total") == 2
+
+    # 同一接口和模型的新客户端直接使用探测结果
+    other = OpenAIChat(api_key="k", model="m", base_url="https://llm.test/v1")
+    chat(other)
+    assert fake.formats[-1] is None
+
+
+def test_unrelated_client_errors_do_not_downgrade(server, metrics):
+    fake = server(
+        (400, "This model's maximum context length is 8192 tokens"),
+        (422, "temperature must be <= 2"),
+    )
+    llm = OpenAIChat(api_key="k", model="m", base_url="https://llm.test/v1")
+
+    # 按普通错误重试，重试时仍然带 response_format
+    assert chat(llm) == REPLY
+    assert fake.formats == ["json_schema"] * 3
+    assert llm.structured_mode == "json_schema"
+    assert metrics.total("llm_structured_fallbacks_total") == 0
+    assert metrics.total("llm_requests_total", outcome="error") == 2
+
+
+def test_fixed_mode_never_downgrades(server):
+    fake = server((400, "response_format is not supported"))
+    llm = OpenAIChat(
+        api_key="k",
+        model="m",
+        base_url="https://llm.test/v1",
+        structured_output="json_schema",
+    )
+
+    assert chat(llm) == REPLY
+    assert fake.formats == ["json_schema", "json_schema"]
+
+
+def test_structured_replies_skip_cleanup_and_fall_back_when_truncated(metrics):
+    assert _parse_attempt(REPLY, 0, "json_schema") == make_analysis()
+    assert metrics.total("llm_structured_replies_total", outcome="ok") == 1
+
+    # 被 max_tokens 截断的回复按原方式修复也失败，重试
+    assert _parse_attempt(REPLY[:40], 0, "json_schema") is None
+    assert metrics.total("llm_structured_replies_total", outcome="invalid") == 1
+    assert metrics.total("llm_parse_retries_total", mode="json_schema") == 1
+
+
+def test_retries_avoided_are_measured_with_the_legacy_parser(metrics):
+    assert _legacy_outcome(REPLY) == "ok"
+    assert _legacy_outcome('{"is_qualified": ***, "analysis": {}}') == "repair"
+    assert _legacy_outcome("抱歉，无法判断") == "retry"
+
+    # 合法 JSON 即使字符串里带代码块标记，原方式也能解析，不计入
+    quoted = json.dumps(make_analysis(reasoning="示例：```json\n{}\n```"))
+    assert _parse_attempt(quoted, 0, "json_schema")["analysis"]["reasoning"]
+    assert _parse_attempt(REPLY, 0, "json_object") == make_analysis()
+    assert metrics.total("llm_structured_replies_total", outcome="ok") == 2
+    assert metrics.total("llm_retries_avoided_total") == 0
+    assert metrics.total("llm_json_repairs_total") == 0
+
+
+def test_prompt_notes_follow_the_structured_schema():
+    detail = make_detail("1")
+    legacy = process_job_data(detail)["prompt"]
+    structured = process_job_data(detail, structured=True)["prompt"]
+
+    assert "extracted_info 可以为空或null" in legacy
+    assert "extracted_info 可以为空或null" not in structured
+    assert "extracted_info 的各项填空字符串" in structured
+
+
+def test_null_extracted_info_is_normalised():
+    reply = json.dumps({**make_analysis(), "extracted_info": None})
+    analysis = _parse_attempt(f"```json\n{reply}\n```", 0)
+    result = build_analysis_result(make_detail("1"), analysis, None)
+    assert result["llm_analysis"]["extracted_info"] == {}